@@ -1,5 +1,12 @@
 """Application package initialization."""
 
-from .main import app
 
-__all__ = ["app"]
\ No newline at end of file
+def __getattr__(name: str):
+    """Import the FastAPI app on first access so process-pool workers can import app.* cheaply."""
+    if name == "app":
+        from .main import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["app"]
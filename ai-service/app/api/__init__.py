@@ -1,8 +1,14 @@
 """API package initialization."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
 
-from . import analysis, chat, upload
+from app.core.config import get_settings
+from app.services import analysis_service, embedding_engine, llm_service
+
+from . import analysis, chat, jobs, metrics, upload
+
+settings = get_settings()
 
 # Create main API router
 api_router = APIRouter(prefix="/api/v1")
@@ -11,6 +17,8 @@ api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(upload.router)
 api_router.include_router(chat.router)
 api_router.include_router(analysis.router)
+api_router.include_router(jobs.router)
+api_router.include_router(metrics.router)
 
 # Health check endpoint
 @api_router.get("/health", tags=["health"])
@@ -18,4 +26,20 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+# Readiness endpoint (models load on first use or with WARMUP_ON_STARTUP)
+@api_router.get("/ready", tags=["health"])
+async def readiness_check():
+    """Report which models are loaded; 503 while warm-up is still loading the embedding model."""
+    components = {
+        "embeddings": embedding_engine.is_loaded,
+        "nltk": analysis_service.is_ready,
+        "llm_client": llm_service.is_ready,
+    }
+    # Without warm-up the models load on first use, so there is nothing to wait for
+    ready = components["embeddings"] or not settings.warmup_on_startup
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ready" if ready else "loading", "components": components}
+    )
+
 __all__ = ["api_router"]
\ No newline at end of file
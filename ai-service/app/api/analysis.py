@@ -1,17 +1,72 @@
 """API endpoints for analysis operations."""
 
+import json
 from pathlib import Path
+from typing import AsyncIterator
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 
 from app.core.config import get_settings
+from app.core.executors import run_io
 from app.models import AnalysisRequest, AnalysisResponse
 from app.services import analysis_service, llm_service
+from app.services.pipeline import Pipeline, Stage
 
 settings = get_settings()
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
 
+def _build_pipeline(request: AnalysisRequest, vector_db_path: Path) -> Pipeline:
+    """
+    Build the analysis stage graph.
+    Accuracy, missing information and keywords only need the LLM note, so
+    they run concurrently; the roadmap waits for the keywords.
+    """
+    async def llm_note(results):
+        # Get LLM explanation for the title
+        return await llm_service.get_topic_explanation(request.title, str(vector_db_path))
+
+    async def accuracy(results):
+        return await analysis_service.calculate_accuracy(request.text, results["llm_note"])
+
+    async def missing_info(results):
+        return await analysis_service.find_missing_information(request.text, results["llm_note"])
+
+    async def missing_keywords(results):
+        missing_keywords_set = await run_io(
+            analysis_service.find_missing_keywords,
+            request.text,
+            results["llm_note"],
+            vector_db_path
+        )
+        return list(missing_keywords_set)
+
+    async def roadmap(results):
+        # Generate study roadmap
+        return await llm_service.get_study_roadmap(results["missing_keywords"], results["llm_note"])
+
+    return Pipeline([
+        Stage("llm_note", llm_note),
+        Stage("accuracy", accuracy, depends_on=["llm_note"]),
+        Stage("missing_info", missing_info, depends_on=["llm_note"]),
+        Stage("missing_keywords", missing_keywords, depends_on=["llm_note"]),
+        Stage("roadmap", roadmap, depends_on=["missing_keywords"]),
+    ])
+
+
+def _check_document(request: AnalysisRequest) -> Path:
+    """Get the document vector database path, raising 404 if it does not exist."""
+    vector_db_path = settings.vector_db_dir / request.user_id / "uploaded_doc"/ request.folder_id
+
+    if not vector_db_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document not found for user '{request.user_id}' in folder '{request.folder_id}'. Please upload it first."
+        )
+    return vector_db_path
+
+
 @router.post(
     "/",
     response_model=AnalysisResponse,
@@ -21,58 +76,56 @@ router = APIRouter(prefix="/analysis", tags=["analysis"])
 )
 async def analyze_text(request: AnalysisRequest):
     """Analyze user text for accuracy and missing information."""
-    vector_db_path = settings.vector_db_dir / request.user_id / "uploaded_doc"/ request.folder_id
-    
-    if not vector_db_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Document '{request.filename}' not found. Please upload it first."
-        )
-    
+    vector_db_path = _check_document(request)
+
     try:
-        # Get LLM explanation for the title
-        llm_note = await llm_service.get_topic_explanation(
-            request.title,
-            str(vector_db_path)
-        )
-        
-        # Calculate accuracy
-        accuracy = analysis_service.calculate_accuracy(
-            request.text, 
-            llm_note
-        )
-        
-        # Find missing information
-        missing_info = analysis_service.find_missing_information(
-            request.text,
-            llm_note
-        )
-        
-        # Find missing keywords
-        missing_keywords_set = analysis_service.find_missing_keywords(
-            request.text,
-            llm_note
-        )
-        missing_keywords = list(missing_keywords_set)
-        
-        # Generate study roadmap
-        roadmap = await llm_service.get_study_roadmap(
-            missing_keywords,
-            llm_note
-        )
-        
+        results, timings = await _build_pipeline(request, vector_db_path).run()
+
         return AnalysisResponse(
-            accuracy=accuracy,
-            missing_info=missing_info,
-            missing_keywords=missing_keywords,
-            roadmap=roadmap,
+            **results,
             user_note=request.text,
-            llm_note=llm_note
+            timings={name: round(seconds, 3) for name, seconds in timings.items()}
         )
-        
+
     except Exception as e:
         print("Error analyze_text: ", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Analysis failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+async def _sse_events(request: AnalysisRequest, vector_db_path: Path) -> AsyncIterator[str]:
+    """Format analysis stage results as server-sent events."""
+    results = {}
+    timings = {}
+    try:
+        async for name, result, seconds in _build_pipeline(request, vector_db_path).stream():
+            results[name] = result
+            timings[name] = round(seconds, 3)
+            payload = {"stage": name, "result": result, "seconds": timings[name]}
+            yield f"event: stage\ndata: {json.dumps(payload)}\n\n"
+
+        response = AnalysisResponse(**results, user_note=request.text, timings=timings)
+        yield f"event: done\ndata: {response.model_dump_json()}\n\n"
+    except Exception as e:
+        print("Error in analysis stream: ", e)
+        yield f"event: error\ndata: {json.dumps({'error': f'Analysis failed: {str(e)}'})}\n\n"
+
+
+@router.post(
+    "/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Analyze text accuracy (streaming)",
+    description="Analyze user text, sending each stage result as a server-sent 'stage' event as soon as it "
+                "is ready (e.g. accuracy and gaps before the roadmap), then a 'done' event with the full analysis"
+)
+async def stream_analyze_text(request: AnalysisRequest):
+    """Analyze user text, streaming partial results."""
+    vector_db_path = _check_document(request)
+
+    return StreamingResponse(
+        _sse_events(request, vector_db_path),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,8 +1,11 @@
 """API endpoints for chat operations."""
 
+import json
 from pathlib import Path
+from typing import AsyncIterator
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 
 from app.core.config import get_settings
 from app.models import (
@@ -84,6 +87,65 @@ async def chat_with_notes(request: ChatWithNotesRequest):
         )
 
 
+async def _sse_events(query: str, vector_db_path: Path) -> AsyncIterator[str]:
+    """Format a streamed chat answer as server-sent events."""
+    try:
+        async for event, text in llm_service.stream_chat(query, str(vector_db_path)):
+            payload = {"text": text} if event == "token" else {"message": text}
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+    except Exception as e:
+        print("Error in chat stream: ", e)
+        yield f"event: error\ndata: {json.dumps({'error': f'Chat failed: {str(e)}'})}\n\n"
+
+
+@router.post(
+    "/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Chat with document (streaming)",
+    description="Chat with uploaded document using RAG, streaming tokens as server-sent events "
+                "('token' events with partial text, then a 'done' event with the full message)"
+)
+async def stream_chat_with_document(request: ChatRequest):
+    """Chat with uploaded document, streaming the answer."""
+    vector_db_path = settings.vector_db_dir / request.user_id / "uploaded_doc"/ request.folder_id
+    
+    if not vector_db_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document not found for user '{request.user_id}' in folder '{request.folder_id}'. Please upload it first."
+        )
+    
+    return StreamingResponse(
+        _sse_events(request.query, vector_db_path),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post(
+    "/notes/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Chat with notes (streaming)",
+    description="Chat with uploaded notes using RAG, streaming tokens as server-sent events "
+                "('token' events with partial text, then a 'done' event with the full message)"
+)
+async def stream_chat_with_notes(request: ChatWithNotesRequest):
+    """Chat with uploaded notes, streaming the answer."""
+    vector_db_path = settings.vector_db_dir / request.user_id / "notes" / request.folder_id
+    
+    if not vector_db_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Notes not found for user '{request.user_id}' in folder '{request.folder_id}'. Please upload them first."
+        )
+    
+    return StreamingResponse(
+        _sse_events(request.query, vector_db_path),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post(
         "/doc-vector-db-exist",
         response_model=StatusResponse,
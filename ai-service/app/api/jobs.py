@@ -0,0 +1,28 @@
+"""API endpoints for background ingestion jobs."""
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.models import JobStatusResponse
+from app.services import ingestion_job_service
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobStatusResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get job status",
+    description="Get the status and progress of a background upload job"
+)
+async def get_job_status(job_id: str):
+    """Get status and progress of an ingestion job."""
+    job = await ingestion_job_service.get_job(job_id)
+    
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job '{job_id}' not found."
+        )
+    
+    return JobStatusResponse(**job)
@@ -0,0 +1,28 @@
+"""API endpoints for service metrics."""
+
+from fastapi import APIRouter, status
+
+from app.core.config import SettingsDep
+from app.services import embedding_engine, llm_service, vectorstore_service
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get(
+    "/",
+    status_code=status.HTTP_200_OK,
+    summary="Service metrics",
+    description="Memory, throughput and cache statistics of the running worker"
+)
+async def get_metrics(settings: SettingsDep):
+    """Get service metrics."""
+    return {
+        "config": {
+            "embedding_backend": settings.embedding_backend,
+            "vector_storage_mode": settings.vector_storage_mode,
+            "transcription_mode": settings.transcription_mode,
+        },
+        "embeddings": embedding_engine.get_stats(),
+        "vectorstore_pool": vectorstore_service.get_stats(),
+        "llm": llm_service.get_stats(),
+    }
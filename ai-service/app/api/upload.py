@@ -1,14 +1,15 @@
+import uuid
 from pathlib import Path
 from typing import Annotated
 
 from fastapi import APIRouter, File, HTTPException, UploadFile, status, Form
 
 from app.core.config import get_settings
-from app.models import SuccessResponse
-from app.services import vectorstore_service
+from app.models import JobStatusResponse, SuccessResponse
+from app.services import ingestion_job_service, vectorstore_service
 from app.utils import save_upload_file, validate_file_extension
 
-from app.models import NotesRequest
+from app.models import NoteDeleteRequest, NotesRequest, NoteUpsertRequest, VideoReindexRequest
 
 settings = get_settings()
 router = APIRouter(prefix="/upload", tags=["upload"])
@@ -107,6 +108,48 @@ async def upload_video(file: Annotated[UploadFile, File()], user_id: Annotated[s
         )
     
 
+@router.post(
+    "/video/reindex",
+    response_model=SuccessResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Re-index part of a video",
+    description="Re-transcribe and re-embed only the chunks of an uploaded video between start and end (seconds)"
+)
+async def reindex_video_range(request: VideoReindexRequest):
+    """Re-index a time range of an uploaded video."""
+    if request.end <= request.start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="End must be after start"
+        )
+    
+    file_path = settings.upload_dir / request.user_id / "uploaded_doc" / request.folder_id
+    vector_db_path = settings.vector_db_dir / request.user_id / "uploaded_doc" / request.folder_id
+    
+    if not file_path.exists() or not vector_db_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Video not found for user '{request.user_id}' in folder '{request.folder_id}'. Please upload it first."
+        )
+    
+    try:
+        chunk_count = await vectorstore_service.reindex_video_range(
+            file_path,
+            vector_db_path,
+            request.start,
+            request.end
+        )
+        
+        return SuccessResponse(message=f"Re-indexed {chunk_count} chunks")
+        
+    except Exception as e:
+        print("Error in reindex_video_range: ", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to re-index video: {str(e)}"
+        )
+    
+
 @router.post(
     "/notes",
     response_model=SuccessResponse,
@@ -134,4 +177,162 @@ async def upload_notes(request: NotesRequest):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process notes: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post(
+    "/notes/upsert",
+    response_model=SuccessResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Upload a single note",
+    description="Add or update one note in the folder's notes vector store, re-embedding only its changed chunks"
+)
+async def upsert_note(request: NoteUpsertRequest):
+    """Add or update a single note."""
+    try:
+        vector_db_path = settings.vector_db_dir / request.user_id / "notes" / request.folder_id
+        
+        await vectorstore_service.upsert_note(
+            vector_db_path,
+            request.note_id,
+            request.content,
+            request.updated_at
+        )
+        
+        return SuccessResponse(message="Note processed successfully")
+        
+    except Exception as e:
+        print("Error in upsert_note: ", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process note: {str(e)}"
+        )
+
+
+@router.post(
+    "/notes/delete",
+    response_model=SuccessResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Delete a single note",
+    description="Remove one note's chunks from the folder's notes vector store"
+)
+async def delete_note(request: NoteDeleteRequest):
+    """Delete a single note."""
+    vector_db_path = settings.vector_db_dir / request.user_id / "notes" / request.folder_id
+    
+    try:
+        deleted = await vectorstore_service.delete_note(vector_db_path, request.note_id)
+    except Exception as e:
+        print("Error in delete_note: ", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete note: {str(e)}"
+        )
+    
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Note '{request.note_id}' not found in folder '{request.folder_id}'."
+        )
+    
+    return SuccessResponse(message="Note deleted successfully")
+
+
+@router.post(
+    "/pdf/async",
+    response_model=JobStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Upload PDF file in the background",
+    description="Save a PDF file and queue a job to create its vector embeddings; poll /jobs/{job_id} for progress"
+)
+async def upload_pdf_async(file: Annotated[UploadFile, File()], user_id: Annotated[str, Form(...)], folder_id: Annotated[str, Form(...)]):
+    """Save PDF file and queue its processing."""
+    if not validate_file_extension(file.filename, [".pdf"]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF files are allowed"
+        )
+    
+    try:
+        # Save each upload separately; the job stores it as the folder's file once indexed
+        file_path = settings.upload_dir / user_id / "staged" / folder_id / uuid.uuid4().hex
+        await save_upload_file(file, file_path)
+        
+        job = await ingestion_job_service.submit("pdf", user_id, folder_id, {
+            "file_path": str(file_path),
+            "upload_path": str(settings.upload_dir / user_id / "uploaded_doc" / folder_id),
+            "vector_db_path": str(settings.vector_db_dir / user_id / "uploaded_doc" / folder_id),
+        })
+        
+        return JobStatusResponse(**job)
+        
+    except Exception as e:
+        print("Error in upload_pdf_async: ", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to queue PDF: {str(e)}"
+        )
+
+
+@router.post(
+    "/video/async",
+    response_model=JobStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Upload video file in the background",
+    description="Save a video file and queue a job to transcribe it and create vector embeddings; poll /jobs/{job_id} for progress"
+)
+async def upload_video_async(file: Annotated[UploadFile, File()], user_id: Annotated[str, Form(...)], folder_id: Annotated[str, Form(...)]):
+    """Save video file and queue its processing."""
+    video_extensions = [".mp4", ".avi", ".mov", ".mkv"]
+    
+    if not validate_file_extension(file.filename, video_extensions):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Only video files are allowed: {', '.join(video_extensions)}"
+        )
+    
+    try:
+        # Save each upload separately; the job stores it as the folder's file once indexed
+        file_path = settings.upload_dir / user_id / "staged" / folder_id / uuid.uuid4().hex
+        await save_upload_file(file, file_path)
+        
+        job = await ingestion_job_service.submit("video", user_id, folder_id, {
+            "file_path": str(file_path),
+            "upload_path": str(settings.upload_dir / user_id / "uploaded_doc" / folder_id),
+            "audio_path": str(settings.audio_dir / user_id / f"{folder_id}_{file_path.name}.wav"),
+            "vector_db_path": str(settings.vector_db_dir / user_id / "uploaded_doc" / folder_id),
+        })
+        
+        return JobStatusResponse(**job)
+        
+    except Exception as e:
+        print("Error in upload_video_async: ", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to queue video: {str(e)}"
+        )
+
+
+@router.post(
+    "/notes/async",
+    response_model=JobStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Upload notes in the background",
+    description="Queue a job to create vector embeddings for the folder's notes; poll /jobs/{job_id} for progress"
+)
+async def upload_notes_async(request: NotesRequest):
+    """Queue processing of text notes."""
+    try:
+        job = await ingestion_job_service.submit("notes", request.user_id, request.folder_id, {
+            "notes": request.notes,
+            "vector_db_path": str(settings.vector_db_dir / request.user_id / "notes" / request.folder_id),
+        })
+        
+        return JobStatusResponse(**job)
+        
+    except Exception as e:
+        print("Error in upload_notes_async: ", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to queue notes: {str(e)}"
+        )
@@ -1,5 +1,5 @@
 """Core package initialization."""
 
-from .config import get_settings, settings
+from .config import SettingsDep, create_data_dirs, get_settings, reload_settings, settings
 
-__all__ = ["get_settings", "settings"]
\ No newline at end of file
+__all__ = ["SettingsDep", "create_data_dirs", "get_settings", "reload_settings", "settings"]
\ No newline at end of file
@@ -1,14 +1,12 @@
 """Application configuration settings."""
 
-import os
+from functools import lru_cache
 from pathlib import Path
-from typing import List
-from dotenv import load_dotenv
+from typing import Annotated, List, Literal, Optional
 
+from fastapi import Depends
 from pydantic_settings import BaseSettings
 
-load_dotenv()
-
 class Settings(BaseSettings):
     """Application settings."""
     
@@ -18,10 +16,14 @@ class Settings(BaseSettings):
     debug: bool = True
     
     # OpenRouter API Configuration
-    openrouter_api_key: str = os.getenv("OPENROUTER_API_KEY")
+    openrouter_api_key: Optional[str] = None  # OPENROUTER_API_KEY, from the environment or .env
     openrouter_base_url: str = "https://openrouter.ai/api/v1"
     # default_model: str = "anthropic/claude-3.5-sonnet"   # best reasoning with okay response time
     default_model: str = "openai/gpt-4o-mini"    # faster responses with okay reasoning
+    llm_max_concurrency: int = 32  # in-flight requests to OpenRouter per worker
+    llm_max_connections: int = 32  # shared keep-alive HTTP connection pool size
+    llm_keepalive_expiry: float = 30.0  # seconds an idle connection is kept open
+    llm_timeout: float = 120.0
     
     # File Upload Configuration
     max_upload_size: int = 50 * 1024 * 1024  # 50MB
@@ -31,17 +33,61 @@ class Settings(BaseSettings):
     root_data_dir: Path = Path("data")
     upload_dir: Path = root_data_dir / "uploads"
     vector_db_dir: Path = root_data_dir / "vector_dbs"
+    shared_vector_db_dir: Path = vector_db_dir / "_shared_chroma"
     audio_dir: Path = root_data_dir / "extracted_audios"
+    embedding_cache_dir: Path = root_data_dir / "embedding_cache"
+    response_cache_dir: Path = root_data_dir / "response_cache"
     model_dir: Path = Path("vosk-model-small-en-us-0.15")
     
+    # Execution Configuration
+    io_workers: int = 16  # threads for blocking I/O, LLM calls and embedding
+    cpu_workers: int = 2  # processes for PDF parsing and transcription
+    
+    # Background Ingestion Jobs
+    jobs_db_path: Path = root_data_dir / "jobs.sqlite"
+    job_workers: int = 4  # jobs processed at once
+    job_ffmpeg_concurrency: int = 2  # audio extractions at once
+    job_vosk_concurrency: int = 2  # transcriptions at once
+    job_embedding_concurrency: int = 2  # vector store builds at once
+    
     # Embedding Configuration
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # "torch": fp32 PyTorch; "onnx": ONNX Runtime (needs optimum[onnxruntime]);
+    # "torch-int8": PyTorch with dynamically int8-quantized linear layers
+    embedding_backend: Literal["torch", "onnx", "torch-int8"] = "torch"
+    embedding_onnx_file: str = "onnx/model.onnx"  # or e.g. "onnx/model_qint8_avx512_vnni.onnx"
+    warmup_on_startup: bool = False  # load models in the background at startup instead of on first request
     chunk_size: int = 500
     chunk_overlap: int = 50
+    vectorstore_pool_size: int = 32  # opened vector stores kept per worker
+    # "directory": one Chroma database per user/folder
+    # "shared": one Chroma client with a collection per user/folder (see app/utils/migrate_vectorstores.py)
+    vector_storage_mode: Literal["directory", "shared"] = "directory"
+    incremental_notes_indexing: bool = True  # re-embed only changed chunks on notes upload
+    retrieval_k: int = 4  # chunks passed to the LLM
+    hybrid_retrieval_enabled: bool = True  # fuse BM25 and dense rankings when the folder has a BM25 index
+    hybrid_candidates: int = 20  # chunks taken from each ranking before fusion
+    rrf_k: int = 60  # reciprocal-rank fusion constant
+    pdf_parallel_shards: int = 2  # page ranges parsed at once on the CPU pool (1 = parse on one thread)
+    pdf_pages_per_shard: int = 16
+    ingest_batch_size: int = 64  # chunks embedded and written per batch during uploads
+    ingest_queue_size: int = 4  # batches buffered between ingestion stages
+    embedding_batch_window_ms: float = 5.0  # how long the micro-batcher waits for more requests
+    embedding_batch_max_texts: int = 64  # flush early once this many texts are queued
+    embedding_pass_max_texts: int = 16  # texts per forward pass, so queries wait behind at most one slice of an upload
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_entries: int = 100_000  # per worker process, ~150MB on disk for 384-dim vectors
     
     # Audio Processing Configuration
     audio_sample_rate: int = 16000
     audio_channels: int = 1
+    # "stream": pipe FFmpeg output straight into Vosk, no WAV file
+    # "wav": extract a WAV file, then transcribe it in one pass
+    # "segmented": extract a WAV file, then transcribe overlapping windows in parallel on the CPU pool
+    transcription_mode: Literal["stream", "wav", "segmented"] = "stream"
+    transcription_segment_seconds: float = 60.0  # window length in segmented mode
+    transcription_overlap_seconds: float = 2.0  # audio shared by neighbouring windows
+    transcription_split_search_seconds: float = 5.0  # how far a window boundary may move to find silence
     
     # Analysis Configuration
     similarity_threshold: float = 0.7
@@ -49,6 +95,13 @@ class Settings(BaseSettings):
     
     # LLM Response Configuration
     remove_markdown_formatting: bool = True
+    topic_cache_enabled: bool = True  # reuse topic explanations until the folder is re-uploaded
+    topic_cache_ttl_seconds: float = 7 * 24 * 3600
+    topic_cache_max_entries: int = 10_000
+    chat_cache_enabled: bool = True  # answer near-duplicate questions on the same folder from cache
+    chat_cache_similarity_threshold: float = 0.9  # cosine similarity of question embeddings
+    chat_cache_max_entries_per_folder: int = 512
+    chat_cache_max_folders: int = 256
     
     # CORS Configuration
     allowed_origins: List[str] = ["*"]
@@ -60,12 +113,29 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings instance."""
+    """Get the application settings, read from the environment and .env once."""
     return Settings()
 
 
-# Create directories on import
+def reload_settings() -> Settings:
+    """Re-read the environment and .env, updating the shared settings instance in place."""
+    current = get_settings()
+    # Modules keep a reference from import time, so update that object instead of replacing it
+    current.__dict__.update(Settings().__dict__)
+    return current
+
+
+# Per-request access to settings in route handlers
+SettingsDep = Annotated[Settings, Depends(get_settings)]
+
+
+# Global instance
 settings = get_settings()
-for directory in [settings.root_data_dir, settings.upload_dir, settings.vector_db_dir, settings.audio_dir]:
-    directory.mkdir(exist_ok=True)
\ No newline at end of file
+
+
+def create_data_dirs(settings: Settings) -> None:
+    """Create the data directories (at startup, so importing the settings has no side effects)."""
+    for directory in [settings.root_data_dir, settings.upload_dir, settings.vector_db_dir, settings.audio_dir]:
+        directory.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""Execution layer for blocking work outside the event loop."""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, TypeVar
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_cpu_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Get the bounded thread pool for sync I/O, LLM calls and in-process embedding."""
+    global _io_executor
+    if _io_executor is None:
+        with _lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=settings.io_workers,
+                    thread_name_prefix="io-worker"
+                )
+    return _io_executor
+
+
+def get_cpu_executor() -> ProcessPoolExecutor:
+    """Get the process pool for CPU-heavy work such as PDF parsing and transcription."""
+    global _cpu_executor
+    if _cpu_executor is None:
+        with _lock:
+            if _cpu_executor is None:
+                # Spawn instead of fork: the parent holds model weights and running threads
+                _cpu_executor = ProcessPoolExecutor(
+                    max_workers=settings.cpu_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _cpu_executor
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking function on the I/O thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), partial(func, *args, **kwargs))
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a picklable top-level function on the CPU process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_executor(), partial(func, *args, **kwargs))
+
+
+async def iterate_io(
+    func: Callable[..., Iterable[T]], 
+    *args: Any, 
+    maxsize: int = 1, 
+    **kwargs: Any
+) -> AsyncIterator[T]:
+    """
+    Run a blocking generator on the I/O thread pool and yield its items.
+    At most maxsize items are buffered, the producer thread waits for the
+    consumer beyond that so memory stays bounded.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+    done = object()
+    
+    def produce() -> None:
+        try:
+            for item in func(*args, **kwargs):
+                if stopped.is_set():
+                    return
+                asyncio.run_coroutine_threadsafe(queue.put((item, None)), loop).result()
+        except BaseException as e:
+            asyncio.run_coroutine_threadsafe(queue.put((done, e)), loop).result()
+        else:
+            asyncio.run_coroutine_threadsafe(queue.put((done, None)), loop).result()
+    
+    producer = loop.run_in_executor(get_io_executor(), produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if error is not None:
+                raise error
+            if item is done:
+                break
+            yield item
+    finally:
+        # Unblock and stop the producer if the consumer gave up early
+        stopped.set()
+        while not producer.done():
+            while not queue.empty():
+                queue.get_nowait()
+            await asyncio.sleep(0.01)
+
+
+def shutdown_executors() -> None:
+    """Shut down both pools (called on application shutdown)."""
+    global _io_executor, _cpu_executor
+    with _lock:
+        if _io_executor is not None:
+            _io_executor.shutdown(wait=False, cancel_futures=True)
+            _io_executor = None
+        if _cpu_executor is not None:
+            _cpu_executor.shutdown(wait=False, cancel_futures=True)
+            _cpu_executor = None
@@ -1,15 +1,44 @@
 """Main FastAPI application."""
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import api_router
-from app.core.config import get_settings
+from app.core.config import create_data_dirs, get_settings
+from app.core.executors import run_io, shutdown_executors
 from app.core.middleware import FileSizeValidationMiddleware
+from app.services import analysis_service, embedding_engine, ingestion_job_service, llm_service
 
 settings = get_settings()
 
 
+async def warm_up() -> None:
+    """Load models and clients in the background so startup is not blocked."""
+    for service in (embedding_engine, analysis_service, llm_service):
+        try:
+            await run_io(service.warm_up)
+        except Exception as e:
+            print("Error in warm up: ", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown hooks."""
+    create_data_dirs(settings)
+    # Resume ingestion jobs interrupted by the last shutdown
+    await ingestion_job_service.start()
+    warm_up_task = asyncio.create_task(warm_up()) if settings.warmup_on_startup else None
+    yield
+    if warm_up_task is not None:
+        warm_up_task.cancel()
+    await ingestion_job_service.stop()
+    # Stop worker pools with the server
+    shutdown_executors()
+
+
 def create_application() -> FastAPI:
     """Create and configure FastAPI application."""
     
@@ -19,6 +48,7 @@ def create_application() -> FastAPI:
         debug=settings.debug,
         docs_url="/docs" if settings.debug else None,
         redoc_url="/redoc" if settings.debug else None,
+        lifespan=lifespan,
     )
     
     # Add CORS middleware
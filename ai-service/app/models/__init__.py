@@ -7,9 +7,13 @@ from .schemas import (
     ChatResponse,
     ChatWithNotesRequest,
     ErrorResponse,
+    JobStatusResponse,
+    NoteDeleteRequest,
     NotesRequest,
+    NoteUpsertRequest,
     SuccessResponse,
     VectorDBExistsRequest,
+    VideoReindexRequest,
     StatusResponse
 )
 
@@ -20,8 +24,12 @@ __all__ = [
     "ChatResponse", 
     "ChatWithNotesRequest",
     "ErrorResponse",
+    "JobStatusResponse",
+    "NoteDeleteRequest",
     "NotesRequest",
+    "NoteUpsertRequest",
     "SuccessResponse",
     "VectorDBExistsRequest",
+    "VideoReindexRequest",
     "StatusResponse"
 ]
\ No newline at end of file
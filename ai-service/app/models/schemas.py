@@ -1,6 +1,6 @@
 """Pydantic models for API request/response validation."""
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -27,12 +27,37 @@ class NotesRequest(BaseModel):
     """
     Notes upload request model. 
     Uses all notes in a folder as a single string for embedding.
+    Prefer NoteUpsertRequest/NoteDeleteRequest to send only the edited note.
     """
     notes: str = Field(..., min_length=1, description="Notes content")
     user_id: str = Field(..., min_length=1, description="User identifier")
     folder_id: str = Field(..., min_length=1, description="Folder identifier")
 
 
+class NoteUpsertRequest(BaseModel):
+    """Single note upload request model."""
+    note_id: str = Field(..., min_length=1, description="Note identifier")
+    content: str = Field(..., min_length=1, description="Note content")
+    user_id: str = Field(..., min_length=1, description="User identifier")
+    folder_id: str = Field(..., min_length=1, description="Folder identifier")
+    updated_at: Optional[str] = Field(None, description="Last update time of the note (ISO 8601)")
+
+
+class NoteDeleteRequest(BaseModel):
+    """Single note delete request model."""
+    note_id: str = Field(..., min_length=1, description="Note identifier")
+    user_id: str = Field(..., min_length=1, description="User identifier")
+    folder_id: str = Field(..., min_length=1, description="Folder identifier")
+
+
+class VideoReindexRequest(BaseModel):
+    """Video time range re-index request model."""
+    user_id: str = Field(..., min_length=1, description="User identifier")
+    folder_id: str = Field(..., min_length=1, description="Folder identifier")
+    start: float = Field(..., ge=0, description="Start of the time range in seconds")
+    end: float = Field(..., gt=0, description="End of the time range in seconds")
+
+
 class AnalysisRequest(BaseModel):
     """Analysis request model."""
     title: str = Field(..., min_length=1, description="Content title")
@@ -63,6 +88,20 @@ class AnalysisResponse(BaseModel):
     roadmap: List[str] = Field(..., description="Study roadmap")
     user_note: str = Field(..., description="Original user note")
     llm_note: str = Field(..., description="LLM generated note")
+    timings: Optional[Dict[str, float]] = Field(None, description="Seconds spent in each analysis stage")
+
+
+class JobStatusResponse(BaseModel):
+    """Ingestion job status response model."""
+    job_id: str = Field(..., description="Job identifier")
+    kind: str = Field(..., description="Job type (pdf, video or notes)")
+    user_id: str = Field(..., description="User identifier")
+    folder_id: str = Field(..., description="Folder identifier")
+    status: str = Field(..., description="queued, running, succeeded, failed or superseded")
+    progress: float = Field(..., ge=0, le=100, description="Progress in percent")
+    error: Optional[str] = Field(None, description="Error message of a failed job")
+    created_at: str = Field(..., description="Submission time (ISO 8601)")
+    updated_at: str = Field(..., description="Last status change (ISO 8601)")
 
 
 class ErrorResponse(BaseModel):
@@ -1,12 +1,16 @@
 """Services package initialization."""
 
 from .analysis import analysis_service
+from .embeddings import embedding_engine
+from .jobs import ingestion_job_service
 from .llm import llm_service
 from .transcription import transcription_service
 from .vectorstore import vectorstore_service
 
 __all__ = [
     "analysis_service",
+    "embedding_engine",
+    "ingestion_job_service",
     "llm_service", 
     "transcription_service",
     "vectorstore_service",
@@ -1,15 +1,15 @@
 """Analysis service for text accuracy and keyword analysis."""
 
-from typing import List, Set
+import asyncio
+from pathlib import Path
+from typing import List, Optional, Set
 
-import nltk
 import numpy as np
-from langchain_huggingface.embeddings import HuggingFaceEmbeddings
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from sklearn.feature_extraction.text import TfidfVectorizer
 
 from app.core.config import get_settings
+from app.services.embeddings import embedding_engine
+from app.services.keywords import KeywordStats, extract_keywords, get_stopwords, tokenize
+from app.services.vectorstore import vectorstore_service
 
 settings = get_settings()
 
@@ -19,26 +19,23 @@ class AnalysisService:
     
     def __init__(self):
         """Initialize analysis service."""
-        self._embeddings = HuggingFaceEmbeddings(
-            model_name=settings.embedding_model
-        )
-        self._ensure_nltk_data()
+        self._embeddings = embedding_engine
+    
+    @property
+    def is_ready(self) -> bool:
+        """Whether the NLTK stopword list has been loaded."""
+        return get_stopwords.cache_info().currsize > 0
     
-    def _ensure_nltk_data(self) -> None:
-        """Ensure required NLTK data is available."""
-        try:
-            nltk.data.find('tokenizers/punkt')
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            # Download if not available
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
+    def warm_up(self) -> None:
+        """Load the NLTK stopword list ahead of the first request."""
+        get_stopwords()
     
-    def calculate_accuracy(self, user_note: str, llm_note: str) -> float:
+    async def calculate_accuracy(self, user_note: str, llm_note: str) -> float:
         """Calculate accuracy between user note and LLM note."""
         # Get embeddings
-        embedding1 = self._embeddings.embed_query(user_note)
-        embedding2 = self._embeddings.embed_query(llm_note)
+        embedding1, embedding2 = await self._embeddings.aembed_documents(
+            [user_note, llm_note]
+        )
         
         # Calculate cosine similarity
         similarity_score = np.dot(embedding1, embedding2) / (
@@ -58,11 +55,13 @@ class AnalysisService:
         # Clamp to [0, 1]
         return max(0, min(normalized_score, 1))
     
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+    def _normalize_rows(self, vectors: List[List[float]]) -> np.ndarray:
+        """Stack vectors into a matrix with unit-length rows."""
+        matrix = np.asarray(vectors, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
     
-    def find_missing_information(
+    async def find_missing_information(
         self, 
         user_note: str, 
         llm_note: str,
@@ -79,71 +78,55 @@ class AnalysisService:
         if not user_sentences or not llm_sentences:
             return llm_sentences
         
-        # Get embeddings for all sentences
-        user_embeddings = [
-            self._embeddings.embed_query(sentence) 
-            for sentence in user_sentences
-        ]
-        llm_embeddings = [
-            self._embeddings.embed_query(sentence) 
-            for sentence in llm_sentences
-        ]
+        # One batched embedding call per side, normalized once
+        user_embeddings, llm_embeddings = await asyncio.gather(
+            self._embeddings.aembed_documents(user_sentences),
+            self._embeddings.aembed_documents(llm_sentences)
+        )
+        user_matrix = self._normalize_rows(user_embeddings)
+        llm_matrix = self._normalize_rows(llm_embeddings)
         
-        missing_info = []
+        # Cosine similarity of every LLM sentence against every user sentence
+        similarities = llm_matrix @ user_matrix.T
         
-        for i, llm_embed in enumerate(llm_embeddings):
-            similarities = [
-                self._cosine_similarity(llm_embed, user_embed) 
-                for user_embed in user_embeddings
-            ]
-            max_similarity = max(similarities) if similarities else 0
-            
-            if max_similarity < threshold:
-                missing_info.append(llm_sentences[i])
+        # Row max with the old loop's max() semantics for zero vectors (NaN):
+        # a NaN in the first column wins, later NaNs are skipped
+        max_similarities = np.where(
+            np.isnan(similarities[:, 0]),
+            np.nan,
+            np.where(np.isnan(similarities), -np.inf, similarities).max(axis=1)
+        )
         
-        return missing_info
+        return [
+            sentence 
+            for sentence, max_similarity in zip(llm_sentences, max_similarities) 
+            if max_similarity < threshold
+        ]
     
-    def _extract_keywords(self, text: str, top_n: int = None) -> List[str]:
-        """Extract important keywords using NLTK and TF-IDF."""
+    def _extract_keywords(
+        self, 
+        text: str, 
+        top_n: int = None, 
+        stats: Optional[KeywordStats] = None
+    ) -> List[str]:
+        """Extract the top keywords of a text by TF-IDF against the folder's chunk statistics."""
         if top_n is None:
             top_n = settings.top_keywords
         
-        # Tokenize and remove stopwords
-        try:
-            words = word_tokenize(text.lower())
-            stop_words = set(stopwords.words("english"))
-            words = [
-                word for word in words 
-                if word.isalnum() and word not in stop_words
-            ]
-        except Exception:
-            # Fallback if NLTK fails
-            words = [
-                word.lower() for word in text.split() 
-                if word.isalnum()
-            ]
-        
-        # TF-IDF keyword extraction
-        try:
-            vectorizer = TfidfVectorizer(
-                stop_words="english", 
-                max_features=10
-            )
-            vectorizer.fit_transform([text])
-            tfidf_keywords = set(vectorizer.get_feature_names_out())
-        except Exception:
-            tfidf_keywords = set()
-        
-        # Combine tokenized words + TF-IDF keywords
-        keywords = set(words).union(tfidf_keywords)
-        return list(keywords)[:top_n]
+        return extract_keywords(tokenize(text), stats, top_n)
     
-    def find_missing_keywords(self, user_note: str, llm_note: str) -> Set[str]:
-        """Find keywords in LLM note that are missing in user note."""
-        llm_keywords = set(self._extract_keywords(llm_note))
-        user_keywords = set(self._extract_keywords(user_note))
+    def find_missing_keywords(
+        self, 
+        user_note: str, 
+        llm_note: str, 
+        vector_db_path: Optional[Path] = None
+    ) -> Set[str]:
+        """Find keywords of the LLM note that the user note never mentions."""
+        stats = vectorstore_service.get_keyword_stats(vector_db_path) if vector_db_path else None
+        llm_keywords = self._extract_keywords(llm_note, stats=stats)
+        user_terms = set(tokenize(user_note))
         
-        return llm_keywords - user_keywords
+        return {keyword for keyword in llm_keywords if keyword not in user_terms}
 
 
 # Global instance
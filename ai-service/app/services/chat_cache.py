@@ -0,0 +1,125 @@
+"""Semantic cache of tutor chat answers."""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class _FolderEntries:
+    """Cached questions and answers of one vector store version."""
+
+    def __init__(self, version: str):
+        self.version = version
+        self.vectors: Optional[np.ndarray] = None
+        self.queries: List[str] = []
+        self.answers: List[str] = []
+        self.used: List[int] = []
+
+
+class SemanticChatCache:
+    """
+    In-memory cache returning a previous answer for a semantically similar question.
+    Questions are embedded and compared by cosine similarity against the
+    cached questions of the same folder; per-folder entries are small, so an
+    exact matrix-vector search is used as the nearest-neighbour index.
+    Entries are dropped when the folder's vector store version changes.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_entries_per_folder: Optional[int] = None,
+        max_folders: Optional[int] = None
+    ):
+        """Initialize semantic chat cache."""
+        self.threshold = settings.chat_cache_similarity_threshold if threshold is None else threshold
+        self.max_entries_per_folder = max_entries_per_folder or settings.chat_cache_max_entries_per_folder
+        self.max_folders = max_folders or settings.chat_cache_max_folders
+        self._folders: "OrderedDict[str, _FolderEntries]" = OrderedDict()
+        self._clock = 0
+
+        # Stats
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _get_folder(self, folder: str, version: str) -> _FolderEntries:
+        """Get the entries of a folder, resetting them if the store changed."""
+        entries = self._folders.get(folder)
+        if entries is None or entries.version != version:
+            if entries is not None:
+                self._invalidations += 1
+            entries = _FolderEntries(version)
+            self._folders[folder] = entries
+            if len(self._folders) > self.max_folders:
+                self._folders.popitem(last=False)
+        self._folders.move_to_end(folder)
+        return entries
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        """Scale a vector to unit length."""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def get(self, folder: str, version: str, query_vector: List[float]) -> Optional[Tuple[str, float]]:
+        """Get (answer, similarity) of the most similar cached question above the threshold."""
+        entries = self._get_folder(folder, version)
+        if entries.vectors is None:
+            self._misses += 1
+            return None
+
+        similarities = entries.vectors @ self._normalize(query_vector)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            self._misses += 1
+            return None
+
+        self._clock += 1
+        entries.used[best] = self._clock
+        self._hits += 1
+        return entries.answers[best], float(similarities[best])
+
+    def put(self, folder: str, version: str, query: str, query_vector: List[float], answer: str) -> None:
+        """Cache an answer, evicting the least recently used question of the folder when full."""
+        entries = self._get_folder(folder, version)
+        vector = self._normalize(query_vector)[None, :]
+        self._clock += 1
+
+        if entries.vectors is None:
+            entries.vectors = vector
+        elif len(entries.answers) >= self.max_entries_per_folder:
+            row = int(np.argmin(entries.used))
+            entries.vectors[row] = vector
+            entries.queries[row] = query
+            entries.answers[row] = answer
+            entries.used[row] = self._clock
+            self._evictions += 1
+            return
+        else:
+            entries.vectors = np.vstack([entries.vectors, vector])
+
+        entries.queries.append(query)
+        entries.answers.append(answer)
+        entries.used.append(self._clock)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "threshold": self.threshold,
+            "folders": len(self._folders),
+            "entries": sum(len(entries.answers) for entries in self._folders.values()),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+        }
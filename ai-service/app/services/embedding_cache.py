@@ -0,0 +1,213 @@
+"""Persistent content-addressed cache for embedding vectors."""
+
+import fcntl
+import hashlib
+import itertools
+import json
+import os
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+KEY_BYTES = 16
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different copies share a cache entry."""
+    return unicodedata.normalize("NFC", " ".join(text.split()))
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by hash(model name, normalized text).
+    Vectors live in a memory-mapped float32 matrix next to a key matrix and
+    an LRU clock, so the index is rebuilt from disk on startup and each row
+    can be verified against its key before use.
+    Each worker process holds an exclusive lock on its own slot directory,
+    so processes never write to each other's files; a restarted worker
+    picks up a free slot and reuses its vectors.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Optional[Path] = None,
+        max_entries: Optional[int] = None
+    ):
+        """Initialize embedding cache."""
+        self.model_name = model_name
+        self.cache_dir = cache_dir or settings.embedding_cache_dir
+        self.max_entries = max_entries or settings.embedding_cache_max_entries
+        self._lock = threading.Lock()
+        self._slot_dir: Optional[Path] = None
+        self._slot_lock_fd: Optional[int] = None
+
+        self._dim: Optional[int] = None
+        self._keys: Optional[np.memmap] = None
+        self._vectors: Optional[np.memmap] = None
+        self._ticks: Optional[np.memmap] = None
+        self._index: Dict[bytes, int] = {}
+        self._free_rows: List[int] = []
+        self._clock = 0
+
+        # Stats
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _key(self, text: str) -> bytes:
+        """Build the cache key for a text."""
+        payload = f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).digest()[:KEY_BYTES]
+
+    def _claim_slot(self) -> Path:
+        """Lock the first slot directory no other process is using."""
+        for slot in itertools.count():
+            slot_dir = self.cache_dir / f"slot_{slot}"
+            slot_dir.mkdir(parents=True, exist_ok=True)
+            fd = os.open(slot_dir / "lock", os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                continue
+            # Held until the process exits
+            self._slot_lock_fd = fd
+            return slot_dir
+
+    def _ensure_slot(self) -> None:
+        """Claim a slot and open its files on first use (caller holds the lock)."""
+        if self._slot_dir is None:
+            self._slot_dir = self._claim_slot()
+            self._open_existing()
+
+    def _open_existing(self) -> None:
+        """Open the cache files left by a previous run, if compatible."""
+        meta_file = self._slot_dir / "meta.json"
+        if not meta_file.exists():
+            return
+
+        try:
+            with open(meta_file, "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if meta.get("model_name") != self.model_name or meta.get("capacity") != self.max_entries:
+            # Settings changed, start from an empty cache
+            return
+
+        self._open_files(int(meta["dim"]), mode="r+")
+
+    def _open_files(self, dim: int, mode: str) -> None:
+        """Map the key, vector and clock matrices of this process's slot into memory."""
+        capacity = self.max_entries
+
+        self._keys = np.memmap(
+            self._slot_dir / "keys.bin", dtype=np.uint8, mode=mode, shape=(capacity, KEY_BYTES)
+        )
+        self._vectors = np.memmap(
+            self._slot_dir / "vectors.f32", dtype=np.float32, mode=mode, shape=(capacity, dim)
+        )
+        self._ticks = np.memmap(
+            self._slot_dir / "ticks.u64", dtype=np.uint64, mode=mode, shape=(capacity,)
+        )
+        self._dim = dim
+
+        # Rebuild the in-memory index (tick 0 marks an empty row)
+        used = np.flatnonzero(self._ticks)
+        self._index = {self._keys[row].tobytes(): int(row) for row in used}
+        self._free_rows = np.flatnonzero(self._ticks == 0)[::-1].tolist()
+        self._clock = int(self._ticks.max()) if len(used) else 0
+
+        if mode == "w+":
+            with open(self._slot_dir / "meta.json", "w") as f:
+                json.dump({"model_name": self.model_name, "dim": dim, "capacity": capacity}, f)
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up cached vectors, returning None for each miss."""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        with self._lock:
+            self._ensure_slot()
+            if self._vectors is None:
+                self._misses += len(texts)
+                return results
+
+            for i, text in enumerate(texts):
+                key = self._key(text)
+                row = self._index.get(key)
+
+                if row is not None:
+                    vector = np.array(self._vectors[row])
+                    # A row left half-written by a crash has a cleared or stale key
+                    if self._keys[row].tobytes() == key:
+                        self._clock += 1
+                        self._ticks[row] = self._clock
+                        results[i] = vector.tolist()
+                        self._hits += 1
+                        continue
+                    del self._index[key]
+
+                self._misses += 1
+
+        return results
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]) -> None:
+        """Store vectors for texts, evicting the least recently used entries when full."""
+        if not texts:
+            return
+
+        with self._lock:
+            self._ensure_slot()
+            if self._vectors is None:
+                self._open_files(len(vectors[0]), mode="w+")
+
+            for text, vector in zip(texts, vectors):
+                key = self._key(text)
+                row = self._index.get(key)
+                if row is None:
+                    row = self._allocate_row()
+                    self._index[key] = row
+
+                # Clear the old key before overwriting the vector and write the new
+                # key last, so a row interrupted mid-write never passes the key check
+                self._keys[row] = 0
+                self._vectors[row] = np.asarray(vector, dtype=np.float32)
+                self._keys[row] = np.frombuffer(key, dtype=np.uint8)
+                self._clock += 1
+                self._ticks[row] = self._clock
+
+    def _allocate_row(self) -> int:
+        """Get a free row, evicting a slice of the oldest entries if needed."""
+        if not self._free_rows:
+            # Evict ~1% at a time so eviction cost is amortized
+            count = max(1, self.max_entries // 100)
+            oldest = np.argpartition(self._ticks, count - 1)[:count]
+
+            for row in oldest.tolist():
+                self._index.pop(self._keys[row].tobytes(), None)
+                self._ticks[row] = 0
+                self._free_rows.append(row)
+            self._evictions += len(oldest)
+
+        return self._free_rows.pop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._index),
+            "capacity": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+        }
@@ -0,0 +1,389 @@
+"""Shared embedding engine used by all services."""
+
+import asyncio
+import importlib.util
+import resource
+import sys
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import get_settings
+from app.core.executors import get_io_executor
+from app.services.embedding_cache import EmbeddingCache
+
+if TYPE_CHECKING:
+    from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+settings = get_settings()
+
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "torch-int8")
+
+
+def _load_backend_model(model_name: str, backend: str) -> "HuggingFaceEmbeddings":
+    """Load a sentence-transformers model on the given inference backend."""
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend '{backend}', expected one of {', '.join(EMBEDDING_BACKENDS)}"
+        )
+
+    # Imported here, torch and sentence-transformers take seconds to import
+    from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+    if backend == "onnx":
+        missing = [
+            package for package in ("onnxruntime", "optimum")
+            if importlib.util.find_spec(package) is None
+        ]
+        if missing:
+            raise ImportError(
+                f"Embedding backend 'onnx' requires {', '.join(missing)}. "
+                "Install it with `pip install optimum[onnxruntime]`."
+            )
+        return HuggingFaceEmbeddings(
+            model_name=model_name,
+            model_kwargs={
+                "backend": "onnx",
+                "model_kwargs": {"file_name": settings.embedding_onnx_file},
+            }
+        )
+
+    model = HuggingFaceEmbeddings(model_name=model_name)
+    if backend == "torch-int8":
+        import torch
+
+        # Swap the fp32 linear layers (most of the compute) for int8 ones in place
+        torch.ao.quantization.quantize_dynamic(
+            model._client, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+    return model
+
+
+def _current_rss_bytes() -> int:
+    """Get the resident memory of this process in bytes."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        # Not on Linux, fall back to peak RSS (bytes on macOS, KB elsewhere)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _PendingRequest:
+    """A batch of texts waiting to be embedded."""
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.vectors: Optional[List[List[float]]] = None
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """Get the nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class MicroBatcher:
+    """
+    Asyncio micro-batcher for embedding requests.
+    Collects requests from all endpoints for a short window (or until
+    enough texts are queued) and encodes them in one batched call.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], List[List[float]]],
+        window_ms: Optional[float] = None,
+        max_texts: Optional[int] = None
+    ):
+        """Initialize micro-batcher."""
+        self._encode = encode
+        self.window_ms = settings.embedding_batch_window_ms if window_ms is None else window_ms
+        self.max_texts = max_texts or settings.embedding_batch_max_texts
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Stats
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._batches = 0
+        self._texts = 0
+        self._encode_seconds = 0.0
+
+    def _ensure_worker(self) -> None:
+        """Start the batching task on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Queue texts for the next batch and wait for their vectors."""
+        if not texts:
+            return []
+
+        self._ensure_worker()
+        start = time.perf_counter()
+        future = self._loop.create_future()
+        await self._queue.put((list(texts), future))
+        vectors = await future
+        self._latencies.append(time.perf_counter() - start)
+        return vectors
+
+    async def _run(self) -> None:
+        """Collect queued requests into batches and encode them."""
+        loop = asyncio.get_running_loop()
+        window = self.window_ms / 1000
+
+        while True:
+            batch = [await self._queue.get()]
+            count = len(batch[0][0])
+            deadline = loop.time() + window
+
+            while count < self.max_texts:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                count += len(item[0])
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[List[str], asyncio.Future]]) -> None:
+        """Encode one batch off the event loop and resolve each caller's future."""
+        all_texts = [text for texts, _ in batch for text in texts]
+
+        start = time.perf_counter()
+        try:
+            vectors = await asyncio.get_running_loop().run_in_executor(
+                get_io_executor(), self._encode, all_texts
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self._encode_seconds += time.perf_counter() - start
+        self._batches += 1
+        self._texts += len(all_texts)
+
+        offset = 0
+        for texts, future in batch:
+            if not future.done():
+                future.set_result(vectors[offset:offset + len(texts)])
+            offset += len(texts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get latency and throughput statistics."""
+        latencies = list(self._latencies)
+        return {
+            "window_ms": self.window_ms,
+            "max_texts": self.max_texts,
+            "batches": self._batches,
+            "texts": self._texts,
+            "avg_batch_size": round(self._texts / self._batches, 2) if self._batches else 0.0,
+            "latency_p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+            "latency_p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+            "texts_per_second": round(self._texts / self._encode_seconds, 2) if self._encode_seconds else 0.0,
+        }
+
+
+class EmbeddingEngine(Embeddings):
+    """
+    Process-wide embedding engine.
+    Owns the single embedding model of the worker and merges requests
+    that arrive while a forward pass is running into the next pass.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, backend: Optional[str] = None):
+        """Initialize embedding engine."""
+        self.model_name = model_name or settings.embedding_model
+        self.backend = backend or settings.embedding_backend
+        self._model: Optional["HuggingFaceEmbeddings"] = None
+        self._model_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending: List[_PendingRequest] = []
+        self._batcher = MicroBatcher(self.embed_documents)
+        self._cache: Optional[EmbeddingCache] = (
+            EmbeddingCache(self._cache_model_name()) if settings.embedding_cache_enabled else None
+        )
+
+        # Stats
+        self._load_seconds = 0.0
+        self._model_memory_bytes = 0
+        self._requests = 0
+        self._texts = 0
+        self._forward_passes = 0
+        self._encode_seconds = 0.0
+
+    def _cache_model_name(self) -> str:
+        """Get the model name cached vectors are stored under (vectors differ per backend)."""
+        return self.model_name if self.backend == "torch" else f"{self.model_name}@{self.backend}"
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the embedding model has been loaded."""
+        return self._model is not None
+
+    def warm_up(self) -> None:
+        """Load the model ahead of the first request."""
+        self._load_model()
+
+    def _load_model(self) -> "HuggingFaceEmbeddings":
+        """Load the embedding model once per process, on first use."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    rss_before = _current_rss_bytes()
+                    start = time.perf_counter()
+                    self._model = _load_backend_model(self.model_name, self.backend)
+                    self._load_seconds = time.perf_counter() - start
+                    self._model_memory_bytes = max(0, _current_rss_bytes() - rss_before)
+        return self._model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of texts, reusing cached vectors where possible."""
+        if not texts:
+            return []
+
+        if self._cache is None:
+            return self._embed_uncached(list(texts))
+
+        vectors = self._cache.get_many(texts)
+        missing = list(dict.fromkeys(
+            text for text, vector in zip(texts, vectors) if vector is None
+        ))
+
+        if missing:
+            new_vectors = self._embed_uncached(missing)
+            self._cache.put_many(missing, new_vectors)
+            computed = dict(zip(missing, new_vectors))
+            vectors = [
+                computed[text] if vector is None else vector
+                for text, vector in zip(texts, vectors)
+            ]
+
+        return vectors
+
+    def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in bounded forward passes."""
+        # A query arriving during an upload goes into the next pass instead
+        # of waiting for the upload's whole batch
+        size = settings.embedding_pass_max_texts
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), size):
+            vectors.extend(self._embed_pass(texts[start:start + size]))
+        return vectors
+
+    def _embed_pass(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, sharing the forward pass with concurrent callers."""
+        request = _PendingRequest(texts)
+        with self._pending_lock:
+            self._pending.append(request)
+
+        # Another caller may encode our texts while we wait for the lock
+        while not request.done:
+            with self._encode_lock:
+                if request.done:
+                    break
+                batch = self._take_pass()
+                try:
+                    self._encode_batch(batch)
+                except BaseException:
+                    # Callers in the batch raise the error from their own requests
+                    if request in batch:
+                        raise
+
+        if request.error is not None:
+            raise request.error
+        return request.vectors
+
+    def _take_pass(self) -> List[_PendingRequest]:
+        """Take the pending requests for the next pass, smallest (queries) first."""
+        with self._pending_lock:
+            self._pending.sort(key=lambda request: len(request.texts))
+            batch: List[_PendingRequest] = []
+            texts = 0
+            while self._pending and (
+                not batch or texts + len(self._pending[0].texts) <= settings.embedding_pass_max_texts
+            ):
+                texts += len(self._pending[0].texts)
+                batch.append(self._pending.pop(0))
+        return batch
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query text."""
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of texts through the micro-batcher."""
+        return await self._batcher.embed(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """Embed a single query text through the micro-batcher."""
+        return (await self._batcher.embed([text]))[0]
+
+    def _encode_batch(self, batch: List[_PendingRequest]) -> None:
+        """Run one forward pass for all pending requests and hand out the results."""
+        all_texts = [text for request in batch for text in request.texts]
+
+        try:
+            model = self._load_model()
+            start = time.perf_counter()
+            vectors = model.embed_documents(all_texts)
+            self._encode_seconds += time.perf_counter() - start
+        except BaseException as e:
+            for request in batch:
+                request.error = e
+                request.done = True
+            raise
+
+        self._forward_passes += 1
+        self._requests += len(batch)
+        self._texts += len(all_texts)
+
+        offset = 0
+        for request in batch:
+            request.vectors = vectors[offset:offset + len(request.texts)]
+            offset += len(request.texts)
+            request.done = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memory and throughput statistics."""
+        return {
+            "model_name": self.model_name,
+            "backend": self.backend,
+            "model_loaded": self._model is not None,
+            "model_load_seconds": round(self._load_seconds, 3),
+            "model_memory_bytes": self._model_memory_bytes,
+            "process_rss_bytes": _current_rss_bytes(),
+            "requests": self._requests,
+            "texts": self._texts,
+            "forward_passes": self._forward_passes,
+            "avg_batch_size": round(self._texts / self._forward_passes, 2) if self._forward_passes else 0.0,
+            "encode_seconds": round(self._encode_seconds, 3),
+            "texts_per_second": round(self._texts / self._encode_seconds, 2) if self._encode_seconds else 0.0,
+            "micro_batching": self._batcher.get_stats(),
+            "cache": self._cache.get_stats() if self._cache else None,
+        }
+
+
+# Global instance
+embedding_engine = EmbeddingEngine()
@@ -0,0 +1,351 @@
+"""Background ingestion jobs persisted in SQLite."""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.executors import run_io
+from app.services.transcription import transcription_service
+from app.services.vectorstore import vectorstore_service
+from app.workers.pdf import count_pdf_pages
+
+settings = get_settings()
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SUPERSEDED = "superseded"
+
+# Job kinds writing to the same vector store of a folder
+FOLDER_NAMESPACES = {"pdf": "uploaded_doc", "video": "uploaded_doc", "notes": "notes"}
+
+
+class IngestionJobService:
+    """
+    Queue of upload processing jobs.
+    Jobs are stored in SQLite so queued and interrupted jobs are picked up
+    again after a restart. A fixed number of workers runs them, and each
+    processing step holds a per-resource slot (ffmpeg, vosk, embeddings).
+    Jobs of the same folder run one at a time, and a new upload supersedes
+    the folder's jobs that have not started yet.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """Initialize ingestion job service."""
+        self.db_path = db_path or settings.jobs_db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._folder_locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]] = {
+            "pdf": self._run_pdf,
+            "video": self._run_video,
+            "notes": self._run_notes,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the job database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    folder_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a job row to its API representation."""
+        def timestamp(value: float) -> str:
+            return datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
+
+        return {
+            "job_id": row["job_id"],
+            "kind": row["kind"],
+            "user_id": row["user_id"],
+            "folder_id": row["folder_id"],
+            "status": row["status"],
+            "progress": round(row["progress"], 1),
+            "error": row["error"],
+            "created_at": timestamp(row["created_at"]),
+            "updated_at": timestamp(row["updated_at"]),
+        }
+
+    def _insert_job(self, kind: str, user_id: str, folder_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a new queued job, superseding queued jobs of the same folder."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        kinds = [other for other, namespace in FOLDER_NAMESPACES.items() if namespace == FOLDER_NAMESPACES[kind]]
+        with self._lock:
+            conn = self._connect()
+            superseded = conn.execute(
+                f"SELECT job_id, payload FROM jobs WHERE user_id = ? AND folder_id = ? AND status = ? "
+                f"AND kind IN ({', '.join('?' for _ in kinds)})",
+                (user_id, folder_id, QUEUED, *kinds)
+            ).fetchall()
+            for old in superseded:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ?",
+                    (SUPERSEDED, f"Superseded by job {job_id}", now, old["job_id"])
+                )
+            conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, 0, NULL, ?, ?)",
+                (job_id, kind, user_id, folder_id, json.dumps(payload), QUEUED, now, now)
+            )
+            conn.commit()
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+        # Superseded jobs never start, so their copies of the upload are not needed
+        for old in superseded:
+            self._discard_files(json.loads(old["payload"]))
+        return self._to_job(row)
+
+    def _discard_files(self, payload: Dict[str, Any]) -> None:
+        """Remove the files saved for a single job."""
+        # Jobs queued before uploads were staged point at the folder's stored file
+        if "upload_path" not in payload:
+            return
+        for name in ("file_path", "audio_path"):
+            if name in payload:
+                Path(payload[name]).unlink(missing_ok=True)
+
+    def _claim_job(self, job_id: str) -> bool:
+        """Mark a queued job as running; False if it was superseded meanwhile."""
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, progress = 0, updated_at = ? WHERE job_id = ? AND status = ?",
+                (RUNNING, time.time(), job_id, QUEUED)
+            )
+            conn.commit()
+        return cursor.rowcount == 1
+
+    def _load_job(self, job_id: str) -> Optional[sqlite3.Row]:
+        """Get the stored row of a job."""
+        with self._lock:
+            return self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+    def _update_job(self, job_id: str, **fields: Any) -> None:
+        """Update status, progress or error of a job."""
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            conn = self._connect()
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+            conn.commit()
+
+    def _requeue_unfinished(self) -> List[str]:
+        """Mark jobs interrupted by a restart as queued and list every queued job in order."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE jobs SET status = ?, progress = 0, updated_at = ? WHERE status = ?",
+                (QUEUED, time.time(), RUNNING)
+            )
+            conn.commit()
+            rows = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        return [row["job_id"] for row in rows]
+
+    async def start(self) -> None:
+        """Start the job workers and resume jobs left over from the last run."""
+        if self._queue is not None:
+            return
+
+        self._queue = asyncio.Queue()
+        self._semaphores = {
+            "ffmpeg": asyncio.Semaphore(settings.job_ffmpeg_concurrency),
+            "vosk": asyncio.Semaphore(settings.job_vosk_concurrency),
+            "embeddings": asyncio.Semaphore(settings.job_embedding_concurrency),
+        }
+        for job_id in await run_io(self._requeue_unfinished):
+            self._queue.put_nowait(job_id)
+
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(settings.job_workers)]
+
+    async def stop(self) -> None:
+        """Stop the job workers (running jobs are resumed on the next start)."""
+        workers, self._workers = self._workers, []
+        self._queue = None
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def submit(
+        self,
+        kind: str,
+        user_id: str,
+        folder_id: str,
+        payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Queue a job and return its initial status."""
+        await self.start()
+        job = await run_io(self._insert_job, kind, user_id, folder_id, payload)
+        self._queue.put_nowait(job["job_id"])
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get the status of a job, or None if it does not exist."""
+        row = await run_io(self._load_job, job_id)
+        return self._to_job(row) if row is not None else None
+
+    @asynccontextmanager
+    async def _limit(self, resource: str) -> AsyncIterator[None]:
+        """Hold one slot of a limited resource."""
+        async with self._semaphores[resource]:
+            yield
+
+    def _folder_lock(self, row: sqlite3.Row) -> asyncio.Lock:
+        """Get the lock serializing jobs that write the same folder's vector store."""
+        key = (row["user_id"], row["folder_id"], FOLDER_NAMESPACES[row["kind"]])
+        return self._folder_locks.setdefault(key, asyncio.Lock())
+
+    async def _worker(self) -> None:
+        """Run queued jobs one at a time."""
+        while True:
+            job_id = await self._queue.get()
+            row = await run_io(self._load_job, job_id)
+            if row is None or row["status"] != QUEUED:
+                continue
+
+            async with self._folder_lock(row):
+                # A newer upload may have superseded the job while it waited for the folder
+                if not await run_io(self._claim_job, job_id):
+                    continue
+
+                # Cancellation (shutdown) skips both branches, so the staged
+                # files stay for the job to resume on the next start
+                try:
+                    await self._handlers[row["kind"]](dict(row))
+                except Exception as e:
+                    print("Error in ingestion job: ", e)
+                    await run_io(self._update_job, job_id, status=FAILED, error=str(e))
+                else:
+                    await run_io(self._update_job, job_id, status=SUCCEEDED, progress=100)
+                await run_io(self._discard_files, json.loads(row["payload"]))
+
+    def _update_progress(self, job_id: str, progress: float) -> None:
+        """Record the progress of a job unless it has already finished."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                (min(progress, 99.0), time.time(), job_id, RUNNING)
+            )
+            conn.commit()
+
+    async def _set_progress(self, job_id: str, progress: float) -> None:
+        """Record the progress of a running job in percent."""
+        await run_io(self._update_progress, job_id, progress)
+
+    def _publish_upload(self, payload: Dict[str, Any]) -> None:
+        """Store an indexed upload as the folder's file (read when re-indexing a video)."""
+        if "upload_path" in payload:
+            upload_path = Path(payload["upload_path"])
+            upload_path.parent.mkdir(parents=True, exist_ok=True)
+            Path(payload["file_path"]).replace(upload_path)
+
+    async def _run_pdf(self, job: Dict[str, Any]) -> None:
+        """Parse, embed and index an uploaded PDF."""
+        payload = json.loads(job["payload"])
+        file_path = Path(payload["file_path"])
+        total_pages = max(1, await run_io(count_pdf_pages, str(file_path)))
+        loop = asyncio.get_running_loop()
+        updates = set()
+
+        def progress(pages: int, chunks: int) -> None:
+            update = loop.create_task(self._set_progress(job["job_id"], 100 * pages / total_pages))
+            updates.add(update)
+            update.add_done_callback(updates.discard)
+
+        async with self._limit("embeddings"):
+            await vectorstore_service.create_vectorstore_from_pdf(
+                file_path,
+                Path(payload["vector_db_path"]),
+                progress
+            )
+        await run_io(self._publish_upload, payload)
+
+    async def _run_video(self, job: Dict[str, Any]) -> None:
+        """Extract audio, transcribe and index an uploaded video."""
+        payload = json.loads(job["payload"])
+        audio_path = Path(payload["audio_path"])
+
+        if settings.transcription_mode == "stream":
+            duration = await transcription_service.probe_duration(Path(payload["file_path"]))
+            loop = asyncio.get_running_loop()
+            updates = set()
+
+            def progress(seconds: float) -> None:
+                # Without a known duration the job stays at 0% until done
+                if duration:
+                    update = loop.create_task(self._set_progress(job["job_id"], 100 * seconds / duration))
+                    updates.add(update)
+                    update.add_done_callback(updates.discard)
+
+            # Decoding, recognition and embedding run at the same time
+            async with self._limit("ffmpeg"), self._limit("vosk"), self._limit("embeddings"):
+                await vectorstore_service.create_vectorstore_from_video(
+                    Path(payload["file_path"]),
+                    Path(payload["vector_db_path"]),
+                    audio_path,
+                    progress
+                )
+            await run_io(self._publish_upload, payload)
+            return
+
+        async with self._limit("ffmpeg"):
+            await transcription_service.extract_audio_from_video(Path(payload["file_path"]), audio_path)
+        await self._set_progress(job["job_id"], 20)
+
+        async with self._limit("vosk"):
+            words = await transcription_service.transcribe_audio_words(audio_path)
+        await self._set_progress(job["job_id"], 80)
+
+        async with self._limit("embeddings"):
+            await vectorstore_service.create_vectorstore_from_transcript(
+                words,
+                Path(payload["vector_db_path"])
+            )
+        await run_io(self._publish_upload, payload)
+
+    async def _run_notes(self, job: Dict[str, Any]) -> None:
+        """Embed and index uploaded notes."""
+        payload = json.loads(job["payload"])
+
+        async with self._limit("embeddings"):
+            await vectorstore_service.create_vectorstore_from_text(
+                payload["notes"],
+                Path(payload["vector_db_path"])
+            )
+
+
+# Global instance
+ingestion_job_service = IngestionJobService()
@@ -0,0 +1,123 @@
+"""Corpus keyword statistics for keyword extraction."""
+
+import json
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from app.utils import FileCache
+
+KEYWORD_STATS_FILE = "keyword_stats.json"
+
+# Runs of letters/digits starting with a letter, at least two characters long
+TOKEN_PATTERN = re.compile(r"[^\W\d_][^\W_]+")
+
+
+@lru_cache(maxsize=1)
+def get_stopwords() -> FrozenSet[str]:
+    """Load the English stopword set once per process."""
+    import nltk
+
+    try:
+        nltk.data.find("corpora/stopwords")
+    except LookupError:
+        nltk.download("stopwords", quiet=True)
+
+    try:
+        from nltk.corpus import stopwords
+
+        return frozenset(stopwords.words("english"))
+    except LookupError:
+        # NLTK data could not be downloaded, use scikit-learn's built-in list
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+        return frozenset(ENGLISH_STOP_WORDS)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, dropping stopwords and numbers."""
+    stop_words = get_stopwords()
+    return [term for term in TOKEN_PATTERN.findall(text.lower()) if term not in stop_words]
+
+
+class KeywordStats:
+    """Document frequencies of terms over the chunks of one vector store."""
+
+    def __init__(self, num_chunks: int = 0, document_frequencies: Optional[Dict[str, int]] = None):
+        """Initialize keyword statistics."""
+        self.num_chunks = num_chunks
+        self.document_frequencies: Counter = Counter(document_frequencies or {})
+
+    def add(self, texts: Iterable[str]) -> None:
+        """Count the terms of new chunks."""
+        for text in texts:
+            self.document_frequencies.update(set(tokenize(text)))
+            self.num_chunks += 1
+
+    def remove(self, texts: Iterable[str]) -> None:
+        """Uncount the terms of deleted chunks."""
+        for text in texts:
+            self.document_frequencies.subtract(set(tokenize(text)))
+            self.num_chunks = max(0, self.num_chunks - 1)
+        self.document_frequencies = +self.document_frequencies  # drop zero counts
+
+    def idf(self, term: str) -> float:
+        """Get the smoothed inverse document frequency of a term."""
+        return math.log((self.num_chunks + 1) / (self.document_frequencies.get(term, 0) + 1)) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize statistics for storage."""
+        return {"num_chunks": self.num_chunks, "document_frequencies": dict(self.document_frequencies)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KeywordStats":
+        """Load statistics from their stored form."""
+        return cls(data["num_chunks"], data["document_frequencies"])
+
+
+def extract_keywords(
+    terms: List[str],
+    stats: Optional[KeywordStats],
+    top_n: int
+) -> List[str]:
+    """Rank terms by tf-idf against the corpus statistics (term frequency only without them)."""
+    counts = Counter(terms)
+    if stats is None:
+        scores = counts
+    else:
+        scores = {term: count * stats.idf(term) for term, count in counts.items()}
+    return [term for term, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_n]]
+
+
+class KeywordStatsStore:
+    """Reads and writes the keyword statistics stored next to each vector store."""
+
+    def __init__(self, max_cached: int = 64):
+        """Initialize keyword statistics store."""
+        self._cache: FileCache[KeywordStats] = FileCache(max_cached)
+
+    def save(self, actual_db_path: Path, stats: KeywordStats) -> None:
+        """Write the statistics of a versioned database directory."""
+        stats_file = actual_db_path / KEYWORD_STATS_FILE
+        tmp_file = stats_file.with_suffix(".tmp")
+        actual_db_path.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, 'w') as f:
+            json.dump(stats.to_dict(), f)
+        tmp_file.replace(stats_file)
+
+    def load(self, actual_db_path: Path) -> Optional[KeywordStats]:
+        """Get the statistics of a versioned database directory, or None if there are none."""
+        stats_file = actual_db_path / KEYWORD_STATS_FILE
+
+        def read() -> KeywordStats:
+            with open(stats_file, 'r') as f:
+                return KeywordStats.from_dict(json.load(f))
+
+        return self._cache.get(str(actual_db_path), [stats_file], read)
+
+
+# Global instance
+keyword_stats_store = KeywordStatsStore()
@@ -1,13 +1,22 @@
 """LLM service for chat and analysis operations."""
 
-from typing import List
+import asyncio
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from langchain.output_parsers import ResponseSchema, StructuredOutputParser
-from langchain_openai import ChatOpenAI
+import httpx
 
 from app.core.config import get_settings
+from app.core.executors import run_io
+from app.services.chat_cache import SemanticChatCache
+from app.services.embeddings import embedding_engine
+from app.services.topic_cache import TopicExplanationCache
 from app.services.vectorstore import vectorstore_service
-from app.utils.file_utils import remove_markdown_formatting
+from app.utils.file_utils import MarkdownStreamCleaner, remove_markdown_formatting
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 settings = get_settings()
 
@@ -16,22 +25,88 @@ class LLMService:
     """Service for LLM operations."""
     def __init__(self):
         """Initialize LLM service."""
-        self.llm = self._initialize_llm()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._llm: Optional["ChatOpenAI"] = None
+        self._topic_cache: Optional[TopicExplanationCache] = (
+            TopicExplanationCache() if settings.topic_cache_enabled else None
+        )
+        self._chat_cache: Optional[SemanticChatCache] = (
+            SemanticChatCache() if settings.chat_cache_enabled else None
+        )
+        
+        # Stats
+        self._in_flight = 0
+        self._waiting = 0
+        self._max_waiting = 0
+        self._requests = 0
+    
+    @property
+    def llm(self) -> "ChatOpenAI":
+        """Get the LLM client, creating it on first use."""
+        if self._llm is None:
+            self._llm = self._initialize_llm()
+        return self._llm
+    
+    @property
+    def is_ready(self) -> bool:
+        """Whether the LLM client has been created."""
+        return self._llm is not None
     
-    def _initialize_llm(self) -> ChatOpenAI:
-        """Initialize the LLM client."""
+    def warm_up(self) -> None:
+        """Create the LLM client ahead of the first request."""
+        _ = self.llm
+    
+    def _initialize_llm(self) -> "ChatOpenAI":
+        """Initialize the LLM client over one shared keep-alive connection pool."""
+        from langchain_openai import ChatOpenAI
+        
+        limits = httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry
+        )
+        timeout = httpx.Timeout(settings.llm_timeout)
+        
         return ChatOpenAI(
             model=settings.default_model,
             openai_api_key=settings.openrouter_api_key,
-            openai_api_base=settings.openrouter_base_url
+            openai_api_base=settings.openrouter_base_url,
+            http_client=httpx.Client(limits=limits, timeout=timeout),
+            http_async_client=httpx.AsyncClient(limits=limits, timeout=timeout)
         )
     
-    async def chat(self, query: str, vector_db_path: str) -> str:
-        """Chat with the LLM using vector database context."""
-        from pathlib import Path
+    @asynccontextmanager
+    async def _limit(self) -> AsyncIterator[None]:
+        """Cap the number of in-flight requests to the LLM provider."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
         
+        self._waiting += 1
+        self._max_waiting = max(self._max_waiting, self._waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        
+        self._in_flight += 1
+        self._requests += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+    
+    async def _run_qa_chain(self, query: str, vector_db_path: Path) -> dict:
+        """Build the RetrievalQA chain for a vector store and run it."""
+        # Opening the vector store touches disk, keep it off the event loop
+        chain = await run_io(vectorstore_service.create_qa_chain, self.llm, vector_db_path)
+        async with self._limit():
+            return await chain.ainvoke({"query": query})
+    
+    def _build_chat_query(self, query: str) -> str:
+        """Wrap the student's question in the tutor instructions."""
         # Enhanced system prompt for chat functionality
-        enhanced_query = f"""You are an AI tutor specialized in helping students learn and understand academic material. Your role is to:
+        return f"""You are an AI tutor specialized in helping students learn and understand academic material. Your role is to:
 
 1. Explain concepts clearly and at an appropriate level for the student
 2. Provide helpful, encouraging, and educational responses
@@ -53,23 +128,106 @@ Always maintain a friendly, professional, and educational tone. Focus on helping
 Student's question: {query}
 
 Please provide a clear, educational response in plain text format based on the provided context material."""
+    
+    async def _lookup_chat_cache(
+        self, 
+        query: str, 
+        vector_db_path: str
+    ) -> Tuple[Optional[str], Optional[Tuple]]:
+        """
+        Look for a cached answer to a similar question on the same folder.
+        Returns (answer, None) on a hit, or (None, entry) where entry is passed
+        to _store_chat_answer once the answer has been generated.
+        """
+        if self._chat_cache is None:
+            return None, None
         
-        chain = vectorstore_service.create_qa_chain(
-            self.llm, 
-            Path(vector_db_path)
-        )
+        version = await run_io(vectorstore_service.get_version, Path(vector_db_path))
+        query_vector = await embedding_engine.aembed_query(query)
+        
+        hit = self._chat_cache.get(vector_db_path, version, query_vector)
+        if hit is not None:
+            return hit[0], None
+        return None, (vector_db_path, version, query, query_vector)
+    
+    def _store_chat_answer(self, entry: Optional[Tuple], answer: str) -> None:
+        """Cache a generated answer for similar future questions."""
+        if entry is not None and answer:
+            self._chat_cache.put(*entry, answer)
+    
+    async def chat(self, query: str, vector_db_path: str) -> str:
+        """Chat with the LLM using vector database context."""
+        cached_answer, cache_entry = await self._lookup_chat_cache(query, vector_db_path)
+        if cached_answer is not None:
+            return cached_answer
+        
+        enhanced_query = self._build_chat_query(query)
         
-        response = chain.invoke({"query": enhanced_query})
+        response = await self._run_qa_chain(enhanced_query, Path(vector_db_path))
         # Remove any markdown formatting from the response if configured
+        answer = response["result"]
         if settings.remove_markdown_formatting:
-            clean_response = remove_markdown_formatting(response["result"])
-            return clean_response
-        return response["result"]
+            answer = remove_markdown_formatting(answer)
+        
+        self._store_chat_answer(cache_entry, answer)
+        return answer
+    
+    async def stream_chat(
+        self, 
+        query: str, 
+        vector_db_path: str
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Stream a chat answer as ("token", text) events followed by ("done", full text).
+        Uses the same retrieval and prompt as the RetrievalQA "stuff" chain.
+        """
+        cached_answer, cache_entry = await self._lookup_chat_cache(query, vector_db_path)
+        if cached_answer is not None:
+            yield "token", cached_answer
+            yield "done", cached_answer
+            return
+        
+        enhanced_query = self._build_chat_query(query)
+        
+        retriever = await run_io(vectorstore_service.get_retriever, Path(vector_db_path))
+        documents = await retriever.ainvoke(enhanced_query)
+        
+        from langchain.chains.question_answering.stuff_prompt import PROMPT_SELECTOR
+        
+        prompt = PROMPT_SELECTOR.get_prompt(self.llm)
+        messages = prompt.format_messages(
+            context="\n\n".join(document.page_content for document in documents),
+            question=enhanced_query
+        )
+        
+        cleaner = MarkdownStreamCleaner(enabled=settings.remove_markdown_formatting)
+        async with self._limit():
+            async for chunk in self.llm.astream(messages):
+                delta = cleaner.feed(chunk.content)
+                if delta:
+                    yield "token", delta
+        
+        delta, final_text = cleaner.finish()
+        if delta:
+            yield "token", delta
+        
+        self._store_chat_answer(cache_entry, final_text)
+        yield "done", final_text
     
     async def get_topic_explanation(self, title: str, vector_db_path: str) -> str:
-        """Get explanation for a specific topic."""
-        from pathlib import Path
+        """Get explanation for a specific topic, reusing it while the folder is unchanged."""
+        if self._topic_cache is None:
+            return await self._generate_topic_explanation(title, vector_db_path)
         
+        version = await run_io(vectorstore_service.get_version, Path(vector_db_path))
+        explanation = await run_io(self._topic_cache.get, vector_db_path, version, title)
+        if explanation is None:
+            explanation = await self._generate_topic_explanation(title, vector_db_path)
+            await run_io(self._topic_cache.put, vector_db_path, version, title, explanation)
+        return explanation
+    
+    async def _generate_topic_explanation(self, title: str, vector_db_path: str) -> str:
+        """Generate explanation for a specific topic."""
         # Enhanced prompt for topic explanation
         enhanced_query = f"""You are an AI tutor creating comprehensive study material. Please provide a detailed yet clear explanation of the topic: "{title}"
 
@@ -89,12 +247,7 @@ IMPORTANT FORMATTING RULES:
 
 Please explain "{title}" in plain text format in a way that would help a student learn and understand this topic thoroughly."""
         
-        chain = vectorstore_service.create_qa_chain(
-            self.llm, 
-            Path(vector_db_path)
-        )
-        
-        response = chain.invoke({"query": enhanced_query})
+        response = await self._run_qa_chain(enhanced_query, Path(vector_db_path))
         # Remove any markdown formatting from the response if configured
         if settings.remove_markdown_formatting:
             clean_response = remove_markdown_formatting(response["result"])
@@ -129,7 +282,8 @@ Provide your feedback in a supportive, educational manner that encourages learni
 
 **Your feedback:**"""
         
-        response = self.llm.invoke(prompt)
+        async with self._limit():
+            response = await self.llm.ainvoke(prompt)
         # Remove any markdown formatting from the response if configured
         if settings.remove_markdown_formatting:
             clean_response = remove_markdown_formatting(response.content)
@@ -142,6 +296,8 @@ Provide your feedback in a supportive, educational manner that encourages learni
         reference_text: str
     ) -> List[str]:
         """Generate study roadmap based on missing keywords."""
+        from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+        
         schema = [
             ResponseSchema(name="topics", description="List of study topics")
         ]
@@ -177,7 +333,8 @@ Please provide your response in exactly this JSON format:
 
 Your study roadmap:"""
         
-        response = self.llm.predict(prompt)
+        async with self._limit():
+            response = (await self.llm.ainvoke(prompt)).content
         try:
             parsed = parser.parse(response)
             return parsed["topics"]
@@ -198,6 +355,19 @@ Your study roadmap:"""
                 "Self-assess understanding and identify remaining gaps"
             ]
 
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get concurrency and queue-depth statistics."""
+        return {
+            "max_concurrency": settings.llm_max_concurrency,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_waiting": self._max_waiting,
+            "requests": self._requests,
+            "topic_cache": self._topic_cache.get_stats() if self._topic_cache else None,
+            "chat_cache": self._chat_cache.get_stats() if self._chat_cache else None,
+        }
+
 
 # Global instance
 llm_service = LLMService()
\ No newline at end of file
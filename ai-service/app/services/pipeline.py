@@ -0,0 +1,88 @@
+"""Small DAG executor for multi-stage request pipelines."""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+
+class Stage:
+    """A pipeline stage and the stages whose results it needs."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Awaitable[Any]],
+        depends_on: Sequence[str] = ()
+    ):
+        """Initialize stage."""
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+class Pipeline:
+    """
+    Run stages as soon as their dependencies have finished.
+    Independent stages run concurrently; blocking work inside a stage
+    should be handed to the worker pools (run_io / run_cpu).
+    """
+
+    def __init__(self, stages: List[Stage]):
+        """Initialize pipeline and check the stage graph."""
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+
+        for stage in stages:
+            unknown = [name for name in stage.depends_on if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {unknown}")
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        """Raise if the stages cannot be ordered."""
+        done: set = set()
+        remaining = dict(self.stages)
+        while remaining:
+            ready = [name for name, stage in remaining.items() if set(stage.depends_on) <= done]
+            if not ready:
+                raise ValueError(f"Stage dependencies contain a cycle: {sorted(remaining)}")
+            for name in ready:
+                done.add(name)
+                del remaining[name]
+
+    async def stream(self) -> AsyncIterator[Tuple[str, Any, float]]:
+        """Run the pipeline, yielding (stage, result, seconds) as each stage finishes."""
+        results: Dict[str, Any] = {}
+        pending = dict(self.stages)
+        running: Dict[asyncio.Task, str] = {}
+
+        async def timed(stage: Stage) -> Tuple[Any, float]:
+            start = time.perf_counter()
+            result = await stage.func(results)
+            return result, time.perf_counter() - start
+
+        try:
+            while pending or running:
+                for name in [name for name, stage in pending.items() if set(stage.depends_on) <= results.keys()]:
+                    running[asyncio.ensure_future(timed(pending.pop(name)))] = name
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    name = running.pop(task)
+                    result, seconds = task.result()
+                    results[name] = result
+                    yield name, result, seconds
+        finally:
+            # A stage failed or the consumer went away, stop the rest
+            for task in running:
+                task.cancel()
+
+    async def run(self) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        """Run the pipeline to completion, returning (results, seconds per stage)."""
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        async for name, result, seconds in self.stream():
+            results[name] = result
+            timings[name] = seconds
+        return results, timings
@@ -0,0 +1,346 @@
+"""BM25 inverted index stored next to each vector store, and hybrid retrieval."""
+
+import json
+import math
+import shutil
+import uuid
+from collections import Counter
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from app.services.keywords import tokenize
+from app.utils import FileCache
+
+SPARSE_INDEX_DIR = "bm25"
+DELTA_FILE = "delta.json"
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Merge the delta into the main segment once it holds this many changes, or this share of the chunks
+DELTA_MERGE_MIN_CHANGES = 64
+DELTA_MERGE_RATIO = 0.2
+
+
+class SparseIndexBuilder:
+    """Collects term frequencies of chunks and writes them as a compressed-row inverted index."""
+
+    def __init__(self):
+        """Initialize sparse index builder."""
+        self._vocabulary: Dict[str, int] = {}
+        self._chunk_ids: List[str] = []
+        self._doc_ids: List[np.ndarray] = []
+        self._term_ids: List[np.ndarray] = []
+        self._term_freqs: List[np.ndarray] = []
+        self._doc_lengths: List[int] = []
+
+    def add(self, ids: List[str], texts: List[str]) -> None:
+        """Add chunks by id; only their term counts are kept in memory."""
+        for chunk_id, text in zip(ids, texts):
+            terms = tokenize(text)
+            self._add_counts(chunk_id, Counter(terms), len(terms))
+
+    def _add_counts(self, chunk_id: str, counts: Dict[str, int], length: int) -> None:
+        """Add one chunk from its term counts."""
+        self._doc_ids.append(np.full(len(counts), len(self._chunk_ids), dtype=np.int32))
+        self._term_ids.append(np.fromiter(
+            (self._vocabulary.setdefault(term, len(self._vocabulary)) for term in counts),
+            dtype=np.int32,
+            count=len(counts)
+        ))
+        self._term_freqs.append(np.fromiter(
+            (min(count, np.iinfo(np.uint16).max) for count in counts.values()),
+            dtype=np.uint16,
+            count=len(counts)
+        ))
+        self._chunk_ids.append(chunk_id)
+        self._doc_lengths.append(length)
+
+    def add_index(self, index: "SparseIndex") -> None:
+        """Add the live chunks of an opened index without tokenizing them again."""
+        # Postings of the main segment, dropping deleted chunks and renumbering the rest
+        live = index.live[:index.main_docs]
+        term_of_posting = np.repeat(
+            np.arange(len(index.terms), dtype=np.int32),
+            np.diff(index.offsets)
+        )
+        keep = live[index.doc_ids]
+        term_map = np.fromiter(
+            (self._vocabulary.setdefault(term, len(self._vocabulary)) for term in index.terms),
+            dtype=np.int32,
+            count=len(index.terms)
+        )
+        renumbered = (np.cumsum(live) - 1 + len(self._chunk_ids)).astype(np.int32)
+
+        self._doc_ids.append(renumbered[index.doc_ids[keep]])
+        self._term_ids.append(term_map[term_of_posting[keep]])
+        self._term_freqs.append(np.asarray(index.term_freqs[keep], dtype=np.uint16))
+        self._chunk_ids.extend(chunk_id for chunk_id, alive in zip(index.chunk_ids, live) if alive)
+        self._doc_lengths.extend(index.doc_lengths[:index.main_docs][live].astype(int).tolist())
+
+        for chunk_id, chunk in index.delta["chunks"].items():
+            self._add_counts(chunk_id, chunk["terms"], chunk["length"])
+
+    def write(self, index_dir: Path) -> None:
+        """Write the index files into index_dir."""
+        num_docs = len(self._chunk_ids)
+        num_terms = len(self._vocabulary)
+        doc_ids = np.concatenate(self._doc_ids) if self._doc_ids else np.zeros(0, dtype=np.int32)
+        term_ids = np.concatenate(self._term_ids) if self._term_ids else np.zeros(0, dtype=np.int32)
+        term_freqs = np.concatenate(self._term_freqs) if self._term_freqs else np.zeros(0, dtype=np.uint16)
+
+        # Group postings by term; a stable sort keeps each posting list in document order
+        order = np.argsort(term_ids, kind="stable")
+        offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=num_terms), out=offsets[1:])
+
+        index_dir.mkdir(parents=True, exist_ok=True)
+        np.save(index_dir / "offsets.npy", offsets)
+        np.save(index_dir / "doc_ids.npy", doc_ids[order])
+        np.save(index_dir / "term_freqs.npy", term_freqs[order])
+        np.save(index_dir / "doc_lengths.npy", np.asarray(self._doc_lengths, dtype=np.int32))
+        with open(index_dir / "terms.json", 'w') as f:
+            json.dump(list(self._vocabulary), f)
+        with open(index_dir / "chunk_ids.json", 'w') as f:
+            json.dump(self._chunk_ids, f)
+        # Written last, a directory without it is incomplete
+        with open(index_dir / "meta.json", 'w') as f:
+            json.dump({"num_docs": num_docs, "num_terms": num_terms}, f)
+
+
+def _empty_delta() -> Dict[str, Any]:
+    """Get a delta segment without changes."""
+    return {"tombstones": [], "chunks": {}}
+
+
+class SparseIndex:
+    """
+    Read-only BM25 index with memory-mapped posting lists.
+    Chunks changed since the last full write live in a small delta segment:
+    new chunks with their term counts, and tombstones hiding deleted chunks
+    of the main segment. Both segments are scored as one collection.
+    """
+
+    def __init__(self, index_dir: Path):
+        """Open an index written by SparseIndexBuilder, with its delta segment if any."""
+        with open(index_dir / "meta.json", 'r') as f:
+            self.main_docs = json.load(f)["num_docs"]
+        with open(index_dir / "terms.json", 'r') as f:
+            self.terms: List[str] = json.load(f)
+        with open(index_dir / "chunk_ids.json", 'r') as f:
+            self.chunk_ids: List[str] = json.load(f)
+        try:
+            with open(index_dir / DELTA_FILE, 'r') as f:
+                self.delta: Dict[str, Any] = json.load(f)
+        except FileNotFoundError:
+            self.delta = _empty_delta()
+
+        self._vocabulary = {term: term_id for term_id, term in enumerate(self.terms)}
+        self.offsets = np.load(index_dir / "offsets.npy", mmap_mode="r")
+        self.doc_ids = np.load(index_dir / "doc_ids.npy", mmap_mode="r")
+        self.term_freqs = np.load(index_dir / "term_freqs.npy", mmap_mode="r")
+
+        # Delta chunks are numbered after the main segment
+        delta_chunks = self.delta["chunks"]
+        self.chunk_ids = self.chunk_ids + list(delta_chunks)
+        self.doc_lengths = np.concatenate([
+            np.load(index_dir / "doc_lengths.npy"),
+            np.fromiter((chunk["length"] for chunk in delta_chunks.values()), dtype=np.int32, count=len(delta_chunks))
+        ])
+        self._delta_postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for doc, chunk in enumerate(delta_chunks.values(), start=self.main_docs):
+            for term, count in chunk["terms"].items():
+                docs, counts = self._delta_postings.setdefault(term, ([], []))
+                docs.append(doc)
+                counts.append(count)
+
+        self.live = np.ones(len(self.chunk_ids), dtype=bool)
+        self._has_tombstones = bool(self.delta["tombstones"])
+        if self._has_tombstones:
+            positions = {chunk_id: doc for doc, chunk_id in enumerate(self.chunk_ids[:self.main_docs])}
+            self.live[[positions[chunk_id] for chunk_id in self.delta["tombstones"] if chunk_id in positions]] = False
+        self.num_docs = int(self.live.sum())
+
+        # Per-document length normalization of BM25, computed once
+        doc_lengths = self.doc_lengths.astype(np.float32)
+        average_length = float(doc_lengths[self.live].mean()) if self.num_docs else 0.0
+        self._length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / (average_length or 1.0))
+
+    @property
+    def delta_changes(self) -> int:
+        """Count the chunks added or deleted since the main segment was written."""
+        return len(self.delta["chunks"]) + len(self.delta["tombstones"])
+
+    def contains_main(self, chunk_id: str) -> bool:
+        """Check whether a chunk is stored in the main segment."""
+        return chunk_id in self._main_chunk_ids
+
+    @cached_property
+    def _main_chunk_ids(self) -> FrozenSet[str]:
+        """Ids of the main segment's chunks, built on first use."""
+        return frozenset(self.chunk_ids[:self.main_docs])
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Get the (chunk id, BM25 score) of the k best matching chunks."""
+        scores: Optional[np.ndarray] = None
+
+        for term in set(tokenize(query)):
+            term_id = self._vocabulary.get(term)
+            if term_id is not None:
+                start, stop = int(self.offsets[term_id]), int(self.offsets[term_id + 1])
+                docs = np.asarray(self.doc_ids[start:stop])
+                term_freqs = self.term_freqs[start:stop].astype(np.float32)
+                if self._has_tombstones:
+                    alive = self.live[docs]
+                    docs, term_freqs = docs[alive], term_freqs[alive]
+            else:
+                docs = np.zeros(0, dtype=np.int32)
+                term_freqs = np.zeros(0, dtype=np.float32)
+
+            if term in self._delta_postings:
+                delta_docs, delta_freqs = self._delta_postings[term]
+                docs = np.concatenate([docs, np.asarray(delta_docs, dtype=np.int32)])
+                term_freqs = np.concatenate([term_freqs, np.asarray(delta_freqs, dtype=np.float32)])
+
+            document_frequency = len(docs)
+            if not document_frequency:
+                continue
+            idf = math.log(1 + (self.num_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+
+            if scores is None:
+                scores = np.zeros(len(self.chunk_ids), dtype=np.float32)
+            scores[docs] += idf * term_freqs * (BM25_K1 + 1) / (term_freqs + self._length_norm[docs])
+
+        if scores is None:
+            return []
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(self.chunk_ids[doc], float(scores[doc])) for doc in hits]
+
+
+class SparseIndexStore:
+    """Writes the sparse index of each versioned database directory and keeps opened ones."""
+
+    def __init__(self, max_cached: int = 32):
+        """Initialize sparse index store."""
+        self._cache: FileCache[SparseIndex] = FileCache(max_cached)
+
+    def save(self, actual_db_path: Path, builder: SparseIndexBuilder) -> None:
+        """Write an index for a database directory, replacing any previous one and its delta."""
+        index_dir = actual_db_path / SPARSE_INDEX_DIR
+        tmp_dir = actual_db_path / f"{SPARSE_INDEX_DIR}.{uuid.uuid4().hex}.tmp"
+        builder.write(tmp_dir)
+
+        # Move the old index aside first; readers keep their open memory maps
+        old_dir = None
+        if index_dir.exists():
+            old_dir = actual_db_path / f"{SPARSE_INDEX_DIR}.{uuid.uuid4().hex}.old"
+            index_dir.replace(old_dir)
+        tmp_dir.replace(index_dir)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    def update(
+        self,
+        actual_db_path: Path,
+        removed_ids: List[str],
+        added_ids: List[str],
+        added_texts: List[str]
+    ) -> bool:
+        """
+        Record changed chunks in the delta segment, tokenizing only the added ones.
+        The delta is merged into the main segment once it grows too large.
+        Returns False if the directory has no index to update.
+        """
+        index = self.load(actual_db_path)
+        if index is None:
+            return False
+
+        delta = {"tombstones": list(index.delta["tombstones"]), "chunks": dict(index.delta["chunks"])}
+        tombstones = set(delta["tombstones"])
+        for chunk_id in [*removed_ids, *added_ids]:
+            delta["chunks"].pop(chunk_id, None)
+            if index.contains_main(chunk_id) and chunk_id not in tombstones:
+                tombstones.add(chunk_id)
+                delta["tombstones"].append(chunk_id)
+        for chunk_id, text in zip(added_ids, added_texts):
+            terms = tokenize(text)
+            delta["chunks"][chunk_id] = {"terms": Counter(terms), "length": len(terms)}
+
+        index_dir = actual_db_path / SPARSE_INDEX_DIR
+        tmp_file = index_dir / f"{DELTA_FILE}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(delta, f)
+        tmp_file.replace(index_dir / DELTA_FILE)
+
+        index = self.load(actual_db_path)
+        if index is not None and index.delta_changes > max(DELTA_MERGE_MIN_CHANGES, DELTA_MERGE_RATIO * index.main_docs):
+            builder = SparseIndexBuilder()
+            builder.add_index(index)
+            self.save(actual_db_path, builder)
+        return True
+
+    def load(self, actual_db_path: Path) -> Optional[SparseIndex]:
+        """Get the index of a database directory, or None if it has none."""
+        index_dir = actual_db_path / SPARSE_INDEX_DIR
+        return self._cache.get(
+            str(actual_db_path),
+            [index_dir / "meta.json", index_dir / DELTA_FILE],
+            lambda: SparseIndex(index_dir)
+        )
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retriever merging dense similarity search and BM25 with reciprocal-rank fusion.
+    Each chunk scores sum(1 / (rrf_k + rank)) over the rankings it appears in,
+    so exact term matches missed by the embeddings still reach the top k.
+    """
+
+    vectorstore: Any
+    sparse_index: Any
+    k: int = 4
+    candidates: int = 20
+    rrf_k: int = 60
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        """Get the k best chunks of the fused ranking."""
+        dense = self.vectorstore.similarity_search(query, k=self.candidates)
+        sparse = self.sparse_index.search(query, self.candidates)
+
+        fused: Dict[str, float] = {}
+        for rank, document in enumerate(dense, start=1):
+            fused[document.id] = fused.get(document.id, 0.0) + 1 / (self.rrf_k + rank)
+        for rank, (chunk_id, _) in enumerate(sparse, start=1):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1 / (self.rrf_k + rank)
+        top_ids = sorted(fused, key=fused.get, reverse=True)[:self.k]
+
+        # Chunks found only by BM25 are fetched from the collection; chunks
+        # stored without metadata come back with None, which Document rejects
+        documents = {document.id: document for document in dense}
+        missing = [chunk_id for chunk_id in top_ids if chunk_id not in documents]
+        if missing:
+            result = self.vectorstore.get(ids=missing, include=["documents", "metadatas"])
+            documents.update(
+                (chunk_id, Document(page_content=text, metadata=metadata or {}, id=chunk_id))
+                for chunk_id, text, metadata in zip(result["ids"], result["documents"], result["metadatas"])
+            )
+
+        return [documents[chunk_id] for chunk_id in top_ids if chunk_id in documents]
+
+
+# Global instance
+sparse_index_store = SparseIndexStore()
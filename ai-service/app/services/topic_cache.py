@@ -0,0 +1,133 @@
+"""Persistent cache of LLM topic explanations."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+from app.services.embedding_cache import normalize_text
+
+settings = get_settings()
+
+
+class TopicExplanationCache:
+    """
+    SQLite cache of topic explanations keyed by (folder, vector store version,
+    model, normalized title). A re-upload points the folder at a new store
+    version, so older explanations are never served and get purged on the next write.
+    Entries expire after a TTL and the least recently used ones are evicted
+    once the cache is full.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None
+    ):
+        """Initialize topic explanation cache."""
+        self.db_path = db_path or settings.response_cache_dir / "topic_explanations.sqlite"
+        self.ttl_seconds = settings.topic_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self.max_entries = max_entries or settings.topic_cache_max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        # Stats
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database on first use."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS explanations (
+                    key TEXT PRIMARY KEY,
+                    folder TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    explanation TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_explanations_folder ON explanations (folder)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_explanations_used_at ON explanations (used_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _key(self, folder: str, version: str, title: str) -> str:
+        """Build the cache key for a title in one version of a folder."""
+        title = normalize_text(title).casefold()
+        payload = "\0".join([folder, version, settings.default_model, title])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, folder: str, version: str, title: str) -> Optional[str]:
+        """Get a cached explanation, or None if missing or expired."""
+        key = self._key(folder, version, title)
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT explanation, created_at FROM explanations WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    conn.execute("DELETE FROM explanations WHERE key = ?", (key,))
+                    conn.commit()
+                self._misses += 1
+                return None
+
+            conn.execute("UPDATE explanations SET used_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self._hits += 1
+            return row[0]
+
+    def put(self, folder: str, version: str, title: str, explanation: str) -> None:
+        """Store an explanation, dropping stale versions and evicting old entries."""
+        key = self._key(folder, version, title)
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            # Explanations of previous uploads of this folder can no longer be served
+            conn.execute(
+                "DELETE FROM explanations WHERE folder = ? AND version != ?", (folder, version)
+            )
+            conn.execute("DELETE FROM explanations WHERE created_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "INSERT OR REPLACE INTO explanations VALUES (?, ?, ?, ?, ?, ?)",
+                (key, folder, version, explanation, now, now)
+            )
+
+            count = conn.execute("SELECT COUNT(*) FROM explanations").fetchone()[0]
+            if count > self.max_entries:
+                # Evict ~1% at a time so eviction cost is amortized
+                excess = count - self.max_entries + max(1, self.max_entries // 100)
+                conn.execute(
+                    "DELETE FROM explanations WHERE key IN "
+                    "(SELECT key FROM explanations ORDER BY used_at LIMIT ?)",
+                    (excess,)
+                )
+                self._evictions += excess
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "capacity": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+        }
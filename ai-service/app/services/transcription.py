@@ -1,15 +1,18 @@
 """Audio transcription service using Vosk."""
 
-import json
-import os
-import subprocess
-import wave
+import asyncio
 from pathlib import Path
-from typing import Optional
-
-from vosk import KaldiRecognizer, Model
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from app.core.config import get_settings
+from app.core.executors import iterate_io, run_cpu, run_io
+from app.workers.transcription import (
+    find_split_points,
+    get_wav_duration,
+    iter_video_transcript,
+    stitch_windows,
+    transcribe_wav_window
+)
 
 settings = get_settings()
 
@@ -20,18 +23,14 @@ class TranscriptionService:
     def __init__(self, model_path: Optional[Path] = None):
         """Initialize transcription service."""
         self.model_path = model_path or settings.model_dir
-        self._model: Optional[Model] = None
     
-    def _load_model(self) -> Model:
-        """Load Vosk model lazily."""
-        if self._model is None:
-            if not self.model_path.exists():
-                raise FileNotFoundError(
-                    f"Vosk model not found at {self.model_path}. "
-                    "Please download a Vosk model."
-                )
-            self._model = Model(str(self.model_path))
-        return self._model
+    def _check_model(self) -> None:
+        """Make sure the Vosk model is available before handing work to a worker."""
+        if not self.model_path.exists():
+            raise FileNotFoundError(
+                f"Vosk model not found at {self.model_path}. "
+                "Please download a Vosk model."
+            )
     
     async def extract_audio_from_video(
         self, 
@@ -50,57 +49,136 @@ class TranscriptionService:
             str(audio_path)
         ]
         
-        result = subprocess.run(
-            command, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            text=True
+        # Run FFmpeg as a child process without blocking the event loop
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+        stdout, stderr = await process.communicate()
         
-        if result.returncode != 0:
-            print(f"FFmpeg stderr: {result.stderr}")
-            print(f"FFmpeg stdout: {result.stdout}")
-            raise RuntimeError(f"FFmpeg failed: {result.stderr}")
+        if process.returncode != 0:
+            stderr_text = stderr.decode(errors="replace")
+            print(f"FFmpeg stderr: {stderr_text}")
+            print(f"FFmpeg stdout: {stdout.decode(errors='replace')}")
+            raise RuntimeError(f"FFmpeg failed: {stderr_text}")
+    
+    async def probe_duration(self, media_path: Path) -> Optional[float]:
+        """Get the length of a video or audio file in seconds with FFprobe, or None if unknown."""
+        command = [
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            str(media_path)
+        ]
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, _ = await process.communicate()
+            duration = float(stdout.decode().strip())
+        except (OSError, ValueError):
+            # FFprobe missing or no duration in the container ("N/A")
+            return None
+        
+        return duration if process.returncode == 0 and duration > 0 else None
     
     async def transcribe_audio(self, audio_path: Path) -> str:
         """Transcribe audio file to text."""
+        words = await self.transcribe_audio_words(audio_path)
+        return " ".join(word["word"] for word in words)
+    
+    async def transcribe_audio_words(self, audio_path: Path) -> List[Dict[str, Any]]:
+        """Transcribe audio file to words with start/end timestamps in seconds."""
         if not audio_path.exists():
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
         
-        model = self._load_model()
-        recognizer = KaldiRecognizer(model, settings.audio_sample_rate)
-        
-        transcription_text = ""
+        self._check_model()
         
         try:
-            with wave.open(str(audio_path), "rb") as wf:
-                # Validate audio format
-                if (wf.getnchannels() != settings.audio_channels or 
-                    wf.getsampwidth() != 2 or 
-                    wf.getframerate() != settings.audio_sample_rate):
-                    raise ValueError(
-                        f"Audio must be WAV format, mono, 16-bit, "
-                        f"and {settings.audio_sample_rate}Hz"
-                    )
-                
-                # Process audio in chunks
-                while True:
-                    data = wf.readframes(4000)
-                    if len(data) == 0:
-                        break
-                    
-                    if recognizer.AcceptWaveform(data):
-                        result = json.loads(recognizer.Result())
-                        transcription_text += " " + result.get("text", "")
-                
-                # Get final result
-                final_result = json.loads(recognizer.FinalResult())
-                transcription_text += " " + final_result.get("text", "")
-        
+            if settings.transcription_mode == "segmented":
+                return await self._transcribe_segmented(audio_path)
+            
+            # Recognition is CPU-bound, run it in the process pool
+            duration = await run_io(get_wav_duration, str(audio_path))
+            return await run_cpu(
+                transcribe_wav_window,
+                str(self.model_path),
+                str(audio_path),
+                0.0,
+                duration,
+                settings.audio_sample_rate,
+                settings.audio_channels
+            )
         except Exception as e:
             raise RuntimeError(f"Transcription failed: {str(e)}")
+    
+    async def _transcribe_segmented(self, audio_path: Path) -> List[Dict[str, Any]]:
+        """
+        Transcribe overlapping windows of a WAV file in parallel and stitch their words.
+        Windows are split near silence and each worker process loads the Vosk
+        model once; words recognized twice in an overlap are kept only once.
+        """
+        duration = await run_io(get_wav_duration, str(audio_path))
+        split_points = await run_cpu(
+            find_split_points,
+            str(audio_path),
+            settings.transcription_segment_seconds,
+            settings.transcription_split_search_seconds
+        )
+        
+        # Each window owns the audio between two split points, plus some overlap on both sides
+        bounds = [0.0, *split_points, duration]
+        overlap = settings.transcription_overlap_seconds
+        windows = await asyncio.gather(*[
+            run_cpu(
+                transcribe_wav_window,
+                str(self.model_path),
+                str(audio_path),
+                max(0.0, start - overlap),
+                min(duration, end + overlap),
+                settings.audio_sample_rate,
+                settings.audio_channels
+            )
+            for start, end in zip(bounds, bounds[1:])
+        ])
+        
+        owned = [-float("inf"), *split_points, float("inf")]
+        return stitch_windows([
+            (start, end, words) 
+            for start, end, words in zip(owned, owned[1:], windows)
+        ])
+    
+    async def stream_transcription(
+        self, 
+        video_path: Path,
+        start: float = 0.0,
+        end: Optional[float] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Transcribe a video without an intermediate WAV file, yielding the timestamped words of each segment.
+        Runs on an I/O worker thread: FFmpeg decodes in its own process and
+        Vosk releases the GIL while recognizing. start/end limit the time range.
+        """
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        
+        self._check_model()
         
-        return transcription_text.strip()
+        async for words in iterate_io(
+            iter_video_transcript,
+            str(self.model_path),
+            str(video_path),
+            settings.audio_sample_rate,
+            settings.audio_channels,
+            start,
+            end,
+            maxsize=settings.ingest_queue_size
+        ):
+            yield words
 
 
 # Global instance
@@ -1,39 +1,312 @@
 """Vector store service for document embeddings."""
 
+import asyncio
+import hashlib
+import json
+import threading
+import uuid
+import weakref
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
 
-from langchain.chains import RetrievalQA
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_chroma import Chroma
-from langchain_huggingface.embeddings import HuggingFaceEmbeddings
-from langchain_openai import ChatOpenAI
+from langchain_core.documents import Document
 
 from app.core.config import get_settings
+from app.core.executors import iterate_io, run_cpu, run_io
+from app.services.embeddings import embedding_engine
+from app.services.keywords import KeywordStats, keyword_stats_store
+from app.services.sparse_index import HybridRetriever, SparseIndexBuilder, sparse_index_store
 from app.services.transcription import transcription_service
+from app.workers.pdf import count_pdf_pages, iter_pdf_pages, load_pdf_page_range
+
+if TYPE_CHECKING:
+    from langchain.chains import RetrievalQA
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from langchain_chroma import Chroma
+    from langchain_openai import ChatOpenAI
 
 settings = get_settings()
 
+CHUNK_MANIFEST_FILE = "chunk_manifest.json"
+REVISION_FILE = "revision"  # rewritten when chunks of a store are replaced in place
+BULK_NOTE_ID = "__folder__"  # note id used for the whole-folder /upload/notes path
+
+
+class TranscriptChunker:
+    """
+    Group timestamped transcript words into overlapping chunks.
+    Each chunk carries the start and end time (seconds) of its words.
+    """
+    
+    def __init__(self, chunk_size: Optional[int] = None, chunk_overlap: Optional[int] = None):
+        """Initialize transcript chunker."""
+        self.chunk_size = chunk_size or settings.chunk_size
+        self.chunk_overlap = settings.chunk_overlap if chunk_overlap is None else chunk_overlap
+        self._words: List[Dict[str, Any]] = []
+        self._length = 0
+        self._new_words = 0
+    
+    def feed(self, words: List[Dict[str, Any]]) -> List[Document]:
+        """Add words and return the chunks that became full."""
+        chunks = []
+        for word in words:
+            size = len(word["word"]) + 1
+            if self._new_words and self._length + size > self.chunk_size:
+                chunks.append(self._emit())
+            self._words.append(word)
+            self._length += size
+            self._new_words += 1
+        return chunks
+    
+    def finish(self) -> List[Document]:
+        """Return the last, partly filled chunk."""
+        return [self._emit()] if self._new_words else []
+    
+    def _emit(self) -> Document:
+        """Build a chunk from the buffered words and keep the overlap for the next one."""
+        chunk = Document(
+            page_content=" ".join(word["word"] for word in self._words),
+            metadata={
+                "start": round(self._words[0]["start"], 2), 
+                "end": round(self._words[-1]["end"], 2)
+            }
+        )
+        
+        # Carry the last words over so neighbouring chunks share some context
+        overlap: List[Dict[str, Any]] = []
+        length = 0
+        for word in reversed(self._words):
+            if length + len(word["word"]) + 1 > self.chunk_overlap:
+                break
+            overlap.insert(0, word)
+            length += len(word["word"]) + 1
+        
+        self._words = overlap
+        self._length = length
+        self._new_words = 0
+        return chunk
+
+
+def _close_quietly(close: Callable[[], None]) -> None:
+    """Close a released Chroma client, ignoring errors during shutdown."""
+    try:
+        close()
+    except Exception:
+        pass
+
+
+class VectorStorePool:
+    """
+    Bounded LRU pool of opened vector stores keyed by resolved database path.
+    Evicted or invalidated stores are only dropped from the pool; each
+    store's client is closed once the last retriever or request holding the
+    store releases it, so in-flight requests never see a closed client.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None, close_clients: bool = True):
+        """Initialize vector store pool."""
+        self.max_size = max_size or settings.vectorstore_pool_size
+        self.close_clients = close_clients
+        self._stores: "OrderedDict[str, Chroma]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Stats
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+    
+    def get(self, actual_db_path: Path, factory: Callable[[], "Chroma"]) -> "Chroma":
+        """Get the opened store for a path, opening it with factory on a miss."""
+        key = str(actual_db_path.resolve())
+        
+        with self._lock:
+            vectorstore = self._stores.get(key)
+            if vectorstore is not None:
+                self._stores.move_to_end(key)
+                self._hits += 1
+                return vectorstore
+            self._misses += 1
+        
+        # Open outside the lock so a cold open does not block lookups of other stores
+        opened = factory()
+        self._close_when_released(opened)
+        
+        with self._lock:
+            vectorstore = self._stores.get(key)
+            if vectorstore is not None:
+                # Opened concurrently by another request, ours is released unused
+                self._stores.move_to_end(key)
+                return vectorstore
+            
+            self._stores[key] = opened
+            while len(self._stores) > self.max_size:
+                self._stores.popitem(last=False)
+                self._evictions += 1
+        
+        return opened
+    
+    def invalidate(self, path: Path) -> None:
+        """Drop every pooled store at or below path."""
+        prefix = str(path.resolve())
+        
+        with self._lock:
+            for key in list(self._stores):
+                if key == prefix or key.startswith(prefix + "/"):
+                    del self._stores[key]
+                    self._invalidations += 1
+    
+    def _close_when_released(self, vectorstore: "Chroma") -> None:
+        """Close the store's client once nothing references the store any more."""
+        if not self.close_clients:
+            # Stores share one client, closing it would close all of them
+            return
+        
+        close = getattr(getattr(vectorstore, "_client", None), "close", None)
+        if close is not None:
+            # Each store has its own client; Chroma refcounts the system behind
+            # clients of the same path, so closing one never affects the others
+            weakref.finalize(vectorstore, _close_quietly, close)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._stores),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+        }
+
 
 class VectorStoreService:
     """Service for managing vector stores and retrievers."""
     
     def __init__(self):
         """Initialize vector store service."""
-        self._embeddings = HuggingFaceEmbeddings(
-            model_name=settings.embedding_model
-        )
-        self._text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.chunk_size,
-            chunk_overlap=settings.chunk_overlap
+        self._embeddings = embedding_engine
+        self._splitter: Optional["RecursiveCharacterTextSplitter"] = None
+        self._folder_locks: Dict[str, threading.Lock] = {}
+        self._folder_locks_lock = threading.Lock()
+        self._shared_mode = settings.vector_storage_mode == "shared"
+        self._shared_client = None
+        self._shared_client_lock = threading.Lock()
+        self._pool = VectorStorePool(close_clients=not self._shared_mode)
+        self._building: Set[Path] = set()
+        self._building_lock = threading.Lock()
+    
+    @property
+    def _text_splitter(self) -> "RecursiveCharacterTextSplitter":
+        """Get the text splitter, importing LangChain's splitters on first use."""
+        if self._splitter is None:
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+            
+            self._splitter = RecursiveCharacterTextSplitter(
+                chunk_size=settings.chunk_size,
+                chunk_overlap=settings.chunk_overlap
+            )
+        return self._splitter
+    
+    def _get_folder_lock(self, vector_db_path: Path) -> threading.Lock:
+        """Get the lock serializing manifest updates of one folder."""
+        with self._folder_locks_lock:
+            return self._folder_locks.setdefault(str(vector_db_path), threading.Lock())
+    
+    def _get_shared_client(self):
+        """Get the single persistent Chroma client used in shared storage mode."""
+        if self._shared_client is None:
+            with self._shared_client_lock:
+                if self._shared_client is None:
+                    import chromadb
+                    
+                    self._shared_client = chromadb.PersistentClient(
+                        path=str(settings.shared_vector_db_dir)
+                    )
+        return self._shared_client
+    
+    def _collection_name(self, actual_db_path: Path) -> str:
+        """Get the shared-mode collection name for a versioned database directory."""
+        relative_path = actual_db_path.resolve().relative_to(settings.vector_db_dir.resolve())
+        tenant = hashlib.sha1(str(relative_path.parent).encode("utf-8")).hexdigest()
+        return f"t_{tenant}_{actual_db_path.name}"
+    
+    def _collection_metadata(self, actual_db_path: Path) -> Dict[str, str]:
+        """Get the tenant metadata stored on a shared-mode collection."""
+        relative_path = actual_db_path.resolve().relative_to(settings.vector_db_dir.resolve())
+        user_id, kind, folder_id = relative_path.parts[:3]
+        return {"user_id": user_id, "kind": kind, "folder_id": folder_id}
+    
+    def _delete_shared_collections(self, version_dirs: Iterable[Path]) -> None:
+        """Delete the shared-mode collections of versioned database directories."""
+        client = self._get_shared_client()
+        
+        for version_dir in version_dirs:
+            try:
+                client.delete_collection(self._collection_name(version_dir))
+            except Exception:
+                pass  # Collection was never created or is already gone
+    
+    def _create_vectorstore(
+        self, 
+        chunks: List[Document], 
+        unique_path: Path,
+        ids: Optional[List[str]] = None
+    ) -> "Chroma":
+        """Embed chunks into a new collection for a versioned database directory."""
+        from langchain_chroma import Chroma
+        
+        if self._shared_mode:
+            unique_path.mkdir(parents=True, exist_ok=True)
+            return Chroma.from_documents(
+                chunks, 
+                self._embeddings, 
+                ids=ids,
+                client=self._get_shared_client(),
+                collection_name=self._collection_name(unique_path),
+                collection_metadata=self._collection_metadata(unique_path)
+            )
+        
+        return Chroma.from_documents(
+            chunks, 
+            self._embeddings, 
+            ids=ids,
+            persist_directory=str(unique_path)
         )
     
-    def _cleanup_vector_db(self, vector_db_path: Path) -> None:
-        """Safely remove existing vector database directory."""
+    def _cleanup_vector_db(self, vector_db_path: Path, keep: Path) -> None:
+        """Safely remove the folder's older databases, keeping the version directory keep."""
         if not vector_db_path.exists():
             return
-            
+        
+        # Older versions and leftovers of failed builds; the pointer file and
+        # versions started after keep (possibly still being built) stay
+        keep_time = self._version_time(keep)
+        with self._building_lock:
+            building = set(self._building)
+        for child in list(vector_db_path.iterdir()):
+            if child == keep or child.name.startswith(".db_location") or child in building:
+                continue
+            child_time = self._version_time(child)
+            if child_time is not None and child_time >= keep_time:
+                continue
+            self._pool.invalidate(child)
+            if self._shared_mode and child.name.startswith("db_"):
+                self._delete_shared_collections([child])
+            self._remove_path(child)
+    
+    def _remove_path(self, path: Path) -> None:
+        """Remove a file or directory tree, retrying while files are still being released."""
+        if path.is_file():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return
+        
         import shutil
         import os
         import time
@@ -42,8 +315,8 @@ class VectorStoreService:
         for attempt in range(3):
             try:
                 # Strategy 1: Force remove with elevated permissions
-                if vector_db_path.exists():
-                    for root, dirs, files in os.walk(vector_db_path, topdown=False):
+                if path.exists():
+                    for root, dirs, files in os.walk(path, topdown=False):
                         for file in files:
                             file_path = os.path.join(root, file)
                             try:
@@ -60,17 +333,17 @@ class VectorStoreService:
                     
                     # Remove the main directory
                     try:
-                        os.chmod(vector_db_path, 0o777)
-                        os.rmdir(vector_db_path)
+                        os.chmod(path, 0o777)
+                        os.rmdir(path)
                     except:
                         # If rmdir fails, try shutil.rmtree
                         try:
-                            shutil.rmtree(vector_db_path, ignore_errors=True)
+                            shutil.rmtree(path, ignore_errors=True)
                         except:
                             pass
                 
                 # Check if cleanup was successful
-                if not vector_db_path.exists():
+                if not path.exists():
                     break
                     
                 # Wait a bit before next attempt
@@ -80,10 +353,10 @@ class VectorStoreService:
                 pass
         
         # Final fallback: rename the directory to avoid conflicts
-        if vector_db_path.exists():
+        if path.exists():
             try:
-                backup_path = vector_db_path.parent / f"{vector_db_path.name}_backup_{int(time.time())}"
-                os.rename(vector_db_path, backup_path)
+                backup_path = path.parent / f"{path.name}_backup_{int(time.time())}"
+                os.rename(path, backup_path)
             except:
                 pass
     
@@ -92,8 +365,16 @@ class VectorStoreService:
         pointer_file = base_path / ".db_location"
         base_path.mkdir(parents=True, exist_ok=True)
         
-        with open(pointer_file, 'w') as f:
+        # The previous target is no longer served, drop it from the pool
+        previous_path = self._get_actual_db_path(base_path)
+        if previous_path != base_path and previous_path != actual_path:
+            self._pool.invalidate(previous_path)
+        
+        # Replace atomically so readers never see an empty pointer
+        tmp_file = pointer_file.with_name(".db_location.tmp")
+        with open(tmp_file, 'w') as f:
             f.write(str(actual_path))
+        tmp_file.replace(pointer_file)
     
     def _get_actual_db_path(self, base_path: Path) -> Path:
         """Get the actual database path from pointer file."""
@@ -108,123 +389,649 @@ class VectorStoreService:
         # Fallback to base path if no pointer or path doesn't exist
         return base_path
     
-    async def create_vectorstore_from_pdf(
-        self, 
-        file_path: Path, 
-        vector_db_path: Path
-    ) -> None:
-        """Create vector store from PDF file."""
-        import time
+    def get_version(self, vector_db_path: Path) -> str:
+        """
+        Get a token that changes whenever the folder's content changes.
+        Uploads point the folder at a new store directory, incremental note
+        updates rewrite its chunk manifest and video range re-indexing
+        writes a new revision.
+        """
+        actual_db_path = self._get_actual_db_path(vector_db_path)
+        manifest_file = actual_db_path / CHUNK_MANIFEST_FILE
+        revision_file = actual_db_path / REVISION_FILE
         
-        # Clean up any existing database
-        self._cleanup_vector_db(vector_db_path)
+        version = str(actual_db_path)
+        if manifest_file.exists():
+            version += f"@{manifest_file.stat().st_mtime_ns}"
+        if revision_file.exists():
+            version += f"#{revision_file.read_text().strip()}"
+        return version
+    
+    def _bump_revision(self, actual_db_path: Path) -> None:
+        """Mark a store's content as changed so caches keyed by its version are dropped."""
+        revision_file = actual_db_path / REVISION_FILE
+        tmp_file = revision_file.with_suffix(".tmp")
+        tmp_file.write_text(uuid.uuid4().hex)
+        tmp_file.replace(revision_file)
+    
+    def _version_time(self, version_dir: Path) -> Optional[int]:
+        """Get the start time (ns) encoded in a version directory name, or None if it has none."""
+        parts = version_dir.name.split("_")
+        if parts[0] != "db" or len(parts) < 2 or not parts[1].isdigit():
+            return None
+        # Versions created before the uuid suffix are named db_<milliseconds>
+        return int(parts[1]) if len(parts) > 2 else int(parts[1]) * 1_000_000
+    
+    def _start_vectorstore(self, vector_db_path: Path) -> Path:
+        """Reserve a new versioned directory; the current database keeps serving meanwhile."""
+        import time
         
-        # Create a unique subdirectory to avoid any conflicts
-        unique_path = vector_db_path / f"db_{int(time.time() * 1000)}"
+        # Start time orders the versions, the suffix keeps concurrent builds apart
+        unique_path = vector_db_path / f"db_{time.time_ns()}_{uuid.uuid4().hex[:8]}"
+        with self._building_lock:
+            self._building.add(unique_path)
         
         # Ensure parent directory exists with proper permissions
         unique_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Load and process PDF
-        loader = PyPDFLoader(str(file_path))
-        documents = loader.load()
+        return unique_path
+    
+    def _finish_vectorstore(self, vector_db_path: Path, unique_path: Path) -> None:
+        """Point the folder at a completed database, then remove the older versions."""
+        with self._building_lock:
+            current = self._get_actual_db_path(vector_db_path)
+            current_time = self._version_time(current) if current != vector_db_path else None
+            superseded = current_time is not None and current_time > self._version_time(unique_path)
+            if not superseded:
+                self._building.discard(unique_path)
+                self._create_db_pointer(vector_db_path, unique_path)
         
-        # Split into chunks
-        chunks = self._text_splitter.split_documents(documents)
+        if superseded:
+            # A later upload to the folder finished first, it stays current
+            self._abort_vectorstore(unique_path)
+            return
+        self._cleanup_vector_db(vector_db_path, keep=unique_path)
+    
+    def _abort_vectorstore(self, unique_path: Path) -> None:
+        """Remove a database whose build failed; the folder keeps its previous version."""
+        with self._building_lock:
+            self._building.discard(unique_path)
+        self._pool.invalidate(unique_path)
+        if self._shared_mode:
+            self._delete_shared_collections([unique_path])
+        self._remove_path(unique_path)
+    
+    def _replace_vectorstore(
+        self, 
+        chunks: List[Document], 
+        vector_db_path: Path,
+        ids: Optional[List[str]] = None
+    ) -> Path:
+        """Build a new versioned vector store from chunks and point the folder at it."""
+        unique_path = self._start_vectorstore(vector_db_path)
+        ids = ids or [str(uuid.uuid4()) for _ in chunks]
         
-        # Create vector store with unique path
-        vectorstore = Chroma.from_documents(
-            chunks, 
-            self._embeddings, 
-            persist_directory=str(unique_path)
+        try:
+            # Create vector store with unique path
+            self._create_vectorstore(chunks, unique_path, ids)
+            texts = [chunk.page_content for chunk in chunks]
+            stats = KeywordStats()
+            stats.add(texts)
+            keyword_stats_store.save(unique_path, stats)
+            sparse_index = SparseIndexBuilder()
+            sparse_index.add(ids, texts)
+            sparse_index_store.save(unique_path, sparse_index)
+        except BaseException:
+            self._abort_vectorstore(unique_path)
+            raise
+        
+        # Serve the new database, then drop the old one
+        self._finish_vectorstore(vector_db_path, unique_path)
+        
+        return unique_path
+    
+    def _add_embedded_chunks(
+        self, 
+        vectorstore: "Chroma", 
+        chunks: List[Document], 
+        vectors: List[List[float]]
+    ) -> List[str]:
+        """Write chunks whose embeddings were already computed and return their ids."""
+        ids = [str(uuid.uuid4()) for _ in chunks]
+        vectorstore._collection.upsert(
+            ids=ids,
+            embeddings=vectors,
+            documents=[chunk.page_content for chunk in chunks],
+            metadatas=[chunk.metadata or None for chunk in chunks]
         )
+        return ids
+    
+    def _update_sparse_index(
+        self, 
+        vectorstore: "Chroma", 
+        actual_db_path: Path, 
+        removed_ids: List[str], 
+        added: List[Tuple[str, Document]]
+    ) -> None:
+        """Apply chunks changed in place to the BM25 index of a store."""
+        if not removed_ids and not added:
+            return
+        if sparse_index_store.update(
+            actual_db_path, 
+            removed_ids, 
+            [chunk_id for chunk_id, _ in added], 
+            [chunk.page_content for _, chunk in added]
+        ):
+            return
         
-        # Create a symlink or marker to the actual database
-        self._create_db_pointer(vector_db_path, unique_path)
+        # Stores built before BM25 indexes existed get one from their collection once
+        result = vectorstore._collection.get(include=["documents"])
+        sparse_index = SparseIndexBuilder()
+        sparse_index.add(result["ids"], result["documents"])
+        sparse_index_store.save(actual_db_path, sparse_index)
     
-    async def create_vectorstore_from_video(
+    async def _ingest_documents(
         self, 
-        video_path: Path, 
+        documents: AsyncIterator[Document], 
         vector_db_path: Path,
-        audio_path: Path
-    ) -> None:
-        """Create vector store from video file."""
-        import time
+        progress: Optional[Callable[[int, int], None]] = None,
+        split: bool = True
+    ) -> Path:
+        """
+        Stream documents into a new versioned vector store.
+        Splitting, embedding and writing are separate stages connected by
+        bounded queues, so memory stays flat in the document size and parsing
+        of the next page overlaps with embedding of the current one.
+        progress(documents, chunks) is called after each batch is written.
+        Pass split=False when the documents already are chunks.
+        """
+        batch_size = settings.ingest_batch_size
+        batches: asyncio.Queue = asyncio.Queue(maxsize=settings.ingest_queue_size)
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=settings.ingest_queue_size)
+        counts = {"documents": 0, "chunks": 0}
+        stats = KeywordStats()
+        sparse_index = SparseIndexBuilder()
         
-        # Clean up any existing database
-        self._cleanup_vector_db(vector_db_path)
+        unique_path = await run_io(self._start_vectorstore, vector_db_path)
+        vectorstore = await run_io(self._open_vectorstore, unique_path)
         
-        # Create a unique subdirectory to avoid any conflicts
-        unique_path = vector_db_path / f"db_{int(time.time() * 1000)}"
+        async def split_stage() -> None:
+            pending: List[Document] = []
+            async for document in documents:
+                pending.extend(self._text_splitter.split_documents([document]) if split else [document])
+                counts["documents"] += 1
+                while len(pending) >= batch_size:
+                    await batches.put(pending[:batch_size])
+                    pending = pending[batch_size:]
+            if pending:
+                await batches.put(pending)
+            await batches.put(None)
         
-        # Ensure parent directory exists with proper permissions
-        unique_path.parent.mkdir(parents=True, exist_ok=True)
+        async def embed_stage() -> None:
+            while (chunks := await batches.get()) is not None:
+                vectors = await run_io(
+                    self._embeddings.embed_documents, 
+                    [chunk.page_content for chunk in chunks]
+                )
+                await embedded.put((chunks, vectors))
+            await embedded.put(None)
+        
+        async def write_stage() -> None:
+            while (item := await embedded.get()) is not None:
+                ids = await run_io(self._add_embedded_chunks, vectorstore, *item)
+                texts = [chunk.page_content for chunk in item[0]]
+                await run_io(stats.add, texts)
+                await run_io(sparse_index.add, ids, texts)
+                counts["chunks"] += len(item[0])
+                if progress is not None:
+                    progress(counts["documents"], counts["chunks"])
+        
+        stages = [asyncio.ensure_future(stage()) for stage in (split_stage, embed_stage, write_stage)]
+        try:
+            await asyncio.gather(*stages)
+            await run_io(keyword_stats_store.save, unique_path, stats)
+            await run_io(sparse_index_store.save, unique_path, sparse_index)
+        except BaseException:
+            # A failed stage would leave the others waiting on their queues
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            await run_io(self._abort_vectorstore, unique_path)
+            raise
+        
+        # Serve the new database only once it is complete, then drop the old one
+        await run_io(self._finish_vectorstore, vector_db_path, unique_path)
+        return unique_path
+    
+    async def _iter_pdf_pages(self, file_path: Path) -> AsyncIterator[Document]:
+        """
+        Yield the pages of a PDF in order.
+        Page ranges are parsed concurrently on the CPU process pool and
+        reassembled in page order; only a bounded number of ranges is in
+        flight so memory stays flat.
+        """
+        if settings.pdf_parallel_shards <= 1:
+            # Parse lazily on a single worker thread
+            async for page in iterate_io(iter_pdf_pages, str(file_path), maxsize=settings.ingest_queue_size):
+                yield page
+            return
+        
+        page_count = await run_io(count_pdf_pages, str(file_path))
+        shard_size = settings.pdf_pages_per_shard
+        starts = deque(range(0, page_count, shard_size))
+        in_flight: Deque[asyncio.Future] = deque()
+        
+        try:
+            while starts or in_flight:
+                while starts and len(in_flight) < settings.pdf_parallel_shards:
+                    start = starts.popleft()
+                    in_flight.append(asyncio.ensure_future(
+                        run_cpu(load_pdf_page_range, str(file_path), start, start + shard_size)
+                    ))
+                
+                # Later ranges keep parsing while the oldest one is handed on
+                for page in await in_flight.popleft():
+                    yield page
+        finally:
+            for shard in in_flight:
+                shard.cancel()
+    
+    async def create_vectorstore_from_pdf(
+        self, 
+        file_path: Path, 
+        vector_db_path: Path,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> None:
+        """Create vector store from PDF file, streaming pages through the ingestion stages."""
+        await self._ingest_documents(self._iter_pdf_pages(file_path), vector_db_path, progress)
+    
+    async def create_vectorstore_from_video(
+        self, 
+        video_path: Path, 
+        vector_db_path: Path,
+        audio_path: Path,
+        progress: Optional[Callable[[float], None]] = None
+    ) -> None:
+        """
+        Create vector store from video file, with start/end times on every chunk.
+        In stream mode progress(seconds) reports how far into the video transcription is.
+        """
+        if settings.transcription_mode == "stream":
+            # Recognized segments go straight to the ingestion stages, no WAV file is written
+            segments = transcription_service.stream_transcription(video_path)
+            if progress is not None:
+                segments = self._track_position(segments, progress)
+            await self._ingest_documents(self._chunk_transcript(segments), vector_db_path, split=False)
+            return
         
         # Extract audio and transcribe
         await transcription_service.extract_audio_from_video(video_path, audio_path)
-        transcription_text = await transcription_service.transcribe_audio(audio_path)
+        words = await transcription_service.transcribe_audio_words(audio_path)
         
-        # Create documents from transcription
-        chunks = self._text_splitter.create_documents([transcription_text])
+        await self.create_vectorstore_from_transcript(words, vector_db_path)
+    
+    async def _track_position(
+        self, 
+        segments: AsyncIterator[List[Dict[str, Any]]], 
+        progress: Callable[[float], None]
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Pass transcript segments through, reporting the end time of each."""
+        async for words in segments:
+            yield words
+            progress(words[-1]["end"])
+    
+    async def _chunk_transcript(
+        self, 
+        segments: AsyncIterator[List[Dict[str, Any]]]
+    ) -> AsyncIterator[Document]:
+        """Turn streamed transcript segments into timestamped chunks."""
+        chunker = TranscriptChunker()
+        async for words in segments:
+            for chunk in chunker.feed(words):
+                yield chunk
+        for chunk in chunker.finish():
+            yield chunk
+    
+    async def create_vectorstore_from_transcript(
+        self, 
+        words: List[Dict[str, Any]], 
+        vector_db_path: Path
+    ) -> None:
+        """Create vector store from the timestamped words of a video transcription."""
+        # Create timestamped chunks from transcription
+        chunker = TranscriptChunker()
+        chunks = chunker.feed(words) + chunker.finish()
         
-        # Create vector store with unique path
-        vectorstore = Chroma.from_documents(
-            chunks, 
-            self._embeddings, 
-            persist_directory=str(unique_path)
+        # Embed and persist off the event loop
+        await run_io(self._replace_vectorstore, chunks, vector_db_path)
+    
+    def _find_range_chunks(
+        self, 
+        vectorstore: "Chroma", 
+        start: float, 
+        end: float
+    ) -> Tuple[List[str], List[str], float, float]:
+        """Get the ids and texts of chunks overlapping [start, end) and the time range they cover."""
+        result = vectorstore._collection.get(
+            where={"$and": [{"start": {"$lt": end}}, {"end": {"$gt": start}}]},
+            include=["metadatas", "documents"]
         )
-        
-        # Create a pointer to the actual database
-        self._create_db_pointer(vector_db_path, unique_path)
+        for metadata in result["metadatas"]:
+            start = min(start, metadata["start"])
+            end = max(end, metadata["end"])
+        return result["ids"], result["documents"], start, end
     
-    async def create_vectorstore_from_text(
+    def _replace_range_chunks(
         self, 
-        text: str, 
-        vector_db_path: Path
+        actual_db_path: Path, 
+        old_ids: List[str], 
+        old_texts: List[str], 
+        chunks: List[Document]
     ) -> None:
-        """Create vector store from text."""
-        import time
+        """Swap the chunks of a time range for newly transcribed ones."""
+        vectorstore = self._open_vectorstore(actual_db_path)
+        added = [(str(uuid.uuid4()), chunk) for chunk in chunks]
+        if old_ids:
+            vectorstore.delete(ids=old_ids)
+        if added:
+            vectorstore.add_documents(chunks, ids=[chunk_id for chunk_id, _ in added])
+        
+        stats = keyword_stats_store.load(actual_db_path)
+        if stats is not None:
+            # Update a copy, the loaded statistics may be in use by analysis requests
+            stats = KeywordStats.from_dict(stats.to_dict())
+            stats.remove(old_texts)
+            stats.add(chunk.page_content for chunk in chunks)
+            keyword_stats_store.save(actual_db_path, stats)
+        self._update_sparse_index(vectorstore, actual_db_path, old_ids, added)
+        self._bump_revision(actual_db_path)
+    
+    async def reindex_video_range(
+        self, 
+        video_path: Path, 
+        vector_db_path: Path, 
+        start: float, 
+        end: float
+    ) -> int:
+        """
+        Re-transcribe and re-embed only the part of a video between start and end (seconds).
+        The range is widened to whole stored chunks so no words are lost at
+        its edges. Returns the number of chunks written.
+        """
+        actual_db_path = self._get_actual_db_path(vector_db_path)
+        if actual_db_path == vector_db_path:
+            raise FileNotFoundError(f"Vector database not found: {vector_db_path}")
         
-        # Clean up any existing database
-        self._cleanup_vector_db(vector_db_path)
+        vectorstore = await run_io(self._open_vectorstore, actual_db_path)
+        old_ids, old_texts, start, end = await run_io(self._find_range_chunks, vectorstore, start, end)
         
-        # Create a unique subdirectory to avoid any conflicts
-        unique_path = vector_db_path / f"db_{int(time.time() * 1000)}"
+        chunker = TranscriptChunker()
+        chunks: List[Document] = []
+        async for words in transcription_service.stream_transcription(video_path, start, end):
+            chunks.extend(chunker.feed(words))
+        chunks.extend(chunker.finish())
         
-        # Ensure parent directory exists with proper permissions
-        unique_path.parent.mkdir(parents=True, exist_ok=True)
+        await run_io(self._replace_range_chunks, actual_db_path, old_ids, old_texts, chunks)
+        return len(chunks)
+    
+    def _chunk_ids(self, chunks: List[Document], note_id: str) -> List[str]:
+        """Build content-hash ids for a note's chunks (repeated chunks get a counter suffix)."""
+        seen: Dict[str, int] = {}
+        ids = []
+        for chunk in chunks:
+            digest = hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest()[:32]
+            seen[digest] = seen.get(digest, 0) + 1
+            ids.append(f"{note_id}:{digest}-{seen[digest]}")
+        return ids
+    
+    def _read_chunk_manifest(self, actual_db_path: Path) -> Optional[Dict[str, Dict]]:
+        """Read the per-note chunk ids stored beside a collection."""
+        manifest_file = actual_db_path / CHUNK_MANIFEST_FILE
         
-        # Create documents from text
-        chunks = self._text_splitter.create_documents([text])
+        if not manifest_file.exists():
+            return None
         
-        # Create vector store with unique path
-        vectorstore = Chroma.from_documents(
-            chunks, 
-            self._embeddings, 
-            persist_directory=str(unique_path)
+        try:
+            with open(manifest_file, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if "notes" in manifest:
+            return manifest["notes"]
+        if "chunk_ids" in manifest:
+            # Older manifest without per-note entries, treat it as one bulk upload
+            return {BULK_NOTE_ID: {"chunk_ids": manifest["chunk_ids"]}}
+        return None
+    
+    def _write_chunk_manifest(self, actual_db_path: Path, notes: Dict[str, Dict]) -> None:
+        """Write the per-note chunk ids stored beside a collection."""
+        manifest_file = actual_db_path / CHUNK_MANIFEST_FILE
+        tmp_file = manifest_file.with_suffix(".tmp")
+        
+        with open(tmp_file, 'w') as f:
+            json.dump({"notes": notes}, f)
+        tmp_file.replace(manifest_file)
+    
+    def _split_note(
+        self, 
+        note_id: str, 
+        content: str, 
+        updated_at: Optional[str]
+    ) -> List[Document]:
+        """Split a note into chunks tagged with the note's metadata."""
+        metadata = {"note_id": note_id}
+        if updated_at:
+            metadata["updated_at"] = updated_at
+        return self._text_splitter.create_documents([content], metadatas=[metadata])
+    
+    def _get_notes_store(self, vector_db_path: Path) -> Tuple[Path, Dict[str, Dict]]:
+        """Get the notes collection directory and manifest, creating an empty one if needed."""
+        actual_db_path = self._get_actual_db_path(vector_db_path)
+        notes = self._read_chunk_manifest(actual_db_path)
+        
+        if actual_db_path != vector_db_path and notes is not None:
+            return actual_db_path, notes
+        
+        # No manifest to diff against, start a fresh collection
+        unique_path = self._start_vectorstore(vector_db_path)
+        unique_path.mkdir(parents=True, exist_ok=True)
+        self._write_chunk_manifest(unique_path, {})
+        self._finish_vectorstore(vector_db_path, unique_path)
+        
+        return unique_path, {}
+    
+    def _sync_note_chunks(
+        self, 
+        vectorstore: "Chroma", 
+        notes: Dict[str, Dict],
+        note_id: str, 
+        chunks: List[Document],
+        updated_at: Optional[str] = None
+    ) -> Tuple[List[str], List[Tuple[str, Document]]]:
+        """Add and delete only the chunks of a note that changed since the last upload; returns both."""
+        old_ids = notes.get(note_id, {}).get("chunk_ids", [])
+        new_ids = self._chunk_ids(chunks, note_id)
+        old_id_set = set(old_ids)
+        new_id_set = set(new_ids)
+        
+        removed_ids = [chunk_id for chunk_id in old_ids if chunk_id not in new_id_set]
+        added = [
+            (chunk_id, chunk) 
+            for chunk_id, chunk in zip(new_ids, chunks) 
+            if chunk_id not in old_id_set
+        ]
+        kept = [
+            (chunk_id, chunk) 
+            for chunk_id, chunk in zip(new_ids, chunks) 
+            if chunk_id in old_id_set
+        ]
+        
+        if removed_ids:
+            vectorstore.delete(ids=removed_ids)
+        if added:
+            vectorstore.add_documents(
+                [chunk for _, chunk in added],
+                ids=[chunk_id for chunk_id, _ in added]
+            )
+        if kept and updated_at != notes.get(note_id, {}).get("updated_at"):
+            # Refresh metadata of unchanged chunks without re-embedding them
+            vectorstore._collection.update(
+                ids=[chunk_id for chunk_id, _ in kept],
+                metadatas=[chunk.metadata for _, chunk in kept]
+            )
+        
+        notes[note_id] = {"updated_at": updated_at, "chunk_ids": new_ids}
+        return removed_ids, added
+    
+    def _open_vectorstore(self, actual_db_path: Path) -> "Chroma":
+        """Get the pooled, long-lived store for a database directory."""
+        from langchain_chroma import Chroma
+        
+        if self._shared_mode:
+            return self._pool.get(
+                actual_db_path,
+                lambda: Chroma(
+                    client=self._get_shared_client(),
+                    collection_name=self._collection_name(actual_db_path),
+                    collection_metadata=self._collection_metadata(actual_db_path),
+                    embedding_function=self._embeddings
+                )
+            )
+        
+        return self._pool.get(
+            actual_db_path,
+            lambda: Chroma(
+                persist_directory=str(actual_db_path),
+                embedding_function=self._embeddings
+            )
         )
+    
+    def _upsert_note(
+        self, 
+        vector_db_path: Path, 
+        note_id: str, 
+        content: str,
+        updated_at: Optional[str]
+    ) -> None:
+        """Add or update a single note (blocking)."""
+        with self._get_folder_lock(vector_db_path):
+            actual_db_path, notes = self._get_notes_store(vector_db_path)
+            chunks = self._split_note(note_id, content, updated_at)
+            
+            vectorstore = self._open_vectorstore(actual_db_path)
+            removed_ids, added = self._sync_note_chunks(vectorstore, notes, note_id, chunks, updated_at)
+            self._update_sparse_index(vectorstore, actual_db_path, removed_ids, added)
+            self._write_chunk_manifest(actual_db_path, notes)
+    
+    def _delete_note(self, vector_db_path: Path, note_id: str) -> bool:
+        """Delete a single note (blocking)."""
+        with self._get_folder_lock(vector_db_path):
+            actual_db_path = self._get_actual_db_path(vector_db_path)
+            notes = self._read_chunk_manifest(actual_db_path)
+            
+            if actual_db_path == vector_db_path or not notes or note_id not in notes:
+                return False
+            
+            chunk_ids = notes.pop(note_id)["chunk_ids"]
+            if chunk_ids:
+                vectorstore = self._open_vectorstore(actual_db_path)
+                vectorstore.delete(ids=chunk_ids)
+                self._update_sparse_index(vectorstore, actual_db_path, chunk_ids, [])
+            self._write_chunk_manifest(actual_db_path, notes)
+            return True
+    
+    def _replace_notes(self, vector_db_path: Path, text: str) -> None:
+        """Replace all notes of a folder with one bulk note (blocking)."""
+        chunks = self._split_note(BULK_NOTE_ID, text, None)
+        
+        # Full rebuild when incremental indexing is turned off
+        if not settings.incremental_notes_indexing:
+            with self._get_folder_lock(vector_db_path):
+                chunk_ids = self._chunk_ids(chunks, BULK_NOTE_ID)
+                unique_path = self._replace_vectorstore(chunks, vector_db_path, chunk_ids)
+                self._write_chunk_manifest(
+                    unique_path, 
+                    {BULK_NOTE_ID: {"updated_at": None, "chunk_ids": chunk_ids}}
+                )
+            return
         
-        # Create a pointer to the actual database
-        self._create_db_pointer(vector_db_path, unique_path)
+        # Otherwise only re-embed changed chunks
+        with self._get_folder_lock(vector_db_path):
+            actual_db_path, notes = self._get_notes_store(vector_db_path)
+            vectorstore = self._open_vectorstore(actual_db_path)
+            
+            removed_ids = []
+            for note_id in [note_id for note_id in notes if note_id != BULK_NOTE_ID]:
+                chunk_ids = notes.pop(note_id)["chunk_ids"]
+                if chunk_ids:
+                    vectorstore.delete(ids=chunk_ids)
+                    removed_ids.extend(chunk_ids)
+            removed_bulk_ids, added = self._sync_note_chunks(vectorstore, notes, BULK_NOTE_ID, chunks)
+            self._update_sparse_index(vectorstore, actual_db_path, removed_ids + removed_bulk_ids, added)
+            self._write_chunk_manifest(actual_db_path, notes)
+    
+    async def upsert_note(
+        self, 
+        vector_db_path: Path, 
+        note_id: str, 
+        content: str,
+        updated_at: Optional[str] = None
+    ) -> None:
+        """Add or update a single note in the folder's notes collection."""
+        await run_io(self._upsert_note, vector_db_path, note_id, content, updated_at)
+    
+    async def delete_note(self, vector_db_path: Path, note_id: str) -> bool:
+        """Delete a single note from the folder's notes collection."""
+        return await run_io(self._delete_note, vector_db_path, note_id)
+    
+    async def create_vectorstore_from_text(
+        self, 
+        text: str, 
+        vector_db_path: Path
+    ) -> None:
+        """
+        Create vector store from text (bulk upload of all notes in a folder).
+        Stored as a single bulk note that replaces any per-note uploads.
+        """
+        await run_io(self._replace_notes, vector_db_path, text)
+    
+    def get_keyword_stats(self, vector_db_path: Path) -> Optional[KeywordStats]:
+        """Get the keyword statistics of the folder's current database, if it has any."""
+        actual_db_path = self._get_actual_db_path(vector_db_path)
+        if actual_db_path == vector_db_path:
+            return None
+        return keyword_stats_store.load(actual_db_path)
     
     def get_retriever(self, vector_db_path: Path):
-        """Load retriever from disk - no caching."""
+        """Get retriever backed by the pooled vector store."""
         # Get the actual database path
         actual_db_path = self._get_actual_db_path(vector_db_path)
         
-        if not actual_db_path.exists():
+        # Without a pointer the folder has no completed database yet; opening
+        # the base directory would create an empty stray one
+        if actual_db_path == vector_db_path:
             raise FileNotFoundError(f"Vector database not found: {vector_db_path}")
         
-        vectorstore = Chroma(
-            persist_directory=str(actual_db_path),
-            embedding_function=self._embeddings
-        )
-        retriever = vectorstore.as_retriever()
+        vectorstore = self._open_vectorstore(actual_db_path)
+        sparse_index = sparse_index_store.load(actual_db_path) if settings.hybrid_retrieval_enabled else None
         
-        return retriever
+        # Stores built before BM25 indexes existed only have dense search
+        if sparse_index is None:
+            return vectorstore.as_retriever(search_kwargs={"k": settings.retrieval_k})
+        
+        return HybridRetriever(
+            vectorstore=vectorstore,
+            sparse_index=sparse_index,
+            k=settings.retrieval_k,
+            candidates=settings.hybrid_candidates,
+            rrf_k=settings.rrf_k
+        )
     
-    def create_qa_chain(self, llm: ChatOpenAI, vector_db_path: Path) -> RetrievalQA:
+    def create_qa_chain(self, llm: "ChatOpenAI", vector_db_path: Path) -> "RetrievalQA":
         """Create a RetrievalQA chain with educational prompting."""
+        from langchain.chains import RetrievalQA
+        
         retriever = self.get_retriever(vector_db_path)
         
         # Custom prompt template for educational context
@@ -258,5 +1065,10 @@ Answer:"""
         )
 
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Get vector store pool statistics."""
+        return self._pool.get_stats()
+
+
 # Global instance
 vectorstore_service = VectorStoreService()
\ No newline at end of file
@@ -1,10 +1,21 @@
 """Utility package initialization."""
 
-from .file_utils import cleanup_file, get_file_size, save_upload_file, validate_file_extension
+from .file_utils import (
+    FileCache,
+    MarkdownStreamCleaner,
+    cleanup_file,
+    get_file_size,
+    remove_markdown_formatting,
+    save_upload_file,
+    validate_file_extension,
+)
 
 __all__ = [
+    "FileCache",
+    "MarkdownStreamCleaner",
     "cleanup_file",
     "get_file_size", 
+    "remove_markdown_formatting",
     "save_upload_file",
     "validate_file_extension",
 ]
\ No newline at end of file
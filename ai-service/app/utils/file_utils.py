@@ -3,15 +3,20 @@
 import os
 import re
 import shutil
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
 
 from fastapi import UploadFile
 
 from app.core.config import get_settings
+from app.core.executors import run_io
 
 settings = get_settings()
 
+T = TypeVar("T")
+
 
 def remove_markdown_formatting(text: str) -> str:
     """Remove markdown formatting from text."""
@@ -21,6 +26,27 @@ def remove_markdown_formatting(text: str) -> str:
     # Remove markdown headers
     text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
     
+    text = _remove_paired_markup(text)
+    
+    # Remove markdown lists formatting
+    text = re.sub(r'^\s*[-*+]\s+', '- ', text, flags=re.MULTILINE)
+    text = re.sub(r'^\s*\d+\.\s+', lambda m: f"{m.group().strip()[:-1]}. ", text, flags=re.MULTILINE)
+    
+    # Remove blockquotes
+    text = re.sub(r'^>\s*', '', text, flags=re.MULTILINE)
+    
+    # Remove horizontal rules
+    text = re.sub(r'^[-*_]{3,}$', '', text, flags=re.MULTILINE)
+    
+    # Clean up extra whitespace
+    text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
+    text = text.strip()
+    
+    return text
+
+
+def _remove_paired_markup(text: str) -> str:
+    """Remove emphasis, code and links, whose markers may pair across lines."""
     # Remove bold and italic formatting
     text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)  # Bold
     text = re.sub(r'\*([^*]+)\*', r'\1', text)      # Italic
@@ -34,33 +60,93 @@ def remove_markdown_formatting(text: str) -> str:
     # Remove markdown links [text](url) -> text
     text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
     
-    # Remove markdown lists formatting
-    text = re.sub(r'^\s*[-*+]\s+', '- ', text, flags=re.MULTILINE)
-    text = re.sub(r'^\s*\d+\.\s+', lambda m: f"{m.group().strip()[:-1]}. ", text, flags=re.MULTILINE)
+    return text
+
+
+class MarkdownStreamCleaner:
+    """
+    Apply remove_markdown_formatting incrementally to streamed text.
+    Cleans the text received so far at each word boundary where no
+    markdown is left open and emits only the newly cleaned part, so the
+    emitted parts always add up to remove_markdown_formatting of the whole stream.
+    """
     
-    # Remove blockquotes
-    text = re.sub(r'^>\s*', '', text, flags=re.MULTILINE)
+    def __init__(self, enabled: bool = True):
+        """Initialize stream cleaner."""
+        self.enabled = enabled
+        self._buffer = ""
+        self._emitted = ""
+        self._diverged = False
     
-    # Remove horizontal rules
-    text = re.sub(r'^[-*_]{3,}$', '', text, flags=re.MULTILINE)
+    def feed(self, text: str) -> str:
+        """Add streamed text and return the cleaned text that became final."""
+        self._buffer += text
+        if not self.enabled:
+            self._emitted += text
+            return text
+        
+        if self._diverged or not any(char.isspace() for char in text):
+            return ""
+        
+        # Only clean up to the last word boundary where no markdown is left open
+        cut = max(self._buffer.rfind(" "), self._buffer.rfind("\n")) + 1
+        stable = self._buffer[:cut]
+        if not self._is_settled(stable):
+            return ""
+        
+        return self._advance(remove_markdown_formatting(stable))
     
-    # Clean up extra whitespace
-    text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
-    text = text.strip()
+    def _is_settled(self, stable: str) -> bool:
+        """Check that no markdown in the text so far can still change."""
+        # Emphasis, code and link markers pair across lines, so any marker
+        # left unpaired may still match one in a later token
+        rest = _remove_paired_markup(stable)
+        if any(marker in rest for marker in ("*", "_", "`", "](")):
+            return False
+        if rest.rfind("[") > rest.rfind("]"):
+            return False
+        
+        # A line of only -, * or _ may still become a horizontal rule
+        line = stable[stable.rfind("\n") + 1:].strip()
+        return not line or bool(line.strip("-*_"))
     
-    return text
+    def finish(self) -> Tuple[str, str]:
+        """Return (remaining cleaned text, complete cleaned text)."""
+        if not self.enabled:
+            return "", self._buffer
+        
+        final_text = remove_markdown_formatting(self._buffer)
+        return self._advance(final_text), final_text
+    
+    def _advance(self, cleaned: str) -> str:
+        """Emit the part of cleaned text beyond what was already sent."""
+        if not cleaned.startswith(self._emitted):
+            # A later token changed earlier formatting (e.g. emphasis spanning lines);
+            # stop emitting deltas and let the final text replace the stream
+            self._diverged = True
+            return ""
+        
+        delta = cleaned[len(self._emitted):]
+        self._emitted = cleaned
+        return delta
 
 
 async def save_upload_file(file: UploadFile, destination: Path) -> Path:
     """Save uploaded file to destination."""
     destination.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(destination, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Copy on the I/O pool so large uploads do not block the event loop
+    await run_io(_copy_file, file.file, destination)
     
     return destination
 
 
+def _copy_file(source: BinaryIO, destination: Path) -> None:
+    """Copy a file object to destination (blocking)."""
+    with open(destination, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+
+
 def validate_file_extension(filename: str, allowed_extensions: List[str]) -> bool:
     """Validate if file has allowed extension."""
     file_ext = Path(filename).suffix.lower()
@@ -78,4 +164,51 @@ def cleanup_file(file_path: Path) -> None:
 
 def get_file_size(file_path: Path) -> int:
     """Get file size in bytes."""
-    return file_path.stat().st_size if file_path.exists() else 0
\ No newline at end of file
+    return file_path.stat().st_size if file_path.exists() else 0
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int, int]]:
+    """Identify the current contents of a file, or None if it is missing."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    # Files are replaced by renaming, which also changes the inode
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class FileCache(Generic[T]):
+    """
+    LRU cache of objects loaded from files, reloaded when any of the files changes.
+    The first file of each entry is required; later ones are optional parts.
+    """
+    
+    def __init__(self, max_entries: int):
+        """Initialize file cache."""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Tuple, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, paths: Sequence[Path], load: Callable[[], T]) -> Optional[T]:
+        """Get the cached object, loading it again if its files changed; None if they are missing or unreadable."""
+        stamp = tuple(_file_stamp(path) for path in paths)
+        if stamp[0] is None:
+            return None
+        
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._entries.move_to_end(key)
+                return cached[1]
+        
+        try:
+            value = load()
+        except (OSError, ValueError, KeyError):
+            return None
+        
+        with self._lock:
+            self._entries[key] = (stamp, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
@@ -0,0 +1,128 @@
+"""
+Import per-folder Chroma databases into the shared client.
+
+Usage (from the ai-service directory):
+    python -m app.utils.migrate_vectorstores [--delete-source]
+
+Copies the stored embeddings, documents and metadata of every folder's
+current database (the `.db_location` target) into its shared-mode
+collection without re-embedding. Set VECTOR_STORAGE_MODE=shared afterwards.
+"""
+
+import argparse
+import shutil
+import uuid
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import chromadb
+
+from app.core.config import get_settings
+from app.services.vectorstore import vectorstore_service
+
+settings = get_settings()
+
+BATCH_SIZE = 1000
+
+
+def find_folder_databases(vector_db_dir: Path) -> Iterator[Tuple[Path, Path]]:
+    """Yield (folder path, actual database path) for each per-folder database."""
+    for pointer_file in sorted(vector_db_dir.glob("*/*/*/.db_location")):
+        folder_path = pointer_file.parent
+        actual_db_path = vectorstore_service._get_actual_db_path(folder_path)
+        if actual_db_path != folder_path and (actual_db_path / "chroma.sqlite3").exists():
+            yield folder_path, actual_db_path
+
+
+def migrate_database(actual_db_path: Path, shared_client) -> int:
+    """Copy one per-folder database into its shared collection, returning the record count."""
+    source_client = chromadb.PersistentClient(path=str(actual_db_path))
+    target = shared_client.get_or_create_collection(
+        name=vectorstore_service._collection_name(actual_db_path),
+        metadata=vectorstore_service._collection_metadata(actual_db_path)
+    )
+    
+    copied = 0
+    for source in source_client.list_collections():
+        if isinstance(source, str):
+            source = source_client.get_collection(source)
+        
+        offset = 0
+        while True:
+            batch = source.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=BATCH_SIZE,
+                offset=offset
+            )
+            if not batch["ids"]:
+                break
+            
+            target.upsert(
+                ids=batch["ids"],
+                embeddings=batch["embeddings"],
+                documents=batch["documents"],
+                metadatas=batch["metadatas"]
+            )
+            copied += len(batch["ids"])
+            offset += len(batch["ids"])
+    
+    close = getattr(source_client, "close", None)
+    if close is not None:
+        close()
+    
+    return copied
+
+
+def _is_segment_dir(path: Path) -> bool:
+    """Check whether a directory is one of Chroma's segments (named by UUID)."""
+    try:
+        uuid.UUID(path.name)
+    except ValueError:
+        return False
+    return path.is_dir()
+
+
+def delete_source_files(actual_db_path: Path) -> None:
+    """
+    Remove Chroma's own files, keeping sidecar files such as the chunk
+    manifest, keyword statistics and the BM25 index (bm25/).
+    """
+    (actual_db_path / "chroma.sqlite3").unlink(missing_ok=True)
+    for segment_dir in actual_db_path.iterdir():
+        if _is_segment_dir(segment_dir):
+            shutil.rmtree(segment_dir, ignore_errors=True)
+
+
+def main() -> None:
+    """Run the migration."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--delete-source",
+        action="store_true",
+        help="Remove the per-folder Chroma files after a successful import"
+    )
+    args = parser.parse_args()
+    
+    shared_client = chromadb.PersistentClient(path=str(settings.shared_vector_db_dir))
+    
+    folders = 0
+    records = 0
+    for folder_path, actual_db_path in find_folder_databases(settings.vector_db_dir):
+        try:
+            copied = migrate_database(actual_db_path, shared_client)
+        except Exception as e:
+            print(f"Failed to migrate {folder_path}: {e}")
+            continue
+        
+        if args.delete_source:
+            delete_source_files(actual_db_path)
+        
+        folders += 1
+        records += copied
+        print(f"Migrated {folder_path} ({copied} records)")
+    
+    print(f"Done: {folders} folders, {records} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""
+Worker package initialization.
+Functions here run in the CPU process pool, so this package must stay
+cheap to import and must not import app.services.
+"""
@@ -0,0 +1,45 @@
+"""PDF parsing tasks run in the CPU process pool."""
+
+from typing import Any, Dict, Iterator, List
+
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+
+def iter_pdf_pages(file_path: str) -> Iterator[Document]:
+    """Parse a PDF lazily, one page document at a time."""
+    from langchain_community.document_loaders import PyPDFLoader
+    
+    loader = PyPDFLoader(file_path)
+    yield from loader.lazy_load()
+
+
+def count_pdf_pages(file_path: str) -> int:
+    """Get the number of pages of a PDF without extracting any text."""
+    return len(PdfReader(file_path).pages)
+
+
+def _document_metadata(reader: PdfReader, file_path: str) -> Dict[str, Any]:
+    """Build the document-level metadata the same way PyPDFLoader does."""
+    metadata: Dict[str, Any] = {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+    for key, value in (reader.metadata or {}).items():
+        metadata[key.lstrip("/").lower()] = value if isinstance(value, (str, int)) else str(value)
+    metadata["source"] = file_path
+    metadata["total_pages"] = len(reader.pages)
+    return metadata
+
+
+def load_pdf_page_range(file_path: str, start: int, stop: int) -> List[Document]:
+    """Extract pages [start, stop) of a PDF as page documents."""
+    reader = PdfReader(file_path)
+    metadata = _document_metadata(reader, file_path)
+    labels = reader.page_labels
+    
+    documents = []
+    for page_number in range(start, min(stop, len(reader.pages))):
+        text = reader.pages[page_number].extract_text(extraction_mode="plain")
+        documents.append(Document(
+            page_content=text.strip(),
+            metadata={**metadata, "page": page_number, "page_label": labels[page_number]}
+        ))
+    return documents
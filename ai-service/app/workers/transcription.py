@@ -0,0 +1,182 @@
+"""Vosk transcription tasks run in the CPU process pool."""
+
+import json
+import subprocess
+import wave
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from vosk import KaldiRecognizer, Model
+
+# Vosk models loaded in this worker process, keyed by path
+_models: Dict[str, Model] = {}
+
+
+def _get_model(model_path: str) -> Model:
+    """Load a Vosk model once per worker process."""
+    if model_path not in _models:
+        _models[model_path] = Model(model_path)
+    return _models[model_path]
+
+
+def _words(result: str, offset: float) -> List[Dict[str, Any]]:
+    """Get the timestamped words of a recognizer result, shifted by offset seconds."""
+    return [
+        {"word": word["word"], "start": word["start"] + offset, "end": word["end"] + offset}
+        for word in json.loads(result).get("result", [])
+    ]
+
+
+def iter_video_transcript(
+    model_path: str, 
+    video_path: str, 
+    sample_rate: int, 
+    channels: int,
+    start: float = 0.0,
+    end: Optional[float] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Transcribe a video's audio while FFmpeg decodes it, yielding the timestamped words of each segment.
+    Raw 16-bit PCM is read from FFmpeg's stdout pipe, so no WAV file is written
+    and decoding runs in parallel with recognition. Pass start/end (seconds) to
+    transcribe only part of the video.
+    """
+    recognizer = KaldiRecognizer(_get_model(model_path), sample_rate)
+    recognizer.SetWords(True)
+    
+    command = ["ffmpeg", "-nostdin", "-loglevel", "error"]
+    if start:
+        command += ["-ss", str(start)]
+    if end is not None:
+        command += ["-to", str(end)]
+    command += [
+        "-i", video_path,
+        "-vn",
+        "-ar", str(sample_rate),
+        "-ac", str(channels),
+        "-f", "s16le",
+        "pipe:1"
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    
+    try:
+        # Process audio in chunks of 4000 frames as they arrive
+        while True:
+            data = process.stdout.read(4000 * 2 * channels)
+            if len(data) == 0:
+                break
+            
+            if recognizer.AcceptWaveform(data):
+                words = _words(recognizer.Result(), start)
+                if words:
+                    yield words
+        
+        if process.wait() != 0:
+            raise RuntimeError(f"FFmpeg failed: {process.stderr.read().decode(errors='replace')}")
+        
+        # Get final result
+        words = _words(recognizer.FinalResult(), start)
+        if words:
+            yield words
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def get_wav_duration(audio_path: str) -> float:
+    """Get the length of a WAV file in seconds."""
+    with wave.open(audio_path, "rb") as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+def find_split_points(
+    audio_path: str, 
+    segment_seconds: float, 
+    search_seconds: float
+) -> List[float]:
+    """
+    Pick window boundaries roughly every segment_seconds.
+    Each boundary is moved to the quietest 100 ms within search_seconds of
+    it, so words are rarely cut in half.
+    """
+    with wave.open(audio_path, "rb") as wf:
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        duration = wf.getnframes() / rate
+        step = rate // 10
+        
+        split_points = []
+        target = segment_seconds
+        while target < duration - search_seconds:
+            start = max(0, int((target - search_seconds) * rate))
+            wf.setpos(start)
+            samples = np.frombuffer(wf.readframes(int(2 * search_seconds * rate)), dtype=np.int16)
+            samples = samples[::channels].astype(np.float32)
+            
+            frames = samples[:len(samples) // step * step].reshape(-1, step)
+            if len(frames):
+                energy = np.sqrt(np.mean(frames ** 2, axis=1))
+                split_points.append((start + int(np.argmin(energy)) * step + step // 2) / rate)
+            target += segment_seconds
+    
+    return split_points
+
+
+def transcribe_wav_window(
+    model_path: str, 
+    audio_path: str, 
+    start: float, 
+    end: float,
+    sample_rate: int, 
+    channels: int
+) -> List[Dict[str, Any]]:
+    """Transcribe seconds [start, end) of a WAV file into words with absolute timestamps."""
+    recognizer = KaldiRecognizer(_get_model(model_path), sample_rate)
+    recognizer.SetWords(True)
+    
+    words = []
+    
+    with wave.open(audio_path, "rb") as wf:
+        # Validate audio format
+        if (wf.getnchannels() != channels or 
+            wf.getsampwidth() != 2 or 
+            wf.getframerate() != sample_rate):
+            raise ValueError(
+                f"Audio must be WAV format, mono, 16-bit, "
+                f"and {sample_rate}Hz"
+            )
+        
+        wf.setpos(min(wf.getnframes(), int(start * sample_rate)))
+        remaining = int((end - start) * sample_rate)
+        
+        # Process audio in chunks
+        while remaining > 0:
+            data = wf.readframes(min(4000, remaining))
+            if len(data) == 0:
+                break
+            remaining -= len(data) // (2 * channels)
+            
+            if recognizer.AcceptWaveform(data):
+                words.extend(_words(recognizer.Result(), start))
+        
+        words.extend(_words(recognizer.FinalResult(), start))
+    
+    return words
+
+
+def stitch_windows(windows: List[Tuple[float, float, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """
+    Merge the words of overlapping windows.
+    Each window is (owned start, owned end, words); a word is kept only by the
+    window whose owned range contains its midpoint, which drops the copies
+    recognized twice in the overlaps.
+    """
+    words = []
+    for owned_start, owned_end, window_words in windows:
+        for word in window_words:
+            if owned_start <= (word["start"] + word["end"]) / 2 < owned_end:
+                words.append(word)
+    return words
@@ -0,0 +1 @@
+"""Benchmark scripts, run from ai-service/ with `python -m benchmarks.<name>`."""
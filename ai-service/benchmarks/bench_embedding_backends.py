@@ -0,0 +1,69 @@
+"""
+Throughput and memory of the embedding backends.
+
+    python -m benchmarks.bench_embedding_backends --texts 2000 --backends torch torch-int8 onnx
+
+Each backend runs in a fresh process so model memory is measured on its own.
+"""
+
+import argparse
+import multiprocessing
+import time
+from typing import Any, Dict, List
+
+from benchmarks.synthetic import make_texts
+
+
+def run_backend(backend: str, texts: List[str], batch_size: int) -> Dict[str, Any]:
+    """Load one backend and encode the texts (runs in its own process)."""
+    from app.core.config import get_settings
+    from app.services.embeddings import _current_rss_bytes, _load_backend_model
+
+    settings = get_settings()
+    rss_before = _current_rss_bytes()
+    start = time.perf_counter()
+    model = _load_backend_model(settings.embedding_model, backend)
+    load_seconds = time.perf_counter() - start
+    model_bytes = _current_rss_bytes() - rss_before
+
+    # One warm-up batch, then the timed run
+    model.embed_documents(texts[:batch_size])
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        model.embed_documents(texts[offset:offset + batch_size])
+    seconds = time.perf_counter() - start
+
+    return {
+        "backend": backend,
+        "load_s": load_seconds,
+        "texts_per_s": len(texts) / seconds,
+        "model_mb": model_bytes / 2**20,
+        "rss_mb": _current_rss_bytes() / 2**20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx"])
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    context = multiprocessing.get_context("spawn")
+    print(f"{'backend':<12}{'load s':>9}{'texts/s':>10}{'model MB':>10}{'RSS MB':>9}")
+    for backend in args.backends:
+        with context.Pool(1) as pool:
+            try:
+                result = pool.apply(run_backend, (backend, texts, args.batch_size))
+            except Exception as e:
+                print(f"{backend:<12}skipped: {e}")
+                continue
+        print(
+            f"{result['backend']:<12}{result['load_s']:>9.2f}{result['texts_per_s']:>10.1f}"
+            f"{result['model_mb']:>10.1f}{result['rss_mb']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
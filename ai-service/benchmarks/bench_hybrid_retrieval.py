@@ -0,0 +1,102 @@
+"""
+Retrieval latency of BM25, dense and hybrid search on a large folder, and the cost of note edits.
+
+    python -m benchmarks.bench_hybrid_retrieval --chunks 30000 --queries 200
+
+Dense search uses Chroma with deterministic fake embeddings, so the numbers
+exclude the query embedding (see bench_embedding_backends for that).
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.sparse_index import HybridRetriever, SparseIndexBuilder, SparseIndexStore
+
+settings = get_settings()
+
+
+def make_chunks(count: int, vocabulary: int = 20000, seed: int = 0) -> List[str]:
+    """Generate chunk texts with a Zipf-like word distribution."""
+    rng = random.Random(seed)
+    words = [f"w{i:05d}x" for i in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    return [" ".join(rng.choices(words, weights, k=120)) for _ in range(count)]
+
+
+def latencies_ms(search: Callable[[str], object], queries: List[str]) -> str:
+    """Time each query and format p50/p99 in milliseconds."""
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return f"p50 {np.percentile(samples, 50):6.2f} ms   p99 {np.percentile(samples, 99):6.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=30000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--no-dense", action="store_true", help="only benchmark the BM25 index")
+    args = parser.parse_args()
+
+    texts = make_chunks(args.chunks)
+    ids = [f"chunk-{i}" for i in range(len(texts))]
+    rng = random.Random(1)
+    queries = [" ".join(rng.choice(text.split()) for text in rng.sample(texts, 3)) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp)
+        store = SparseIndexStore()
+
+        start = time.perf_counter()
+        builder = SparseIndexBuilder()
+        builder.add(ids, texts)
+        store.save(db_path, builder)
+        build_seconds = time.perf_counter() - start
+        index = store.load(db_path)
+        print(f"BM25 build     {build_seconds:8.2f} s for {len(texts)} chunks")
+        print(f"BM25 search    {latencies_ms(lambda query: index.search(query, settings.hybrid_candidates), queries)}")
+
+        # A note edit: three chunks replaced, against rebuilding the whole index
+        start = time.perf_counter()
+        edits = 20
+        for edit in range(edits):
+            removed = ids[edit * 3:edit * 3 + 3]
+            store.update(db_path, removed, [f"edit-{edit}-{i}" for i in range(3)], make_chunks(3, seed=edit))
+        print(f"Note edit      {(time.perf_counter() - start) / edits * 1000:8.2f} ms incremental "
+              f"vs {build_seconds * 1000:.0f} ms full rebuild")
+
+        if args.no_dense:
+            return
+
+        from langchain_chroma import Chroma
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+
+        vectorstore = Chroma(
+            persist_directory=str(db_path / "chroma"),
+            embedding_function=DeterministicFakeEmbedding(size=384)
+        )
+        for offset in range(0, len(texts), 5000):
+            vectorstore.add_texts(texts[offset:offset + 5000], ids=ids[offset:offset + 5000])
+
+        retriever = HybridRetriever(
+            vectorstore=vectorstore,
+            sparse_index=store.load(db_path),
+            k=settings.retrieval_k,
+            candidates=settings.hybrid_candidates,
+            rrf_k=settings.rrf_k
+        )
+        print(f"Dense search   {latencies_ms(lambda query: vectorstore.similarity_search(query, k=settings.hybrid_candidates), queries)}")
+        print(f"Hybrid search  {latencies_ms(retriever.invoke, queries)}")
+
+
+if __name__ == "__main__":
+    main()
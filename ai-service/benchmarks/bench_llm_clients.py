@@ -0,0 +1,100 @@
+"""
+Throughput of blocking, per-request and pooled LLM clients against a local stub model.
+
+    python -m benchmarks.bench_llm_clients --requests 200 --concurrency 32 --delay-ms 200
+
+The stub (benchmarks/stub_llm.py) answers every chat completion after a fixed
+delay. "blocking" is the old path: sync invoke() inside async handlers, so
+requests run one at a time. "per-request" awaits ainvoke() on a new client per
+call. "pooled" is LLMService: one keep-alive pool behind the concurrency cap.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, List
+
+import httpx
+import numpy as np
+from langchain_openai import ChatOpenAI
+
+from app.core.config import get_settings
+from app.services.llm import llm_service
+
+from benchmarks.stub_llm import StubLLM, serve_in_thread
+
+settings = get_settings()
+
+
+async def run_requests(call: Callable[[str], Awaitable[object]], requests: int, concurrency: int) -> List[float]:
+    """Send requests from concurrent clients and return each request's latency in seconds."""
+    latencies = []
+    queue = list(range(requests))
+
+    async def client() -> None:
+        while queue:
+            index = queue.pop()
+            start = time.perf_counter()
+            await call(f"Explain gradient descent, variant {index}.")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--delay-ms", type=float, default=200.0)
+    parser.add_argument("--blocking-requests", type=int, default=20, help="requests sent on the serial blocking path")
+    args = parser.parse_args()
+
+    stub = StubLLM(delay_ms=args.delay_ms)
+    with serve_in_thread(stub.app) as base_url:
+        settings.openrouter_base_url = f"{base_url}/v1"
+        settings.openrouter_api_key = settings.openrouter_api_key or "stub"
+
+        def new_client(**clients) -> ChatOpenAI:
+            return ChatOpenAI(
+                model=settings.default_model,
+                openai_api_key=settings.openrouter_api_key,
+                openai_api_base=settings.openrouter_base_url,
+                **clients
+            )
+
+        blocking_llm = new_client(http_client=httpx.Client(timeout=settings.llm_timeout))
+
+        async def blocking(query: str) -> object:
+            return blocking_llm.invoke(query)
+
+        async def per_request(query: str) -> object:
+            # langchain-openai shares one default client, so pass a fresh one to open a new connection
+            async with httpx.AsyncClient(timeout=settings.llm_timeout) as client:
+                return await new_client(http_async_client=client).ainvoke(query)
+
+        async def pooled(query: str) -> object:
+            async with llm_service._limit():
+                return await llm_service.llm.ainvoke(query)
+
+        print(f"{'client':>12}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'connections':>13}")
+        for name, call, requests in [
+            ("blocking", blocking, args.blocking_requests),
+            ("per-request", per_request, args.requests),
+            ("pooled", pooled, args.requests),
+        ]:
+            stub.connections.clear()
+            start = time.perf_counter()
+            latencies = asyncio.run(run_requests(call, requests, args.concurrency))
+            seconds = time.perf_counter() - start
+            print(
+                f"{name:>12}{requests:>10}{requests / seconds:>9.1f}{np.percentile(latencies, 50) * 1000:>9.0f}"
+                f"{np.percentile(latencies, 99) * 1000:>9.0f}{len(stub.connections):>13}"
+            )
+
+        stats = llm_service.get_stats()
+        print(f"pooled: max {stats['max_concurrency']} in flight, peak queue depth {stats['max_waiting']}")
+
+
+if __name__ == "__main__":
+    main()
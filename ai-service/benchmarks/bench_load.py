@@ -0,0 +1,145 @@
+"""
+/health and /chat latency while PDF uploads run on the same worker.
+
+    python -m benchmarks.bench_load --seconds 20 --uploaders 4 --pages 40
+
+Serves the app with uvicorn in a background thread, with the LLM replaced by
+the local stub (benchmarks/stub_llm.py). Each phase probes /health every few
+milliseconds and keeps a few /chat requests in flight, first on an idle
+server, then while uploaders send fresh PDFs to /upload/pdf back to back.
+With parsing, embedding and LLM calls off the event loop /health stays flat,
+and /chat waits for at most one embedding pass of the uploads (see
+EMBEDDING_PASS_MAX_TEXTS), which is milliseconds unless the CPU is saturated.
+"""
+
+import argparse
+import asyncio
+import itertools
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from app.core.config import get_settings
+
+from benchmarks.stub_llm import StubLLM, serve_in_thread
+from benchmarks.synthetic import write_pdf
+
+settings = get_settings()
+
+USER_ID = "load-test"
+
+# Numbers fresh queries and PDFs across phases, so none is answered from the embedding cache
+_counter = itertools.count()
+
+
+def use_data_dir(root: Path) -> None:
+    """Point every data path of the settings into root."""
+    settings.root_data_dir = root
+    settings.upload_dir = root / "uploads"
+    settings.vector_db_dir = root / "vector_dbs"
+    settings.shared_vector_db_dir = settings.vector_db_dir / "_shared_chroma"
+    settings.audio_dir = root / "extracted_audios"
+    settings.embedding_cache_dir = root / "embedding_cache"
+    settings.response_cache_dir = root / "response_cache"
+    settings.jobs_db_path = root / "jobs.sqlite"
+
+
+async def upload_pdf(client: httpx.AsyncClient, path: Path, folder_id: str) -> None:
+    """Upload a PDF through the synchronous endpoint, which returns once it is indexed."""
+    response = await client.post(
+        "/api/v1/upload/pdf",
+        files={"file": (path.name, path.read_bytes(), "application/pdf")},
+        data={"user_id": USER_ID, "folder_id": folder_id}
+    )
+    response.raise_for_status()
+
+
+async def run_phase(
+    client: httpx.AsyncClient, seconds: float, chatters: int, uploaders: int, pages: int, pdf_dir: Path
+) -> Dict[str, List[float]]:
+    """Probe /health and /chat for the given time while uploaders run, and return latencies in seconds."""
+    latencies: Dict[str, List[float]] = {"/health": [], "/chat": [], "uploads": []}
+    deadline = time.perf_counter() + seconds
+
+    async def timed(name: str, request) -> None:
+        start = time.perf_counter()
+        response = await request
+        response.raise_for_status()
+        latencies[name].append(time.perf_counter() - start)
+
+    async def health() -> None:
+        while time.perf_counter() < deadline:
+            await timed("/health", client.get("/api/v1/health"))
+            await asyncio.sleep(0.02)
+
+    async def chat() -> None:
+        while time.perf_counter() < deadline:
+            body = {"query": f"What is said about topic {next(_counter)}?", "user_id": USER_ID, "folder_id": "chat"}
+            await timed("/chat", client.post("/api/v1/chat/", json=body))
+
+    async def uploader(index: int) -> None:
+        while time.perf_counter() < deadline:
+            seed = next(_counter)
+            path = await asyncio.to_thread(write_pdf, pdf_dir / f"upload-{seed}.pdf", pages, seed=seed)
+            start = time.perf_counter()
+            await upload_pdf(client, path, f"upload-{index}")
+            latencies["uploads"].append(time.perf_counter() - start)
+
+    await asyncio.gather(
+        health(),
+        *(chat() for _ in range(chatters)),
+        *(uploader(index) for index in range(uploaders))
+    )
+    return latencies
+
+
+async def run_benchmark(app_url: str, args: argparse.Namespace, root: Path) -> None:
+    """Upload the document to chat with, then run the idle and uploading phases and print the table."""
+    async with httpx.AsyncClient(base_url=app_url, timeout=None) as client:
+        await upload_pdf(client, write_pdf(root / "chat.pdf", args.pages), "chat")
+        await client.post("/api/v1/chat/", json={"query": "warm-up", "user_id": USER_ID, "folder_id": "chat"})
+
+        print(f"{'phase':>10}{'endpoint':>10}{'requests':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+        for phase, uploaders in [("idle", 0), ("uploading", args.uploaders)]:
+            latencies = await run_phase(client, args.seconds, args.chatters, uploaders, args.pages, root)
+            for endpoint in ("/health", "/chat", "uploads"):
+                samples = np.array(latencies[endpoint]) * 1000
+                if not len(samples):
+                    continue
+                print(
+                    f"{phase:>10}{endpoint:>10}{len(samples):>10}{np.percentile(samples, 50):>9.1f}"
+                    f"{np.percentile(samples, 95):>9.1f}{np.percentile(samples, 99):>9.1f}{samples.max():>9.1f}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=20.0, help="length of each phase")
+    parser.add_argument("--uploaders", type=int, default=4)
+    parser.add_argument("--chatters", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=40, help="pages per uploaded PDF")
+    parser.add_argument("--llm-delay-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    stub = StubLLM(delay_ms=args.llm_delay_ms)
+    with tempfile.TemporaryDirectory() as tmp, serve_in_thread(stub.app) as llm_url:
+        root = Path(tmp)
+        use_data_dir(root / "data")
+        settings.openrouter_base_url = f"{llm_url}/v1"
+        settings.openrouter_api_key = settings.openrouter_api_key or "stub"
+        # Time the LLM round trip rather than answers from the semantic chat cache
+        settings.chat_cache_enabled = False
+
+        # Imported only now, since the services read their data paths when created
+        from app.main import app
+
+        with serve_in_thread(app) as app_url:
+            asyncio.run(run_benchmark(app_url, args, root))
+
+
+if __name__ == "__main__":
+    main()
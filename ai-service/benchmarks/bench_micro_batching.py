@@ -0,0 +1,58 @@
+"""
+Latency and throughput of the embedding micro-batcher at different window settings.
+
+    python -m benchmarks.bench_micro_batching --clients 32 --requests 20 --windows 0 2 5 10 20
+
+Each client sends single-text requests back to back, like concurrent
+/analysis and /chat queries. Window 0 flushes whatever is queued right away.
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.core.config import get_settings
+from app.services.embeddings import MicroBatcher, _load_backend_model
+
+from benchmarks.synthetic import make_texts
+
+settings = get_settings()
+
+
+async def run_clients(batcher: MicroBatcher, clients: int, requests: int) -> float:
+    """Run all clients to completion and return the wall time in seconds."""
+    texts = make_texts(clients * requests, words_per_text=12)
+
+    async def client(index: int) -> None:
+        for request in range(requests):
+            await batcher.embed([texts[index * requests + request]])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(clients)))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 2, 5, 10, 20])
+    parser.add_argument("--max-texts", type=int, default=settings.embedding_batch_max_texts)
+    args = parser.parse_args()
+
+    model = _load_backend_model(settings.embedding_model, settings.embedding_backend)
+    model.embed_documents(make_texts(8))  # warm-up
+
+    print(f"{'window ms':>10}{'avg batch':>11}{'p50 ms':>9}{'p99 ms':>9}{'texts/s':>10}")
+    for window_ms in args.windows:
+        batcher = MicroBatcher(model.embed_documents, window_ms=window_ms, max_texts=args.max_texts)
+        seconds = asyncio.run(run_clients(batcher, args.clients, args.requests))
+        stats = batcher.get_stats()
+        print(
+            f"{window_ms:>10g}{stats['avg_batch_size']:>11.1f}{stats['latency_p50_ms']:>9.1f}"
+            f"{stats['latency_p99_ms']:>9.1f}{stats['texts'] / seconds:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+PDF page extraction: PyPDFLoader in one pass versus page-range shards on a process pool.
+
+    python -m benchmarks.bench_pdf_extraction --pages 400 --workers 1 2 4 8
+
+Shards are submitted in order and collected in order, as the upload path does.
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Tuple
+
+from app.core.config import get_settings
+from app.workers.pdf import iter_pdf_pages, load_pdf_page_range
+
+from benchmarks.synthetic import write_pdf
+
+settings = get_settings()
+
+
+def extract_sharded(file_path: str, pages: int, workers: int, shard_size: int) -> Tuple[int, float]:
+    """Extract all pages on a pool of the given size and return the page count and seconds."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        # Start the workers before timing, the server's pool is long-lived
+        list(pool.map(abs, range(workers)))
+
+        start = time.perf_counter()
+        shards = [
+            pool.submit(load_pdf_page_range, file_path, first, first + shard_size)
+            for first in range(0, pages, shard_size)
+        ]
+        count = sum(len(shard.result()) for shard in shards)
+        return count, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--shard-size", type=int, default=settings.pdf_pages_per_shard)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = str(write_pdf(Path(tmp) / "bench.pdf", args.pages))
+
+        start = time.perf_counter()
+        count = sum(1 for _ in iter_pdf_pages(file_path))
+        baseline = time.perf_counter() - start
+
+        print(f"{'mode':<14}{'seconds':>9}{'pages/s':>10}{'speedup':>9}")
+        print(f"{'PyPDFLoader':<14}{baseline:>9.2f}{count / baseline:>10.1f}{1.0:>9.2f}")
+        for workers in args.workers:
+            count, seconds = extract_sharded(file_path, args.pages, workers, args.shard_size)
+            print(f"{f'{workers} workers':<14}{seconds:>9.2f}{count / seconds:>10.1f}{baseline / seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
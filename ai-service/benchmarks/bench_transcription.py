@@ -0,0 +1,96 @@
+"""
+Serial versus segmented Vosk transcription of synthetic audio.
+
+    python -m benchmarks.bench_transcription --minutes 20 --workers 1 2 4 8
+
+Needs the Vosk model at MODEL_DIR. Each pool worker loads the model before
+timing starts, as the server's long-lived CPU pool does.
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from app.core.config import get_settings
+from app.workers.transcription import find_split_points, stitch_windows, transcribe_wav_window
+
+from benchmarks.synthetic import write_wav
+
+settings = get_settings()
+
+
+def transcribe_segmented(pool: ProcessPoolExecutor, audio_path: str, duration: float) -> List[Dict[str, Any]]:
+    """Transcribe overlapping windows on the pool and stitch them, as segmented mode does."""
+    split_points = find_split_points(
+        audio_path, settings.transcription_segment_seconds, settings.transcription_split_search_seconds
+    )
+    bounds = [0.0, *split_points, duration]
+    overlap = settings.transcription_overlap_seconds
+    windows = [
+        pool.submit(
+            transcribe_wav_window, str(settings.model_dir), audio_path,
+            max(0.0, start - overlap), min(duration, end + overlap),
+            settings.audio_sample_rate, settings.audio_channels
+        )
+        for start, end in zip(bounds, bounds[1:])
+    ]
+    owned = [-float("inf"), *split_points, float("inf")]
+    return stitch_windows([
+        (start, end, window.result()) for start, end, window in zip(owned, owned[1:], windows)
+    ])
+
+
+def run_pool(audio_path: str, duration: float, workers: int, segmented: bool) -> Tuple[List[Dict[str, Any]], float]:
+    """Transcribe on a pool of the given size and return the words and seconds taken."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        # Load the model in every worker before timing
+        warm_up = [
+            pool.submit(
+                transcribe_wav_window, str(settings.model_dir), audio_path, 0.0, 0.1,
+                settings.audio_sample_rate, settings.audio_channels
+            )
+            for _ in range(workers)
+        ]
+        for task in warm_up:
+            task.result()
+
+        start = time.perf_counter()
+        if not segmented:
+            words = pool.submit(
+                transcribe_wav_window, str(settings.model_dir), audio_path, 0.0, duration,
+                settings.audio_sample_rate, settings.audio_channels
+            ).result()
+        else:
+            words = transcribe_segmented(pool, audio_path, duration)
+        return words, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_path = Path(tmp) / "bench.wav"
+        write_wav(audio_path, args.minutes * 60, settings.audio_sample_rate)
+        duration = args.minutes * 60
+
+        serial_words, serial_seconds = run_pool(str(audio_path), duration, 1, segmented=False)
+        print(f"{'mode':<16}{'seconds':>9}{'x realtime':>12}{'speedup':>9}{'words':>8}")
+        print(f"{'serial':<16}{serial_seconds:>9.2f}{duration / serial_seconds:>12.1f}{1.0:>9.2f}{len(serial_words):>8}")
+        for workers in args.workers:
+            words, seconds = run_pool(str(audio_path), duration, workers, segmented=True)
+            print(
+                f"{f'segmented x{workers}':<16}{seconds:>9.2f}{duration / seconds:>12.1f}"
+                f"{serial_seconds / seconds:>9.2f}{len(words):>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
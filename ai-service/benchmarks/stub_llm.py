@@ -0,0 +1,83 @@
+"""Local OpenAI-compatible chat completions server and a background uvicorn runner for the benchmarks."""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Set, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPLY = "Gradient descent moves the parameters against the gradient of the loss, one small step at a time."
+
+
+class StubLLM:
+    """Answers every chat completion with a fixed reply after a fixed delay, like a remote model."""
+
+    def __init__(self, delay_ms: float = 200.0, reply: str = REPLY):
+        self.delay_ms = delay_ms
+        self.reply = reply
+        self.requests = 0
+        self.connections: Set[Tuple[str, int]] = set()
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self._chat_completions)
+
+    async def _chat_completions(self, request: Request):
+        """Handle a (streaming or non-streaming) chat completion request."""
+        body = await request.json()
+        self.requests += 1
+        # Each client address:port is one TCP connection, so this counts connections opened
+        self.connections.add(tuple(request.scope["client"]))
+        await asyncio.sleep(self.delay_ms / 1000)
+
+        if body.get("stream"):
+            return StreamingResponse(self._stream(body.get("model", "stub")), media_type="text/event-stream")
+        return {
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": self.reply}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+
+    async def _stream(self, model: str):
+        """Send the reply a few characters per chunk."""
+        for start in range(0, len(self.reply), 8):
+            delta = {"content": self.reply[start:start + 8]}
+            yield f"data: {json.dumps(self._chunk(model, delta, None))}\n\n"
+        yield f"data: {json.dumps(self._chunk(model, {}, 'stop'))}\n\n"
+        yield "data: [DONE]\n\n"
+
+    def _chunk(self, model: str, delta: dict, finish_reason) -> dict:
+        return {
+            "id": "stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+
+@contextmanager
+def serve_in_thread(app) -> Iterator[str]:
+    """Serve an ASGI app with uvicorn on a free local port and yield its base URL."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+        sock.close()
@@ -0,0 +1,80 @@
+"""Synthetic inputs shared by the benchmarks and tests."""
+
+import random
+import wave
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+WORDS = (
+    "energy cell force matrix integral market price revolution graph protocol network "
+    "molecule theorem equation function derivative history economy algorithm memory"
+).split()
+
+
+def make_texts(count: int, words_per_text: int = 60, seed: int = 0) -> List[str]:
+    """Generate chunk-sized pseudo-sentences."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=words_per_text)) + "." for _ in range(count)]
+
+
+def write_pdf(path: Path, pages: int, lines_per_page: int = 40, seed: int = 0) -> Path:
+    """Write a text-only PDF of the given number of pages (no PDF library needed)."""
+    rng = random.Random(seed)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{4 + 2 * page} 0 R" for page in range(pages)), pages
+        ),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for page in range(pages):
+        lines = " ".join(
+            f"({' '.join(rng.choices(WORDS, k=10))} page {page + 1}) '" for _ in range(lines_per_page)
+        )
+        content = f"BT /F1 10 Tf 50 780 Td 12 TL {lines} ET"
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * page} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    data += f"trailer << /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(data)
+    return path
+
+
+def write_wav(path: Path, seconds: float, sample_rate: int = 16000, seed: int = 0) -> List[Tuple[float, float]]:
+    """
+    Write mono 16-bit audio of word-like tone bursts separated by silence.
+    Returns the (start, end) seconds of each burst.
+    """
+    rng = np.random.default_rng(seed)
+    parts = []
+    bursts = []
+    position = 0.0
+    while position < seconds - 1:
+        length = rng.uniform(0.2, 0.5)
+        gap = rng.uniform(0.15, 0.6)
+        t = np.arange(int(length * sample_rate)) / sample_rate
+        parts.append((8000 * np.sin(2 * np.pi * rng.integers(200, 2000) * t)).astype(np.int16))
+        parts.append(np.zeros(int(gap * sample_rate), dtype=np.int16))
+        bursts.append((position, position + len(t) / sample_rate))
+        position += (len(t) + len(parts[-1])) / sample_rate
+
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(np.concatenate(parts).tobytes())
+    return bursts
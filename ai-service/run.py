@@ -2,8 +2,6 @@
 
 import uvicorn
 
-from app import app
-
 if __name__ == "__main__":
     uvicorn.run(
         "app:app",
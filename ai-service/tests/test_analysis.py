@@ -0,0 +1,99 @@
+"""Sentence-gap detection of the analysis service."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.analysis import AnalysisService
+
+THRESHOLD = 0.7
+
+
+class FixedEmbeddings:
+    """Embeddings looked up from a fixed table."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    async def aembed_documents(self, texts):
+        return [self.vectors[text] for text in texts]
+
+    async def aembed_query(self, text):
+        return self.vectors[text]
+
+
+async def _per_sentence_loop(embeddings, user_note, llm_note, threshold):
+    """The original implementation: one embedding per sentence and a Python loop over pairs."""
+    user_sentences = [s.strip() for s in user_note.split(". ") if s.strip()]
+    llm_sentences = [s.strip() for s in llm_note.split(". ") if s.strip()]
+    if not user_sentences or not llm_sentences:
+        return llm_sentences
+
+    user_embeddings = await asyncio.gather(*[embeddings.aembed_query(s) for s in user_sentences])
+    llm_embeddings = await asyncio.gather(*[embeddings.aembed_query(s) for s in llm_sentences])
+
+    def cosine_similarity(vec1, vec2):
+        return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+
+    missing_info = []
+    for i, llm_embed in enumerate(llm_embeddings):
+        similarities = [cosine_similarity(llm_embed, user_embed) for user_embed in user_embeddings]
+        max_similarity = max(similarities) if similarities else 0
+        if max_similarity < threshold:
+            missing_info.append(llm_sentences[i])
+    return missing_info
+
+
+def _notes(rng, user_count, llm_count, zero_user=(), zero_llm=()):
+    """Build two notes and embeddings where some LLM sentences are close to user sentences."""
+    user = [f"user sentence {i}" for i in range(user_count)]
+    llm = [f"llm sentence {i}" for i in range(llm_count)]
+    vectors = {sentence: rng.normal(size=16).tolist() for sentence in user}
+    for i, sentence in enumerate(llm):
+        if i % 2:
+            # Near copy of a user sentence, at varying distance
+            base = np.asarray(vectors[user[i % user_count]])
+            vectors[sentence] = (base + rng.normal(scale=0.3 * (i % 4), size=16)).tolist()
+        else:
+            vectors[sentence] = rng.normal(size=16).tolist()
+    for i in zero_user:
+        vectors[user[i]] = [0.0] * 16
+    for i in zero_llm:
+        vectors[llm[i]] = [0.0] * 16
+    return ". ".join(user), ". ".join(llm), vectors
+
+
+@pytest.mark.parametrize("zero_user, zero_llm", [
+    ((), ()),
+    ((0,), ()),  # zero vector in the first user row
+    ((3,), ()),  # zero vector in a later user row
+    ((), (2, 5)),  # zero vectors on the LLM side
+    ((0, 4), (1,)),
+])
+def test_matches_per_sentence_loop(zero_user, zero_llm):
+    rng = np.random.default_rng(len(zero_user) * 10 + len(zero_llm))
+    user_note, llm_note, vectors = _notes(rng, 8, 12, zero_user, zero_llm)
+    embeddings = FixedEmbeddings(vectors)
+    service = AnalysisService()
+    service._embeddings = embeddings
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = asyncio.run(_per_sentence_loop(embeddings, user_note, llm_note, THRESHOLD))
+    result = asyncio.run(service.find_missing_information(user_note, llm_note, THRESHOLD))
+
+    assert result == expected
+    if 0 in zero_user:
+        # NaN in the first column makes every row maximum NaN, which never compares below the threshold
+        assert result == []
+    else:
+        assert 0 < len(result) < 12
+
+
+def test_empty_user_note_reports_every_sentence():
+    service = AnalysisService()
+    service._embeddings = FixedEmbeddings({})
+
+    result = asyncio.run(service.find_missing_information("", "first fact. second fact", THRESHOLD))
+
+    assert result == ["first fact", "second fact"]
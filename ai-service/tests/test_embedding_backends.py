@@ -0,0 +1,100 @@
+"""Retrieval parity of the embedding backends against the fp32 PyTorch backend."""
+
+import importlib.util
+
+import numpy as np
+import pytest
+
+from app.core.config import get_settings
+from app.services.embeddings import EMBEDDING_BACKENDS, _load_backend_model
+
+settings = get_settings()
+
+PASSAGES = [
+    "Photosynthesis converts light energy into chemical energy stored in glucose.",
+    "The mitochondria is the site of cellular respiration and ATP production.",
+    "Newton's second law states that force equals mass times acceleration.",
+    "The derivative of a function measures its instantaneous rate of change.",
+    "An integral accumulates a quantity over an interval, such as area under a curve.",
+    "Supply and demand determine the market price of a good.",
+    "Inflation is a general rise in prices that reduces purchasing power.",
+    "The French Revolution began in 1789 and ended the absolute monarchy.",
+    "World War I started after the assassination of Archduke Franz Ferdinand.",
+    "A binary search tree keeps keys in sorted order for logarithmic lookups.",
+    "Dijkstra's algorithm finds shortest paths in graphs with non-negative weights.",
+    "TCP provides reliable, ordered delivery of a byte stream between hosts.",
+    "DNA is a double helix made of nucleotides with four bases.",
+    "Covalent bonds form when atoms share pairs of electrons.",
+    "The Pythagorean theorem relates the sides of a right triangle.",
+    "Shakespeare wrote Hamlet, a tragedy about the prince of Denmark.",
+    "Plate tectonics explains earthquakes and the drift of continents.",
+    "Gradient descent minimizes a loss by stepping against its gradient.",
+    "Entropy measures the disorder of a thermodynamic system.",
+    "The Industrial Revolution mechanized textile production in Britain.",
+]
+
+QUERIES = [
+    "how do plants make food from sunlight",
+    "what produces energy in a cell",
+    "force mass acceleration",
+    "rate of change of a function",
+    "why do prices go up over time",
+    "start of the French revolution",
+    "shortest path in a weighted graph",
+    "reliable network transport protocol",
+    "structure of DNA",
+    "optimizing neural network weights",
+]
+
+TOP_K = 3
+
+
+def _load_or_skip(backend: str):
+    """Load the configured model on a backend, skipping if it is unavailable here."""
+    if backend == "onnx" and (
+        importlib.util.find_spec("onnxruntime") is None or importlib.util.find_spec("optimum") is None
+    ):
+        pytest.skip("onnx backend needs optimum[onnxruntime]")
+    try:
+        return _load_backend_model(settings.embedding_model, backend)
+    except (OSError, ValueError) as e:
+        # Model files not downloaded and no network access
+        pytest.skip(f"could not load {settings.embedding_model} on {backend}: {e}")
+
+
+def _rankings(model):
+    """Get passage vectors and the top passages of each query, best first."""
+    passages = np.asarray(model.embed_documents(PASSAGES))
+    queries = np.asarray(model.embed_documents(QUERIES))
+    scores = queries @ passages.T / np.outer(
+        np.linalg.norm(queries, axis=1), np.linalg.norm(passages, axis=1)
+    )
+    return passages, np.argsort(-scores, axis=1)[:, :TOP_K]
+
+
+@pytest.fixture(scope="module")
+def reference():
+    """Vectors and rankings of the fp32 PyTorch backend."""
+    return _rankings(_load_or_skip("torch"))
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        _load_backend_model(settings.embedding_model, "tensorrt")
+
+
+@pytest.mark.parametrize("backend", [backend for backend in EMBEDDING_BACKENDS if backend != "torch"])
+def test_backend_matches_torch_retrieval(backend, reference):
+    reference_vectors, reference_top = reference
+    vectors, top = _rankings(_load_or_skip(backend))
+
+    # Vectors stay close to fp32 ...
+    cosine = np.sum(vectors * reference_vectors, axis=1) / (
+        np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference_vectors, axis=1)
+    )
+    assert cosine.min() > 0.98
+
+    # ... and retrieval returns the same best passage and mostly the same top k
+    assert (top[:, 0] == reference_top[:, 0]).all()
+    overlap = np.mean([len(set(a) & set(b)) / TOP_K for a, b in zip(top, reference_top)])
+    assert overlap >= 0.9
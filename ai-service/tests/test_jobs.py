@@ -0,0 +1,159 @@
+"""Background ingestion jobs: per-folder ordering, superseding and resuming after a restart."""
+
+import asyncio
+import json
+
+from app.services import jobs
+from app.services.jobs import IngestionJobService
+
+
+async def _wait_for_status(service, job_id, statuses, timeout=5.0):
+    """Poll a job until it reaches one of the statuses."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await service.get_job(job_id)
+        if job["status"] in statuses or asyncio.get_running_loop().time() > deadline:
+            return job
+        await asyncio.sleep(0.01)
+
+
+def _stage(tmp_path, name, content):
+    """Write a staged upload and build its job payload."""
+    staged = tmp_path / "staged" / name
+    staged.parent.mkdir(parents=True, exist_ok=True)
+    staged.write_text(content)
+    return {
+        "file_path": str(staged),
+        "upload_path": str(tmp_path / "uploaded_doc" / "folder"),
+        "vector_db_path": str(tmp_path / "vector_db"),
+    }
+
+
+def test_new_upload_supersedes_queued_jobs_of_the_folder(tmp_path):
+    service = IngestionJobService(tmp_path / "jobs.sqlite")
+    running = []
+
+    async def fake_pdf(job):
+        running.append(job["job_id"])
+        assert len(running) == 1  # never two jobs of one folder at once
+        await asyncio.sleep(0.1)
+        service._publish_upload(json.loads(job["payload"]))
+        running.remove(job["job_id"])
+
+    service._handlers["pdf"] = fake_pdf
+
+    async def run():
+        first = await service.submit("pdf", "u", "folder", _stage(tmp_path, "a", "first"))
+        await _wait_for_status(service, first["job_id"], {"running"})
+        second = await service.submit("pdf", "u", "folder", _stage(tmp_path, "b", "second"))
+        third = await service.submit("pdf", "u", "folder", _stage(tmp_path, "c", "third"))
+        results = [await _wait_for_status(service, job["job_id"], {"succeeded", "failed"})
+                   for job in (first, third)]
+        results.insert(1, await service.get_job(second["job_id"]))
+        await service.stop()
+        return results
+
+    first, second, third = asyncio.run(run())
+
+    assert [first["status"], second["status"], third["status"]] == ["succeeded", "superseded", "succeeded"]
+    assert (tmp_path / "uploaded_doc" / "folder").read_text() == "third"
+    assert list((tmp_path / "staged").iterdir()) == []
+
+
+def test_job_interrupted_by_shutdown_resumes_on_next_start(tmp_path):
+    payload = _stage(tmp_path, "a", "video bytes")
+    interrupted = IngestionJobService(tmp_path / "jobs.sqlite")
+    started = asyncio.Event()
+
+    async def hang(job):
+        started.set()
+        await asyncio.sleep(3600)
+
+    interrupted._handlers["pdf"] = hang
+
+    async def run_until_shutdown():
+        job = await interrupted.submit("pdf", "u", "folder", payload)
+        await started.wait()
+        await interrupted.stop()
+        return job
+
+    job = asyncio.run(run_until_shutdown())
+
+    # The staged upload survives the shutdown
+    assert (tmp_path / "staged" / "a").read_text() == "video bytes"
+
+    resumed = IngestionJobService(tmp_path / "jobs.sqlite")
+    seen = []
+
+    async def finish(job):
+        seen.append(job["job_id"])
+        resumed._publish_upload(json.loads(job["payload"]))
+
+    resumed._handlers["pdf"] = finish
+
+    async def run_after_restart():
+        await resumed.start()
+        result = await _wait_for_status(resumed, job["job_id"], {"succeeded", "failed"})
+        await resumed.stop()
+        return result
+
+    result = asyncio.run(run_after_restart())
+
+    assert result["status"] == "succeeded"
+    assert seen == [job["job_id"]]
+    assert (tmp_path / "uploaded_doc" / "folder").read_text() == "video bytes"
+    assert not (tmp_path / "staged" / "a").exists()
+
+
+def test_failed_job_discards_its_staged_upload(tmp_path):
+    service = IngestionJobService(tmp_path / "jobs.sqlite")
+
+    async def fail(job):
+        raise RuntimeError("broken PDF")
+
+    service._handlers["pdf"] = fail
+
+    async def run():
+        job = await service.submit("pdf", "u", "folder", _stage(tmp_path, "a", "x"))
+        result = await _wait_for_status(service, job["job_id"], {"succeeded", "failed"})
+        await service.stop()
+        return result
+
+    result = asyncio.run(run())
+
+    assert result["status"] == "failed" and result["error"] == "broken PDF"
+    assert not (tmp_path / "staged" / "a").exists()
+
+
+def test_streamed_video_reports_progress_from_transcript_position(tmp_path, monkeypatch):
+    service = IngestionJobService(tmp_path / "jobs.sqlite")
+    release = asyncio.Event()
+
+    async def probe_duration(media_path):
+        return 120.0
+
+    async def create_vectorstore_from_video(video_path, vector_db_path, audio_path, progress=None):
+        progress(30.0)
+        await release.wait()
+
+    monkeypatch.setattr(jobs.settings, "transcription_mode", "stream")
+    monkeypatch.setattr(jobs.transcription_service, "probe_duration", probe_duration)
+    monkeypatch.setattr(jobs.vectorstore_service, "create_vectorstore_from_video", create_vectorstore_from_video)
+
+    async def run():
+        payload = _stage(tmp_path, "a", "video")
+        payload["audio_path"] = str(tmp_path / "a.wav")
+        job = await service.submit("video", "u", "folder", payload)
+
+        progress = 0.0
+        for _ in range(500):
+            progress = (await service.get_job(job["job_id"]))["progress"]
+            if progress:
+                break
+            await asyncio.sleep(0.01)
+        release.set()
+        await _wait_for_status(service, job["job_id"], {"succeeded", "failed"})
+        await service.stop()
+        return progress
+
+    assert asyncio.run(run()) == 25.0
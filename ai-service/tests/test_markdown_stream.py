@@ -0,0 +1,90 @@
+"""Incremental markdown cleaning of streamed chat answers."""
+
+import random
+
+import pytest
+
+from app.utils.file_utils import MarkdownStreamCleaner, remove_markdown_formatting
+
+
+def _stream(tokens, enabled=True):
+    """Feed tokens through a cleaner and return the deltas and the finish() result."""
+    cleaner = MarkdownStreamCleaner(enabled=enabled)
+    deltas = [cleaner.feed(token) for token in tokens]
+    return deltas, cleaner.finish()
+
+
+def _assert_matches_whole_text(tokens):
+    deltas, (remaining, final_text) = _stream(tokens)
+    expected = remove_markdown_formatting("".join(tokens))
+
+    assert "".join(deltas) + remaining == expected
+    assert final_text == expected
+    return deltas
+
+
+@pytest.mark.parametrize("tokens", [
+    # Emphasis split across tokens
+    ["This is **very", " important** and", " *also", " this* one. "],
+    ["Use __bold", "__ and _it", "alic_ here. ", "Done"],
+    # Code fence split across chunks
+    ["Example:\n``", "`python\nx = 1\n", "y = 2\n`", "``\nAfter the code. "],
+    ["Run `pip ", "install` first. ", "Then `pytest", "`. "],
+    # Links
+    ["See [the ", "docs](https://exa", "mple.com/a b) for ", "details. "],
+    ["A [bracket] alone and [", "another](x) link. "],
+    # Lines that may become horizontal rules
+    ["Intro\n-", "-", "-\n", "Next section. "],
+    ["Intro\n--", " not a rule\n", "Text. "],
+    ["Intro\n*", "**\n", "Text. "],
+    # Headers, lists and quotes
+    ["## Head", "ing\n", "- item one\n", "* item two\n", "1. first\n", "> quoted ", "text. "],
+])
+def test_deltas_add_up_to_cleaned_text(tokens):
+    _assert_matches_whole_text(tokens)
+
+
+def test_emphasis_across_lines_does_not_diverge():
+    # An emphasis marker opened on one line and closed several tokens later
+    # changes text that a line-by-line check would already have emitted
+    tokens = ["Start *first\n", "second line ", "goes on ", "end* done. "]
+
+    deltas = _assert_matches_whole_text(tokens)
+
+    assert not any(deltas[1:3])
+
+
+def test_plain_text_streams_before_finish():
+    deltas = _assert_matches_whole_text(["Plain ", "text with ", "**bold** ", "words and ", "more."])
+
+    assert "".join(deltas) == "Plain text with bold words and"
+
+
+def test_stray_marker_holds_back_until_finish():
+    deltas = _assert_matches_whole_text(["Use snake_case ", "names here ", "and there. "])
+
+    assert not any(deltas)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_token_splits(seed):
+    text = (
+        "# Summary\n\nThe **mitochondria** is the *powerhouse* of the cell.\n"
+        "---\n- It makes `ATP`\n- See [biology](https://example.com/bio)\n\n"
+        "```\ncode *not* emphasis\n```\n1. First point\n> A quote with __bold__ text.\n"
+    )
+    rng = random.Random(seed)
+    cuts = sorted(rng.sample(range(1, len(text)), 40))
+    tokens = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+    _assert_matches_whole_text(tokens)
+
+
+def test_disabled_cleaner_passes_text_through():
+    tokens = ["**not** ", "cleaned"]
+
+    deltas, (remaining, final_text) = _stream(tokens, enabled=False)
+
+    assert deltas == tokens
+    assert remaining == ""
+    assert final_text == "**not** cleaned"
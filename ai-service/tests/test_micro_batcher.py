@@ -0,0 +1,115 @@
+"""Micro-batching of concurrent embedding requests."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from app.services import embeddings
+from app.services.embeddings import EmbeddingEngine, MicroBatcher
+
+
+class FakeEncoder:
+    """Encodes each text as [len(text)] and records the batches it was called with."""
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        self.batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_requests_share_one_encode():
+    encoder = FakeEncoder()
+    batcher = MicroBatcher(encoder, window_ms=50, max_texts=100)
+    requests = [["a" * i, "b" * (i + 10)] for i in range(1, 6)]
+
+    async def run():
+        return await asyncio.gather(*(batcher.embed(texts) for texts in requests))
+
+    results = asyncio.run(run())
+
+    assert len(encoder.batches) == 1
+    # Each caller gets the vectors of its own texts, in order
+    for texts, vectors in zip(requests, results):
+        assert vectors == [[float(len(text))] for text in texts]
+
+
+def test_batch_is_flushed_at_max_texts():
+    encoder = FakeEncoder()
+    batcher = MicroBatcher(encoder, window_ms=1000, max_texts=4)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.embed([str(i)]) for i in range(8))), timeout=5
+        )
+
+    asyncio.run(run())
+
+    assert [len(batch) for batch in encoder.batches] == [4, 4]
+
+
+def test_encode_error_reaches_every_caller():
+    def fail(texts: List[str]) -> List[List[float]]:
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(fail, window_ms=20, max_texts=100)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.embed(["x"]), batcher.embed(["y"]), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_empty_request_skips_the_queue():
+    encoder = FakeEncoder()
+    batcher = MicroBatcher(encoder, window_ms=5, max_texts=10)
+
+    assert asyncio.run(batcher.embed([])) == []
+    assert encoder.batches == []
+
+
+class BlockingModel:
+    """Records forward passes; the first one waits until released."""
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.batches.append(list(texts))
+        if len(self.batches) == 1:
+            self.started.set()
+            self.release.wait(5)
+        return [[float(len(text))] for text in texts]
+
+
+def test_query_waits_for_one_pass_of_an_upload(monkeypatch):
+    monkeypatch.setattr(embeddings.settings, "embedding_cache_enabled", False)
+    monkeypatch.setattr(embeddings.settings, "embedding_pass_max_texts", 4)
+    engine = EmbeddingEngine()
+    model = engine._model = BlockingModel()
+    upload = [f"chunk {i}" for i in range(12)]
+
+    with ThreadPoolExecutor(2) as pool:
+        upload_result = pool.submit(engine.embed_documents, upload)
+        assert model.started.wait(5)
+        query_result = pool.submit(engine.embed_query, "question")
+        while not engine._pending:
+            time.sleep(0.001)
+        model.release.set()
+
+        assert query_result.result(5) == [8.0]
+        assert upload_result.result(5) == [[float(len(text))] for text in upload]
+
+    assert model.batches[0] == upload[:4]
+    # The query goes first in the next pass, not after the rest of the upload
+    assert model.batches[1][0] == "question"
+    assert max(len(batch) for batch in model.batches) <= 4
@@ -0,0 +1,50 @@
+"""Migration of per-folder Chroma databases into the shared client."""
+
+import asyncio
+
+import chromadb
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from app.services import vectorstore
+from app.services.sparse_index import SPARSE_INDEX_DIR, HybridRetriever
+from app.services.vectorstore import VectorStoreService
+from app.utils import migrate_vectorstores
+
+WORDS = [
+    {"word": word, "start": index * 0.5, "end": index * 0.5 + 0.4}
+    for index, word in enumerate(
+        ("today we cover the course code cs101 and then recursion with examples " * 20).split()
+    )
+]
+
+
+def test_migrated_folder_keeps_hybrid_retrieval(tmp_path, monkeypatch):
+    embeddings = DeterministicFakeEmbedding(size=32)
+    monkeypatch.setattr(vectorstore.settings, "vector_db_dir", tmp_path / "vector_db")
+    monkeypatch.setattr(vectorstore.settings, "shared_vector_db_dir", tmp_path / "shared")
+    folder_path = tmp_path / "vector_db" / "user" / "uploaded_doc" / "folder"
+
+    # Build a folder in directory mode
+    monkeypatch.setattr(vectorstore.settings, "vector_storage_mode", "directory")
+    source = VectorStoreService()
+    source._embeddings = embeddings
+    asyncio.run(source.create_vectorstore_from_transcript(WORDS, folder_path))
+    source._pool.invalidate(source._get_actual_db_path(folder_path))
+
+    shared_client = chromadb.PersistentClient(path=str(tmp_path / "shared"))
+    for _, actual_db_path in migrate_vectorstores.find_folder_databases(tmp_path / "vector_db"):
+        assert migrate_vectorstores.migrate_database(actual_db_path, shared_client) > 0
+        migrate_vectorstores.delete_source_files(actual_db_path)
+
+    assert not (actual_db_path / "chroma.sqlite3").exists()
+    assert (actual_db_path / SPARSE_INDEX_DIR / "meta.json").exists()
+
+    # Serve it in shared mode
+    monkeypatch.setattr(vectorstore.settings, "vector_storage_mode", "shared")
+    target = VectorStoreService()
+    target._embeddings = embeddings
+    target._shared_client = shared_client
+    retriever = target.get_retriever(folder_path)
+
+    assert isinstance(retriever, HybridRetriever)
+    assert any("cs101" in document.page_content for document in retriever.invoke("cs101"))
@@ -0,0 +1,27 @@
+"""Sharded PDF page extraction."""
+
+from app.workers.pdf import count_pdf_pages, iter_pdf_pages, load_pdf_page_range
+from benchmarks.synthetic import write_pdf
+
+
+def test_shards_match_single_pass_extraction(tmp_path):
+    pdf = str(write_pdf(tmp_path / "lecture.pdf", pages=23, lines_per_page=5))
+    expected = list(iter_pdf_pages(pdf))
+
+    # Uneven last shard, as produced by the page-range sharding
+    pages = []
+    for start in range(0, count_pdf_pages(pdf), 5):
+        pages.extend(load_pdf_page_range(pdf, start, start + 5))
+
+    assert [page.page_content for page in pages] == [page.page_content for page in expected]
+    assert [page.metadata for page in pages] == [page.metadata for page in expected]
+    assert [page.metadata["page"] for page in pages] == list(range(23))
+
+
+def test_range_past_the_end_is_clipped(tmp_path):
+    pdf = str(write_pdf(tmp_path / "short.pdf", pages=3, lines_per_page=2))
+
+    pages = load_pdf_page_range(pdf, 2, 10)
+
+    assert [page.metadata["page"] for page in pages] == [2]
+    assert "page 3" in pages[0].page_content
@@ -0,0 +1,41 @@
+"""Window splitting and stitching of segmented transcription."""
+
+from app.workers.transcription import find_split_points, get_wav_duration, stitch_windows
+from benchmarks.synthetic import write_wav
+
+
+def _word(word, start, end):
+    return {"word": word, "start": start, "end": end}
+
+
+def test_split_points_fall_in_silence(tmp_path):
+    audio = tmp_path / "lecture.wav"
+    bursts = write_wav(audio, seconds=60)
+
+    split_points = find_split_points(str(audio), segment_seconds=10, search_seconds=1)
+
+    assert len(split_points) == 5
+    assert split_points == sorted(split_points)
+    for point in split_points:
+        assert not any(start <= point <= end for start, end in bursts)
+    assert split_points[-1] < get_wav_duration(str(audio))
+
+
+def test_stitching_keeps_each_overlapping_word_once():
+    # Windows own [-inf, 10) and [10, inf) and overlap by 2 s around 10
+    first = [_word("alpha", 7.0, 7.5), _word("beta", 9.2, 9.6), _word("gamma", 10.3, 10.8)]
+    second = [_word("beta", 9.2, 9.7), _word("gamma", 10.3, 10.8), _word("delta", 13.0, 13.4)]
+
+    words = stitch_windows([(-float("inf"), 10.0, first), (10.0, float("inf"), second)])
+
+    assert [word["word"] for word in words] == ["alpha", "beta", "gamma", "delta"]
+    assert words[1] is first[1] and words[2] is second[1]
+
+
+def test_word_across_a_boundary_is_kept_by_the_window_owning_its_midpoint():
+    first = [_word("calculus", 11.6, 12.6)]
+    second = [_word("calculus", 11.7, 12.6)]
+
+    words = stitch_windows([(-float("inf"), 12.0, first), (12.0, float("inf"), second)])
+
+    assert words == second
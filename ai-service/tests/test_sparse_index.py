@@ -0,0 +1,114 @@
+"""BM25 sparse index, its incremental delta segment and hybrid retrieval."""
+
+import random
+
+from langchain_core.documents import Document
+
+from app.services.sparse_index import HybridRetriever, SparseIndex, SparseIndexBuilder, SparseIndexStore
+
+WORDS = [f"term{i}" for i in range(200)]
+
+
+def _text(rng):
+    return " ".join(rng.choices(WORDS, k=rng.randint(5, 40)))
+
+
+def _build(path, chunks):
+    builder = SparseIndexBuilder()
+    builder.add(list(chunks), list(chunks.values()))
+    builder.write(path)
+    return SparseIndex(path)
+
+
+def test_search_ranks_exact_term_matches(tmp_path):
+    index = _build(tmp_path / "bm25", {
+        "a": "cs101 syllabus covers recursion",
+        "b": "recursion and recursion again",
+        "c": "unrelated notes about history",
+    })
+
+    assert [chunk_id for chunk_id, _ in index.search("cs101", 5)] == ["a"]
+    assert [chunk_id for chunk_id, _ in index.search("recursion", 5)] == ["b", "a"]
+    assert index.search("missing", 5) == []
+
+
+def test_incremental_updates_score_like_a_full_rebuild(tmp_path):
+    rng = random.Random(0)
+    store = SparseIndexStore()
+    chunks = {f"c{i}": _text(rng) for i in range(150)}
+    builder = SparseIndexBuilder()
+    builder.add(list(chunks), list(chunks.values()))
+    store.save(tmp_path, builder)
+
+    merged = False
+    changes = 0
+    for step in range(40):
+        removed = rng.sample(sorted(chunks), 3)
+        for chunk_id in removed:
+            del chunks[chunk_id]
+        added = {f"n{step}-{i}": _text(rng) for i in range(2)}
+        added[removed[0]] = _text(rng)  # same id, new text
+        chunks.update(added)
+
+        assert store.update(tmp_path, removed, list(added), list(added.values()))
+        index = store.load(tmp_path)
+        merged = merged or index.delta_changes < changes
+        changes = index.delta_changes
+
+        reference = _build(tmp_path / f"reference-{step}", chunks)
+        assert index.num_docs == reference.num_docs
+        for _ in range(3):
+            query = " ".join(rng.choices(WORDS, k=3))
+            scores = [round(score, 4) for _, score in index.search(query, 10)]
+            assert scores == [round(score, 4) for _, score in reference.search(query, 10)]
+
+    # The delta was merged into the main segment along the way
+    assert merged
+
+
+def test_update_without_index_reports_missing(tmp_path):
+    assert not SparseIndexStore().update(tmp_path, [], ["a"], ["text"])
+
+
+class FakeVectorStore:
+    """Dense search returning a fixed ranking."""
+
+    def __init__(self, documents):
+        self.documents = {document.id: document for document in documents}
+        self.ranking = [document.id for document in documents]
+
+    def similarity_search(self, query, k):
+        return [self.documents[chunk_id] for chunk_id in self.ranking[:k]]
+
+    def get(self, ids, include):
+        found = [self.documents[chunk_id] for chunk_id in ids if chunk_id in self.documents]
+        return {
+            "ids": [document.id for document in found],
+            "documents": [document.page_content for document in found],
+            # Chroma returns None for chunks stored without metadata
+            "metadatas": [document.metadata or None for document in found],
+        }
+
+
+def test_hybrid_retriever_fuses_both_rankings(tmp_path):
+    texts = {
+        "dense1": "an overview of sorting",
+        "dense2": "an overview of searching",
+        "exact": "course code cs101 grading policy",
+    }
+    documents = [Document(page_content=text, id=chunk_id) for chunk_id, text in texts.items()]
+    vectorstore = FakeVectorStore(documents[:2])
+    vectorstore.documents["exact"] = documents[2]
+
+    retriever = HybridRetriever(
+        vectorstore=vectorstore,
+        sparse_index=_build(tmp_path / "bm25", texts),
+        k=2,
+        candidates=2,
+        rrf_k=60
+    )
+    results = retriever.invoke("cs101 overview")
+
+    # Found by both rankings first, then the exact match fetched by id
+    assert [document.id for document in results] == ["dense1", "exact"]
+    assert results[1].page_content == texts["exact"] and results[1].metadata == {}
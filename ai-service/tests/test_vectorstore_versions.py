@@ -0,0 +1,57 @@
+"""Versioned database directories of a folder: swapping and cleanup."""
+
+import pytest
+
+from app.services import vectorstore
+from app.services.vectorstore import VectorStoreService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(vectorstore.settings, "vector_storage_mode", "directory")
+    return VectorStoreService()
+
+
+def _build(path):
+    """Stand in for a completed Chroma build."""
+    path.mkdir(parents=True)
+    (path / "chroma.sqlite3").write_text("")
+    return path
+
+
+def test_version_names_are_unique(service, tmp_path):
+    versions = {service._start_vectorstore(tmp_path / "folder") for _ in range(100)}
+
+    assert len(versions) == 100
+
+
+def test_finishing_keeps_a_concurrent_build(service, tmp_path):
+    folder = tmp_path / "folder"
+    first = _build(service._start_vectorstore(folder))
+    second = _build(service._start_vectorstore(folder))
+
+    # The later upload finishes first; the earlier one is still being built
+    service._finish_vectorstore(folder, second)
+    assert service._get_actual_db_path(folder) == second
+    assert first.exists()
+
+    # When the earlier upload finishes it is already outdated and is dropped
+    service._finish_vectorstore(folder, first)
+    assert service._get_actual_db_path(folder) == second
+    assert not first.exists()
+    assert second.exists()
+
+
+def test_finishing_removes_only_older_versions(service, tmp_path):
+    folder = tmp_path / "folder"
+    legacy = _build(folder / "db_1700000000000")  # named before the uuid suffix
+    older = _build(folder / "db_1700000000500000000_0000abcd")
+    current = _build(service._start_vectorstore(folder))
+    # Started later in another worker process, so not in this service's build set
+    newer = _build(folder / f"db_{service._version_time(current) + 1}_ffff0000")
+
+    service._finish_vectorstore(folder, current)
+
+    assert service._get_actual_db_path(folder) == current
+    assert not legacy.exists() and not older.exists()
+    assert newer.exists()